@@ -0,0 +1,99 @@
+"""Benchmark activity analytics queries: ActivityEventStore vs scanning the log file.
+
+Writes --events synthetic activity events spread over --days days both to a JSON-lines log
+(the format ActivityLogSink writes) and to the activity store in a fresh database, then times
+the same questions answered each way.
+
+    python benchmark_activity_store.py --events 500000 --days 30
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+ACTIVITY_TYPES = ("poll_accessed", "poll_response_submitted", "topic_generation_request", "poll_saved")
+
+def synthetic_events(count: int, days: int, polls: int, now: float, seed: int = 0):
+    rng = random.Random(seed)
+    for index in range(count):
+        occurred_at = now - days * 86400 * (count - index) / count
+        yield {
+            "timestamp": datetime.fromtimestamp(occurred_at).isoformat(),
+            "activity_type": rng.choice(ACTIVITY_TYPES),
+            "details": {"poll_id": f"poll-{rng.randrange(polls)}", "location": "Benchmark City"},
+            "request_ip": f"10.0.{rng.randrange(256)}.{rng.randrange(256)}"
+        }
+
+def scan_log(path: str, keep):
+    """Grep-style baseline: decode every line of the log and keep the matching events"""
+    with open(path) as log:
+        return [event for event in map(json.loads, log) if keep(event)]
+
+def timed(func, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="activity-benchmark-")
+    os.environ["DATABASE_PATH"] = os.path.join(scratch, "polls.db")
+    os.environ["ACTIVITY_LOG_PATH"] = os.path.join(scratch, "user_activity.log")
+    logging.disable(logging.CRITICAL)
+    import main as app_main
+
+    now = time.time()
+    log_path = os.path.join(scratch, "events.log")
+    started = time.perf_counter()
+    with open(log_path, "w") as log:
+        batch = []
+        for event in synthetic_events(args.events, args.days, args.polls, now):
+            log.write(json.dumps(event) + "\n")
+            batch.append(event)
+            if len(batch) == app_main.ACTIVITY_LOG_BATCH_SIZE:
+                app_main.activity_store.append(batch)
+                batch = []
+        if batch:
+            app_main.activity_store.append(batch)
+    print(f"{args.events} events over {args.days} days, {os.path.getsize(log_path) / 2**20:.0f} MiB log, "
+          f"loaded in {time.perf_counter() - started:.1f}s")
+
+    store = app_main.activity_store
+    day_ago = now - 86400
+    epoch = lambda event: datetime.fromisoformat(event["timestamp"]).timestamp()
+    queries = {
+        "counts by type, last 24h": (
+            lambda: store.counts("activity_type", None, None, day_ago, None),
+            lambda: scan_log(log_path, lambda event: epoch(event) >= day_ago)
+        ),
+        "one poll, daily counts": (
+            lambda: store.counts("day", None, "poll-7", None, None),
+            lambda: scan_log(log_path, lambda event: event["details"].get("poll_id") == "poll-7")
+        ),
+        "latest 50 submissions": (
+            lambda: store.events("poll_response_submitted", None, None, None, 50),
+            lambda: scan_log(log_path, lambda event: event["activity_type"] == "poll_response_submitted")[-50:]
+        ),
+    }
+    print(f"{'query':<28} {'store':>10} {'log scan':>10} {'speed-up':>9}")
+    for name, (from_store, from_log) in queries.items():
+        store_ms, _ = timed(from_store, args.repeat)
+        scan_ms, _ = timed(from_log, 1)
+        print(f"{name:<28} {store_ms:8.1f}ms {scan_ms:8.0f}ms {scan_ms / store_ms:8.0f}x")
+    app_main.db_pool.close_all()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark the compute pool on a large synthetic poll.
+
+Runs the same batch of opinion-group computations in-process (on a thread, as with
+COMPUTE_WORKERS=0) and on pools of 1..--max-workers processes, reporting wall time, speed-up
+and the worst event-loop stall seen while the batch runs.
+
+    python benchmark_compute_pool.py --participants 100000 --statements 20 --tasks 8
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+import compute_pool
+import opinion_analysis
+from opinion_analysis import VoteMatrix
+
+def planted_matrix(participants: int, statements: int, clusters: int, seed: int = 0):
+    """Votes from `clusters` opinion groups, each agreeing with its own statements; returns
+    (VoteMatrix, statement_clusters)"""
+    rng = np.random.default_rng(seed)
+    statement_clusters = [i % clusters for i in range(statements)]
+    groups = rng.integers(0, clusters, participants)
+    agree = np.where(groups[:, None] == np.array(statement_clusters)[None, :], 0.8, 0.25)
+    draw = rng.random((participants, statements))
+    votes = np.where(draw < agree, 1, -1).astype(np.int8)
+    votes[rng.random((participants, statements)) < 0.15] = 0
+    return VoteMatrix(votes, votes != 0), statement_clusters
+
+async def watch_loop(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Longest gap beyond interval between event-loop wake-ups, in ms"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst * 1000
+
+async def run_batch(run, matrix: VoteMatrix, statement_clusters, clusters: int, tasks: int):
+    stop = asyncio.Event()
+    watcher = asyncio.ensure_future(watch_loop(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run(opinion_analysis.opinion_groups, matrix, statement_clusters, clusters, clusters)
+        for _ in range(tasks)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return elapsed, await watcher
+
+async def main(args):
+    matrix, statement_clusters = planted_matrix(args.participants, args.statements, args.clusters)
+    print(f"{args.participants} participants x {args.statements} statements, {args.tasks} tasks, "
+          f"{os.cpu_count()} CPUs")
+
+    async def in_process(func, matrix, *func_args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, matrix, *func_args)
+
+    baseline, stall = await run_batch(in_process, matrix, statement_clusters, args.clusters, args.tasks)
+    print(f"{'in-process':>12}  {baseline:7.2f}s  speed-up 1.00  worst loop stall {stall:7.1f}ms")
+
+    for workers in range(1, args.max_workers + 1):
+        pool = compute_pool.ComputePool(workers, timeout_seconds=600)
+        await pool.start()
+        try:
+            elapsed, stall = await run_batch(pool.run, matrix, statement_clusters, args.clusters, args.tasks)
+        finally:
+            pool.stop()
+        print(f"{f'{workers} workers':>12}  {elapsed:7.2f}s  speed-up {baseline / elapsed:4.2f}  "
+              f"worst loop stall {stall:7.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, default=100_000)
+    parser.add_argument("--statements", type=int, default=20)
+    parser.add_argument("--clusters", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=8)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    asyncio.run(main(parser.parse_args()))
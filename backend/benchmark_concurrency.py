@@ -0,0 +1,124 @@
+"""Benchmark request concurrency with blocking vs offloaded SQLite and OpenAI calls.
+
+Starts --generations topic generations against a fake LLM that takes --llm-seconds, while
+--db-requests results reads and vote submissions arrive at --db-rate per second, all through
+the ASGI app. Latency is measured from each request's scheduled arrival, so time spent
+waiting for a blocked event loop counts.
+"blocking" reproduces the code before the DB executor and AsyncOpenAI: every run_db() call
+runs inline on the event loop and the fake client blocks like the synchronous OpenAI SDK.
+"offloaded" is the current code. Reports wall time and per-endpoint latency percentiles.
+
+    python benchmark_concurrency.py --generations 8 --db-requests 400 --db-rate 200 --llm-seconds 0.5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+
+MODES = ("blocking", "offloaded")
+
+def fake_topic(location: str) -> str:
+    return json.dumps({
+        "title": f"Housing in {location}",
+        "description": "How should the city grow?",
+        "main_theme": "What kind of housing does the city need?",
+        "statements": [
+            {"text": f"Statement {index}", "category": "housing", "expected_cluster": f"Cluster {index % 4}"}
+            for index in range(10)
+        ],
+        "expected_clusters": [{"name": f"Cluster {index}", "description": f"Group {index}"} for index in range(4)]
+    })
+
+def fake_openai_client(mode: str, llm_seconds: float):
+    async def create(**kwargs):
+        if mode == "blocking":
+            time.sleep(llm_seconds)  # the synchronous SDK held the event loop for the whole call
+        else:
+            await asyncio.sleep(llm_seconds)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=fake_topic("Benchmark City")))])
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+async def run_mode(app_main, mode: str, args, offloaded_run_db):
+    import httpx
+
+    async def inline_db(func, *call_args, **kwargs):
+        return func(*call_args, **kwargs)
+
+    app_main.run_db = offloaded_run_db if mode == "offloaded" else inline_db
+    app_main.openai_client = fake_openai_client(mode, args.llm_seconds)
+
+    latencies = {"generate": [], "results": [], "submit": []}
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        topic = json.loads(fake_topic("Benchmark City"))
+        poll_id = (await client.post("/save-poll", json={"topic": {**topic, "metadata": {}}})).json()["poll_id"]
+
+        started = time.perf_counter()
+
+        async def timed(kind: str, arrival: float, request):
+            await asyncio.sleep(max(0.0, started + arrival - time.perf_counter()))
+            response = await request()
+            latencies[kind].append(time.perf_counter() - started - arrival)
+            response.raise_for_status()
+
+        def generate(index: int):
+            # Distinct locations, so neither the topic cache nor single-flight merges them
+            return timed("generate", 0.0, lambda: client.post("/generate-topic", json={
+                "community_context": {"location": f"{mode} town {index}"}, "topic_domain": "housing"
+            }))
+
+        def db_request(index: int):
+            arrival = index / args.db_rate
+            if index % 2:
+                return timed("results", arrival, lambda: client.get(f"/poll/{poll_id}/results"))
+            return timed("submit", arrival, lambda: client.post(f"/poll/{poll_id}/responses", json={
+                "poll_id": poll_id,
+                "responses": [{"statementIndex": j, "response": ("agree", "disagree")[(index + j) % 2]} for j in range(10)]
+            }))
+
+        await asyncio.gather(
+            *(generate(index) for index in range(args.generations)),
+            *(db_request(index) for index in range(args.db_requests))
+        )
+        elapsed = time.perf_counter() - started
+
+    def percentile(values, p):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(p * len(values)))] * 1000
+
+    summary = "  ".join(
+        f"{kind} p50 {percentile(values, 0.5):7.1f}ms p95 {percentile(values, 0.95):7.1f}ms"
+        for kind, values in latencies.items()
+    )
+    print(f"{mode:>10}  {elapsed:6.2f}s  {summary}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--generations", type=int, default=8)
+    parser.add_argument("--db-requests", type=int, default=400)
+    parser.add_argument("--db-rate", type=float, default=200)
+    parser.add_argument("--llm-seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="concurrency-benchmark-")
+    os.environ["DATABASE_PATH"] = os.path.join(scratch, "polls.db")
+    os.environ["ACTIVITY_LOG_PATH"] = os.path.join(scratch, "user_activity.log")
+    os.environ["OPENAI_API_KEY"] = ""
+    logging.disable(logging.CRITICAL)
+    import main as app_main
+
+    print(f"{args.generations} generations ({args.llm_seconds}s each) alongside {args.db_requests} DB-bound "
+          f"requests at {args.db_rate:.0f}/s, {os.cpu_count()} CPUs")
+    offloaded_run_db = app_main.run_db
+    for mode in MODES:
+        asyncio.run(run_mode(app_main, mode, args, offloaded_run_db))
+    app_main.db_pool.close_all()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
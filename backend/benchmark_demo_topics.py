@@ -0,0 +1,97 @@
+"""Benchmark demo topic generation and serialization.
+
+Compares the precomputed templates (statements validated once, JSON fragments pre-rendered)
+with validating every statement and encoding the response per request, as the demo path did
+before the templates and as FastAPI does for a returned model.
+
+    python benchmark_demo_topics.py --number 20000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+def validate_per_request(app_main, request):
+    """The pre-template path: build and validate the topic from the raw demo dicts"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    generator = app_main.topic_generator
+    domain = generator.resolve_domain(request)
+    topic_data = generator.demo_topics[domain]
+    location = request.community_context.location
+    statements = [
+        app_main.Statement(text=stmt["text"], category=stmt["category"], expected_cluster=stmt["expected_cluster"])
+        for stmt in topic_data["statements"][:request.statement_count]
+    ]
+    topic = app_main.GeneratedTopic(
+        title=f"{location} {topic_data['title']}",
+        description=f"{topic_data['description']} in {location}",
+        main_theme=topic_data["main_theme"],
+        statements=statements,
+        expected_clusters=generator.demo_clusters[domain],
+        metadata={
+            "generated_at": datetime.now().isoformat(),
+            "community_location": location,
+            "statement_count": len(statements),
+            "language": request.language,
+            "generation_method": "demo",
+            "domain": domain
+        }
+    )
+    return JSONResponse(content=jsonable_encoder(topic)).body
+
+async def from_template(app_main, request):
+    generator = app_main.topic_generator
+    return generator.topic_json(await generator.generate_topic(request))
+
+async def per_call_us(func, number: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            await func()
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+async def run(args, app_main):
+    print(f"{'statements':>10} {'validate per request':>22} {'template':>12} {'speed-up':>9}")
+    for statement_count in (4, 10):
+        request = app_main.TopicRequest(
+            community_context=app_main.CommunityContext(location="Springfield"),
+            topic_domain="housing",
+            statement_count=statement_count
+        )
+
+        async def before():
+            return validate_per_request(app_main, request)
+
+        async def after():
+            return await from_template(app_main, request)
+
+        before_us = await per_call_us(before, args.number, args.repeat)
+        after_us = await per_call_us(after, args.number, args.repeat)
+        print(f"{statement_count:>10} {before_us:20.1f}us {after_us:10.1f}us {before_us / after_us:8.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="demo-benchmark-")
+    os.environ["DATABASE_PATH"] = os.path.join(scratch, "polls.db")
+    os.environ["ACTIVITY_LOG_PATH"] = os.path.join(scratch, "user_activity.log")
+    logging.disable(logging.CRITICAL)
+    import main as app_main
+
+    asyncio.run(run(args, app_main))
+    app_main.db_pool.close_all()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
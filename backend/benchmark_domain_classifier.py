@@ -0,0 +1,69 @@
+"""Micro-benchmark of demo-domain classification from community issues.
+
+Compares KeywordDomainClassifier.rank() with substring matching of the same keywords, both
+as the old first-match check over three domains and scoring every domain, on issue lists
+that match early, match late and do not match at all.
+
+    python benchmark_domain_classifier.py --number 20000
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import timeit
+
+ISSUE_SETS = {
+    "early match": ["Rising rents, potholes on main roads, school funding cuts, police response times"],
+    "late match": ["Residents want more community events for youth, longer library hours and slow broadband"],
+    "no match": ["Residents want more community events and parks for youth, better library hours, and cleaner beaches"],
+    "long (x20)": ["Residents want more community events for youth and slow broadband"] * 20,
+}
+
+def substring_first_match(domain_keywords, domains):
+    """The pre-trie check: the first domain with any keyword as a substring wins"""
+    def classify(issues):
+        text = " ".join(issues).lower()
+        for domain in domains:
+            if any(keyword in text for keyword in domain_keywords[domain]):
+                return domain
+        return "housing"
+    return classify
+
+def substring_all_domains(domain_keywords):
+    """Substring matching that scores every domain, as rank() does"""
+    def classify(issues):
+        text = " ".join(issues).lower()
+        scores = {domain: sum(keyword in text for keyword in keywords) for domain, keywords in domain_keywords.items()}
+        return max(scores, key=scores.get) if any(scores.values()) else "housing"
+    return classify
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="classifier-benchmark-")
+    os.environ["DATABASE_PATH"] = os.path.join(scratch, "polls.db")
+    os.environ["ACTIVITY_LOG_PATH"] = os.path.join(scratch, "user_activity.log")
+    logging.disable(logging.CRITICAL)
+    import main as app_main
+
+    classifiers = {
+        "substring, 3 domains": substring_first_match(app_main.DOMAIN_KEYWORDS, app_main.DOMAIN_PRIORITY),
+        "substring, all domains": substring_all_domains(app_main.DOMAIN_KEYWORDS),
+        "keyword trie": app_main.topic_generator.determine_domain_from_issues,
+    }
+    print(f"{'issues':<14}" + "".join(f"{name:>24}" for name in classifiers))
+    for label, issues in ISSUE_SETS.items():
+        row = f"{label:<14}"
+        for classify in classifiers.values():
+            best = min(timeit.repeat(lambda: classify(issues), number=args.number, repeat=args.repeat))
+            row += f"{best / args.number * 1e6:22.2f}us"
+        print(row)
+    app_main.db_pool.close_all()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
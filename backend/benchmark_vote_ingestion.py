@@ -0,0 +1,92 @@
+"""Benchmark sustained vote ingestion in direct and queue modes.
+
+Each mode runs in its own process against a fresh database (VOTE_INGESTION_MODE is read when
+main is imported): a poll is saved, then --submissions full ballots are posted through the
+ASGI app with --concurrency requests in flight. Reports submissions/s, votes/s and request
+latency percentiles.
+
+    python benchmark_vote_ingestion.py --submissions 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("direct", "queue")
+
+async def run_mode(args):
+    logging.disable(logging.CRITICAL)
+    import httpx
+    import main
+
+    await main.startup_event()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        topic = (await client.post("/generate-topic", json={
+            "community_context": {"location": "Benchmark City", "current_issues": ["housing"]}
+        })).json()
+        poll_id = (await client.post("/save-poll", json={"topic": topic})).json()["poll_id"]
+        statement_count = len(topic["statements"])
+        answers = ("agree", "disagree", "skip")
+
+        in_flight = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def submit(index: int):
+            ballot = {
+                "poll_id": poll_id,
+                "participant_name": f"participant-{index}",
+                "responses": [
+                    {"statementIndex": j, "response": answers[(index + j) % 3]} for j in range(statement_count)
+                ]
+            }
+            async with in_flight:
+                started = time.perf_counter()
+                response = await client.post(f"/poll/{poll_id}/responses", json=ballot)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(submit(index) for index in range(args.submissions)))
+        # Queue mode acknowledges on enqueue; the clock stops once shutdown has drained it
+        await main.shutdown_event()
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    print(f"{main.VOTE_INGESTION_MODE:>8}  {args.submissions / elapsed:8.0f} submissions/s  "
+          f"{args.submissions * statement_count / elapsed:9.0f} votes/s  "
+          f"p50 {percentile(0.5):6.1f}ms  p99 {percentile(0.99):6.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--mode", choices=MODES, help="run one mode in this process")
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(run_mode(args))
+        return
+
+    print(f"{args.submissions} submissions, {args.concurrency} concurrent, {os.cpu_count()} CPUs")
+    for mode in MODES:
+        with tempfile.TemporaryDirectory() as scratch:
+            env = {
+                **os.environ,
+                "VOTE_INGESTION_MODE": mode,
+                "DATABASE_PATH": os.path.join(scratch, "polls.db"),
+                "ACTIVITY_LOG_PATH": os.path.join(scratch, "user_activity.log"),
+                "OPENAI_API_KEY": ""
+            }
+            subprocess.run([
+                sys.executable, os.path.abspath(__file__), "--mode", mode,
+                "--submissions", str(args.submissions), "--concurrency", str(args.concurrency)
+            ], env=env, cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark the NumPy vote-matrix analysis against loop-based aggregation.
+
+Fills a fresh database with synthetic polls of each --participants size, then computes the
+same per-statement counts, consensus, divisiveness and statement correlations two ways:
+iterating over the poll_responses rows in Python, and fetch_vote_matrix() + analyze_votes().
+
+    python benchmark_vote_matrix.py --participants 1000 10000 100000 --statements 10
+"""
+import argparse
+import logging
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+
+def fill_poll(app_main, poll_id: str, participants: int, statements: int, seed: int = 0):
+    rng = random.Random(seed)
+
+    def rows():
+        for participant in range(participants):
+            session_id = f"{poll_id}-{participant}"
+            bias = rng.random()
+            for statement in range(statements):
+                leaning = bias if statement % 2 else 1 - bias
+                response = "agree" if rng.random() < leaning else ("disagree" if rng.random() < 0.85 else "skip")
+                yield poll_id, None, statement, response, "2024-01-01T00:00:00", session_id
+
+    with app_main.get_db_connection() as conn:
+        with app_main.write_transaction(conn):
+            conn.executemany("""
+                INSERT INTO poll_responses
+                (poll_id, participant_name, statement_index, response, timestamp, participant_session_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows())
+
+def loop_analysis(app_main, poll_id: str, statements: int):
+    """Per-statement tallies and pairwise correlations from the rows, one Python loop at a time"""
+    with app_main.get_db_connection() as conn:
+        rows = conn.execute("""
+            SELECT participant_session_id, statement_index, response FROM poll_responses WHERE poll_id = ?
+        """, (poll_id,)).fetchall()
+
+    values = {"agree": 1, "disagree": -1, "skip": 0}
+    participants = {}
+    agree, disagree, seen = [0] * statements, [0] * statements, [0] * statements
+    for row in rows:
+        vote = values[row['response']]
+        participants.setdefault(row['participant_session_id'], [0] * statements)[row['statement_index']] = vote
+        seen[row['statement_index']] += 1
+        if vote == 1:
+            agree[row['statement_index']] += 1
+        elif vote == -1:
+            disagree[row['statement_index']] += 1
+
+    consensus, divisiveness = [], []
+    for index in range(statements):
+        cast = agree[index] + disagree[index]
+        consensus.append((agree[index] - disagree[index]) / cast if cast else math.nan)
+        divisiveness.append((1 - abs(consensus[-1])) * cast / seen[index] if cast else math.nan)
+
+    count = len(participants)
+    sums, products = [0] * statements, [[0] * statements for _ in range(statements)]
+    for votes in participants.values():
+        for a in range(statements):
+            sums[a] += votes[a]
+            for b in range(a, statements):
+                products[a][b] += votes[a] * votes[b]
+    covariance = [[products[min(a, b)][max(a, b)] - sums[a] * sums[b] / count for b in range(statements)]
+                  for a in range(statements)]
+    correlations = [
+        [covariance[a][b] / math.sqrt(covariance[a][a] * covariance[b][b]) for b in range(statements)]
+        for a in range(statements)
+    ]
+    return consensus, divisiveness, correlations
+
+def matrix_analysis(app_main, poll_id: str, statements: int):
+    _, matrix, _ = app_main.fetch_vote_matrix(poll_id, statements)
+    return app_main.opinion_analysis.analyze_votes(matrix)
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--statements", type=int, default=10)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="vote-matrix-benchmark-")
+    os.environ["DATABASE_PATH"] = os.path.join(scratch, "polls.db")
+    os.environ["ACTIVITY_LOG_PATH"] = os.path.join(scratch, "user_activity.log")
+    logging.disable(logging.CRITICAL)
+    import main as app_main
+
+    print(f"{'participants':>12} {'loops':>9} {'matrix':>9} {'(load':>8} {'analyze)':>9} {'speed-up':>9}")
+    for participants in args.participants:
+        poll_id = f"benchmark-{participants}"
+        fill_poll(app_main, poll_id, participants, args.statements)
+
+        loop_seconds, (consensus, _, correlations) = timed(loop_analysis, app_main, poll_id, args.statements)
+        load_seconds, (_, matrix, _) = timed(app_main.fetch_vote_matrix, poll_id, args.statements)
+        analyze_seconds, analysis = timed(app_main.opinion_analysis.analyze_votes, matrix)
+        matrix_seconds = load_seconds + analyze_seconds
+
+        # Both ways must agree before their timings mean anything
+        assert [statement["consensus"] for statement in analysis["statements"]] == [round(value, 3) for value in consensus]
+        assert analysis["correlations"][0][1] == round(correlations[0][1], 3)
+
+        print(f"{participants:>12} {loop_seconds * 1000:7.0f}ms {matrix_seconds * 1000:7.0f}ms "
+              f"{load_seconds * 1000:6.0f}ms {analyze_seconds * 1000:7.1f}ms {loop_seconds / matrix_seconds:8.1f}x")
+
+    app_main.db_pool.close_all()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Process-pool compute tier for CPU-bound vote-matrix analysis.
+
+A vote matrix travels to a worker process through one shared-memory block instead of being
+pickled, and only the (small) result comes back. Workers are spawned fresh rather than
+forked, so they inherit no event loop, threads or SQLite connections; they import NumPy
+and opinion_analysis and are warmed up when the pool starts.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, NamedTuple, Optional
+
+import numpy as np
+
+import opinion_analysis
+from opinion_analysis import VoteMatrix
+
+logger = logging.getLogger(__name__)
+
+class SharedMatrixSpec(NamedTuple):
+    """Where a worker finds a VoteMatrix: a (2, participants, statements) int8 block of
+    votes followed by answered flags"""
+    name: str
+    participants: int
+    statements: int
+
+def share_matrix(matrix: VoteMatrix):
+    """Copy a VoteMatrix into a new shared-memory block; returns (SharedMemory, SharedMatrixSpec)"""
+    participants, statements = matrix.votes.shape
+    block = shared_memory.SharedMemory(create=True, size=max(1, 2 * participants * statements))
+    view = np.ndarray((2, participants, statements), dtype=np.int8, buffer=block.buf)
+    view[0] = matrix.votes
+    view[1] = matrix.answered
+    del view
+    return block, SharedMatrixSpec(block.name, participants, statements)
+
+def release_shared(block: shared_memory.SharedMemory):
+    block.close()
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass
+
+def run_on_shared_matrix(spec: SharedMatrixSpec, func, args: tuple, kwargs: Dict[str, Any]):
+    """Worker side: attach the shared matrix and call func(matrix, *args, **kwargs).
+    
+    func must return new arrays or plain values, never views of the matrix, since the block
+    is detached as soon as it returns.
+    """
+    # Workers share the parent's resource tracker, so attaching here does not take ownership
+    # of the block: the parent unlinks it once the task is done
+    block = shared_memory.SharedMemory(name=spec.name)
+    try:
+        view = np.ndarray((2, spec.participants, spec.statements), dtype=np.int8, buffer=block.buf)
+        matrix = VoteMatrix(view[0], view[1].view(np.bool_))
+        try:
+            return func(matrix, *args, **kwargs)
+        finally:
+            del matrix, view
+    finally:
+        block.close()
+
+def warm_up() -> int:
+    """Import and exercise the analysis code once so a worker's first real task runs at full speed"""
+    votes = np.array([[1, -1, 0], [-1, 1, 1], [1, 1, -1], [0, -1, 1]], dtype=np.int8)
+    matrix = VoteMatrix(votes, votes != 0)
+    opinion_analysis.analyze_votes(matrix)
+    opinion_analysis.opinion_groups(matrix, [0, 1, -1], 2, k=2)
+    return os.getpid()
+
+class ComputeTimeoutError(Exception):
+    pass
+
+class ComputePool:
+    """ProcessPoolExecutor for functions of a VoteMatrix, with shared-memory hand-off.
+    
+    run() waits at most timeout_seconds for a result. A timed-out task cannot be interrupted
+    and keeps its worker busy until it finishes, but a task still queued behind it is
+    cancelled. A pool broken by a crashed worker is replaced on the next call.
+    """
+    
+    def __init__(self, workers: int, timeout_seconds: float, start_method: str = "spawn"):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "timeouts": 0, "restarts": 0,
+            "warm_workers": 0, "shared_bytes": 0, "compute_ms_total": 0.0
+        }
+    
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+    
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context(self.start_method)
+        )
+    
+    async def start(self, warm_timeout_seconds: float = 60):
+        """Create the pool and start every worker up front by running warm_up() on each"""
+        self._executor = self._new_executor()
+        loop = asyncio.get_running_loop()
+        # Submitting one task per worker at once makes the executor spawn them all
+        warming = [loop.run_in_executor(self._executor, warm_up) for _ in range(self.workers)]
+        try:
+            pids = await asyncio.wait_for(asyncio.gather(*warming), warm_timeout_seconds)
+            self._stats["warm_workers"] = len(set(pids))
+        except Exception as e:
+            logger.warning(f"Compute pool warm-up incomplete: {str(e)}")
+    
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _restart(self, broken: ProcessPoolExecutor):
+        # Every task in flight on a broken pool fails at once; only the first caller replaces it,
+        # later ones must not shut down the replacement and cancel the tasks already on it
+        if self._executor is not broken:
+            return
+        logger.warning("Compute pool broken by a crashed worker; starting a new pool")
+        self._stats["restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+        for _ in range(self.workers):
+            self._executor.submit(warm_up)
+    
+    async def run(self, func, matrix: VoteMatrix, *args, **kwargs):
+        """Run func(matrix, *args, **kwargs) in a worker process and await its result"""
+        executor = self._executor
+        block, spec = share_matrix(matrix)
+        try:
+            future = executor.submit(run_on_shared_matrix, spec, func, args, kwargs)
+        except BrokenProcessPool:
+            release_shared(block)
+            self._restart(executor)
+            raise
+        # Released when the worker is done with it, which can be after a timeout
+        future.add_done_callback(lambda _: release_shared(block))
+        self._stats["submitted"] += 1
+        self._stats["shared_bytes"] += block.size
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise ComputeTimeoutError(f"{getattr(func, '__qualname__', func)} took longer than {self.timeout_seconds}s")
+        except BrokenProcessPool:
+            self._stats["failed"] += 1
+            self._restart(executor)
+            raise
+        except Exception:
+            self._stats["failed"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+        self._stats["completed"] += 1
+        self._stats["compute_ms_total"] += (time.perf_counter() - started) * 1000
+        return result
+    
+    def metrics(self) -> Dict[str, Any]:
+        completed = self._stats["completed"]
+        return {
+            "running": self.running,
+            "workers": self.workers if self.running else 0,
+            "start_method": self.start_method,
+            "in_flight": self._in_flight,
+            "timeout_seconds": self.timeout_seconds,
+            "avg_compute_ms": round(self._stats["compute_ms_total"] / completed, 1) if completed else None,
+            **{name: value for name, value in self._stats.items() if name != "compute_ms_total"}
+        }
@@ -1,15 +1,29 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, Dict, Any, NamedTuple
+import asyncio
+import functools
+import hashlib
 import json
 import logging
+import queue
+import random
+import re
 from datetime import datetime
+from types import MappingProxyType
 import os
 import sqlite3
+import threading
+import time
 import uuid
-from contextlib import contextmanager
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+from contextlib import aclosing, contextmanager
+from openai import AsyncOpenAI
+import compute_pool
+import opinion_analysis
 
 
 app = FastAPI(title="Community Polling Topic Generator", version="1.0.0")
@@ -31,32 +45,168 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Activity tracking
-import json
-from datetime import datetime
-import os
+ACTIVITY_LOG_PATH = os.getenv("ACTIVITY_LOG_PATH", "user_activity.log")
+ACTIVITY_LOG_QUEUE_SIZE = int(os.getenv("ACTIVITY_LOG_QUEUE_SIZE", "10000"))
+ACTIVITY_LOG_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", "500"))
+ACTIVITY_LOG_FLUSH_INTERVAL_MS = int(os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL_MS", "200"))
+ACTIVITY_LOG_MAX_BYTES = int(os.getenv("ACTIVITY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+ACTIVITY_LOG_BACKUP_COUNT = int(os.getenv("ACTIVITY_LOG_BACKUP_COUNT", "5"))
+ACTIVITY_STORE_ENABLED = os.getenv("ACTIVITY_STORE_ENABLED", "true").lower() == "true"
+ACTIVITY_RETENTION_DAYS = int(os.getenv("ACTIVITY_RETENTION_DAYS", "90"))
 
-def log_user_activity(activity_type: str, details: Dict[str, Any], request_ip: str = "unknown"):
-    """Log user activity for analytics"""
-    activity = {
-        "timestamp": datetime.now().isoformat(),
-        "activity_type": activity_type,
-        "details": details,
-        "request_ip": request_ip
-    }
+class ActivityLogSink:
+    """Non-blocking activity sink.
+    
+    Callers only enqueue; a background thread serializes events in batches, logs them and
+    appends them to one long-lived buffered file handle, rotating by size. When the queue is
+    full events are dropped and counted instead of blocking the request.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, path: str, write_file: bool):
+        self.path = path
+        self.write_file = write_file
+        self._queue = queue.Queue(maxsize=ACTIVITY_LOG_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._file = None
+        # Request threads count accepted/dropped while the sink thread counts the rest
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "accepted": 0,
+            "dropped": 0,
+            "written": 0,
+            "batches": 0,
+            "rotations": 0,
+            "write_errors": 0,
+            "stored": 0,
+            "store_errors": 0
+        }
+    
+    def emit(self, activity: Dict[str, Any]):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(activity)
+            self._count("accepted")
+        except queue.Full:
+            self._count("dropped")
     
-    # Log to console (will be captured by deployment platforms)
-    logger.info(f"USER_ACTIVITY: {json.dumps(activity)}")
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
     
-    # Optionally write to file for local development
-    if os.getenv("ENVIRONMENT") != "production":
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        flush_interval = ACTIVITY_LOG_FLUSH_INTERVAL_MS / 1000
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self._queue.get(timeout=flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < ACTIVITY_LOG_BATCH_SIZE and batch[-1] is not self._STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is self._STOP:
+                batch.pop()
+                stopping = True
+            if batch:
+                self._write_batch(batch)
+        self._close_file()
+    
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        lines = [json.dumps(activity) for activity in batch]
+        
+        # Log to console (will be captured by deployment platforms)
+        for line in lines:
+            logger.info(f"USER_ACTIVITY: {line}")
+        self._count("batches")
+        self._count("written", len(lines))
+        
+        # Typed copy for the analytics endpoints
+        if ACTIVITY_STORE_ENABLED:
+            try:
+                activity_store.append(batch)
+                self._count("stored", len(batch))
+            except Exception as e:
+                self._count("store_errors")
+                logger.warning(f"Failed to store activity events: {e}")
+        
+        # Optionally write to file for local development
+        if not self.write_file:
+            return
         try:
-            with open("user_activity.log", "a") as f:
-                f.write(f"{json.dumps(activity)}\n")
+            if self._file is None:
+                self._file = open(self.path, "a", buffering=64 * 1024)
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            if self._file.tell() >= ACTIVITY_LOG_MAX_BYTES:
+                self._rotate()
         except Exception as e:
+            self._count("write_errors")
             logger.warning(f"Failed to write activity log: {e}")
+    
+    def _rotate(self):
+        self._close_file()
+        for index in range(ACTIVITY_LOG_BACKUP_COUNT - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if ACTIVITY_LOG_BACKUP_COUNT > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._count("rotations")
+    
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def close(self, timeout: float = 5.0):
+        """Write out everything queued so far and stop the writer thread"""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Activity log queue still full at shutdown")
+        thread.join(timeout)
+        self._thread = None
+    
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "write_file": self.write_file,
+            **stats
+        }
+
+activity_sink = ActivityLogSink(ACTIVITY_LOG_PATH, write_file=os.getenv("ENVIRONMENT") != "production")
+
+def log_user_activity(activity_type: str, details: Dict[str, Any], request_ip: str = "unknown"):
+    """Log user activity for analytics (non-blocking; see ActivityLogSink)"""
+    activity_sink.emit({
+        "timestamp": datetime.now().isoformat(),
+        "activity_type": activity_type,
+        "details": details,
+        "request_ip": request_ip
+    })
 
 # OpenAI setup - set your API key as environment variable
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY")) if os.getenv("OPENAI_API_KEY") else None
+openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")) if os.getenv("OPENAI_API_KEY") else None
 
 # Database setup for poll sharing - try multiple persistent paths
 if os.getenv("RAILWAY_ENVIRONMENT") or os.getenv("RAILWAY_PROJECT_ID"):
@@ -101,29 +251,176 @@ async def startup_event():
         logger.info(f"Database file size: {os.path.getsize(DATABASE_PATH)} bytes")
     logger.info(f"Current working directory: {os.getcwd()}")
     logger.info(f"Directory contents: {os.listdir('.')}")
+    if VOTE_INGESTION_MODE == "queue":
+        vote_queue.start()
+        logger.info("Vote ingestion mode: write-behind queue")
+    if PREGEN_ENABLED and openai_client:
+        await topic_pregen.start()
+        logger.info("Topic pre-generation enabled")
+    if COMPUTE_WORKERS > 0:
+        await compute_executor.start()
+        logger.info(f"Compute pool: {COMPUTE_WORKERS} {COMPUTE_START_METHOD} workers, {compute_executor.metrics()['warm_workers']} warm")
+    if ANALYTICS_WORKERS > 0:
+        await analytics_scheduler.start()
+        logger.info(f"Analytics job workers: {ANALYTICS_WORKERS}")
     logger.info(f"=== END STARTUP ===")
 
 @app.on_event("shutdown") 
 async def shutdown_event():
-    """Log database status on shutdown"""
+    """Drain pooled connections and log database status on shutdown"""
     logger.info(f"=== APPLICATION SHUTDOWN ===")
+    await vote_queue.stop()
+    await topic_pregen.stop()
+    await analytics_scheduler.stop()
+    compute_executor.stop()
+    results_broadcaster.close()
+    activity_sink.close()
+    db_pool.close_all()
     logger.info(f"Database file exists: {os.path.exists(DATABASE_PATH)}")
     if os.path.exists(DATABASE_PATH):
         logger.info(f"Database file size: {os.path.getsize(DATABASE_PATH)} bytes")
     logger.info(f"=== END SHUTDOWN ===")
 
-@contextmanager
+# SQLite connection tuning - applied once per pooled connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024)))
+
+class SQLiteConnectionPool:
+    """Hands out one long-lived, pre-configured connection per thread.
+    
+    Connections run in WAL mode so results reads no longer wait behind vote writes.
+    """
+    
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._generation = 0
+        self._active = 0
+        self._stats = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "rollbacks_on_release": 0
+        }
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False  # only so close_all() can drain from the shutdown thread
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+    
+    def _acquire(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+        
+        conn = self._open_connection()
+        thread_id = threading.get_ident()
+        with self._lock:
+            # Drop connections left behind by threads that have exited
+            live_threads = {thread.ident for thread in threading.enumerate()}
+            for stale_id in [tid for tid in self._connections if tid not in live_threads]:
+                self._connections.pop(stale_id).close()
+                self._stats["connections_closed"] += 1
+            self._connections[thread_id] = conn
+            self._stats["connections_opened"] += 1
+        
+        self._local.conn = conn
+        self._local.generation = self._generation
+        self._local.depth = 0
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        self._local.depth += 1
+        with self._lock:
+            self._active += 1
+            self._stats["checkouts"] += 1
+        try:
+            yield conn
+        finally:
+            self._local.depth -= 1
+            # Never hand a half-finished transaction to the next user of this thread's connection
+            if self._local.depth == 0 and conn.in_transaction:
+                conn.rollback()
+                with self._lock:
+                    self._stats["rollbacks_on_release"] += 1
+            with self._lock:
+                self._active -= 1
+    
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "database_path": self.database_path,
+                "open_connections": len(self._connections),
+                "active_checkouts": self._active,
+                **self._stats
+            }
+    
+    def close_all(self):
+        """Checkpoint the WAL and close every pooled connection"""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._generation += 1
+        
+        for index, conn in enumerate(connections):
+            try:
+                if index == 0:
+                    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                conn.close()
+            except Exception as e:
+                logger.warning(f"Failed to close pooled connection: {e}")
+        
+        with self._lock:
+            self._stats["connections_closed"] += len(connections)
+        logger.info(f"Drained {len(connections)} pooled database connections")
+
+db_pool = SQLiteConnectionPool(DATABASE_PATH)
+
 def get_db_connection():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """Context manager yielding this thread's pooled database connection"""
+    return db_pool.connection()
+
+# All blocking sqlite3 work from request handlers runs on this executor, never on the event loop
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "8"))
+db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="sqlite")
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database function on the DB executor and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+@contextmanager
+def write_transaction(conn):
+    """Run a block as one IMMEDIATE transaction: commit on success, roll back on any error.
+    
+    BEGIN IMMEDIATE takes the database write lock up front, so read-then-write sequences
+    (such as a retake lookup followed by its delete) cannot interleave with another writer.
+    """
+    conn.execute("BEGIN IMMEDIATE")
     try:
         yield conn
-    finally:
-        conn.close()
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
 
 def init_database():
-    """Initialize the database with required tables"""
+    """Bring the database schema up to date by applying pending migrations"""
     logger.info(f"Initializing database at: {DATABASE_PATH}")
     logger.info(f"Database absolute path: {os.path.abspath(DATABASE_PATH)}")
     logger.info(f"Directory exists: {os.path.exists(os.path.dirname(DATABASE_PATH))}")
@@ -131,36 +428,14 @@ def init_database():
     
     try:
         with get_db_connection() as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS shared_polls (
-                    poll_id TEXT PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    main_theme TEXT NOT NULL,
-                    statements TEXT NOT NULL,
-                    expected_clusters TEXT NOT NULL,
-                    metadata TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    creator_name TEXT
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS poll_responses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    poll_id TEXT NOT NULL,
-                    participant_name TEXT,
-                    statement_index INTEGER NOT NULL,
-                    response TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    participant_session_id TEXT,
-                    FOREIGN KEY (poll_id) REFERENCES shared_polls (poll_id)
-                )
-            """)
-            
-            conn.commit()
+            apply_migrations(conn)
             logger.info("Database initialized successfully")
             
+            # Guard against hot queries regressing to full table scans
+            full_scans = find_full_table_scans(conn)
+            if full_scans:
+                logger.error(f"Hot queries are doing full table scans: {full_scans}")
+            
             # Check if database file exists after creation
             if os.path.exists(DATABASE_PATH):
                 file_size = os.path.getsize(DATABASE_PATH)
@@ -172,6 +447,609 @@ def init_database():
         logger.error(f"Failed to initialize database: {str(e)}")
         raise
 
+def resolve_statement_clusters(statement_labels: List[str], cluster_names: List[str]) -> List[int]:
+    """Map each statement's expected_cluster label to one index into expected_clusters.
+    
+    Match policy, first hit wins: exact name, then case-insensitive name, then substring in
+    either direction. Among several substring candidates the closest in length wins, ties go
+    to the earlier cluster. Unmatched statements map to -1.
+    """
+    folded_names = [name.strip().casefold() for name in cluster_names]
+    statement_clusters = []
+    for label in statement_labels:
+        if label in cluster_names:
+            statement_clusters.append(cluster_names.index(label))
+            continue
+        
+        folded_label = label.strip().casefold()
+        if folded_label in folded_names:
+            statement_clusters.append(folded_names.index(folded_label))
+            continue
+        
+        candidates = [
+            (abs(len(name) - len(folded_label)), index)
+            for index, name in enumerate(folded_names)
+            if folded_label and name and (folded_label in name or name in folded_label)
+        ]
+        statement_clusters.append(min(candidates)[1] if candidates else -1)
+    return statement_clusters
+
+def rebuild_response_tallies(conn):
+    """Recompute the tally tables from the full poll_responses log"""
+    conn.execute("DELETE FROM poll_statement_tallies")
+    # Counter rows are reset in place rather than deleted so per-poll response versions survive
+    conn.execute("UPDATE poll_participant_counts SET participant_count = 0, response_count = 0")
+    conn.execute("""
+        INSERT INTO poll_statement_tallies
+        (poll_id, statement_index, agree_count, disagree_count, skip_count, response_count)
+        SELECT poll_id, statement_index,
+               SUM(response = 'agree'), SUM(response = 'disagree'), SUM(response = 'skip'), COUNT(*)
+        FROM poll_responses
+        GROUP BY poll_id, statement_index
+    """)
+    conn.execute("""
+        INSERT INTO poll_participant_counts (poll_id, participant_count, response_count)
+        SELECT poll_id, COUNT(DISTINCT participant_session_id), COUNT(*)
+        FROM poll_responses
+        WHERE true
+        GROUP BY poll_id
+        ON CONFLICT(poll_id) DO UPDATE SET
+            participant_count = excluded.participant_count,
+            response_count = excluded.response_count
+    """)
+    logger.info("Rebuilt response tallies from poll_responses")
+
+def apply_response_tallies(conn, poll_id: str, responses: List[tuple], direction: int = 1):
+    """Add (direction=1) or remove (direction=-1) one participant's responses from the tally tables.
+    
+    `responses` is a list of (statement_index, response) pairs. Must be called on the same
+    connection and before the commit of the INSERT/DELETE it mirrors.
+    """
+    if not responses:
+        return
+    
+    deltas = {}
+    for statement_index, response in responses:
+        counts = deltas.setdefault(statement_index, [0, 0, 0, 0])
+        if response == 'agree':
+            counts[0] += 1
+        elif response == 'disagree':
+            counts[1] += 1
+        elif response == 'skip':
+            counts[2] += 1
+        counts[3] += 1
+    
+    conn.executemany("""
+        INSERT INTO poll_statement_tallies
+        (poll_id, statement_index, agree_count, disagree_count, skip_count, response_count)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(poll_id, statement_index) DO UPDATE SET
+            agree_count = agree_count + excluded.agree_count,
+            disagree_count = disagree_count + excluded.disagree_count,
+            skip_count = skip_count + excluded.skip_count,
+            response_count = response_count + excluded.response_count
+    """, [
+        (poll_id, statement_index, *(direction * count for count in counts))
+        for statement_index, counts in deltas.items()
+    ])
+    
+    conn.execute("""
+        INSERT INTO poll_participant_counts (poll_id, participant_count, response_count)
+        VALUES (?, ?, ?)
+        ON CONFLICT(poll_id) DO UPDATE SET
+            participant_count = participant_count + excluded.participant_count,
+            response_count = response_count + excluded.response_count
+    """, (poll_id, direction, direction * len(responses)))
+
+# Versioned schema migrations. Each runs once, in its own transaction, and is recorded in
+# schema_migrations. Never edit a migration that has shipped - append a new one instead.
+def migrate_initial_schema(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS shared_polls (
+            poll_id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            main_theme TEXT NOT NULL,
+            statements TEXT NOT NULL,
+            expected_clusters TEXT NOT NULL,
+            metadata TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            creator_name TEXT
+        )
+    """)
+    
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS poll_responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            poll_id TEXT NOT NULL,
+            participant_name TEXT,
+            statement_index INTEGER NOT NULL,
+            response TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            participant_session_id TEXT,
+            FOREIGN KEY (poll_id) REFERENCES shared_polls (poll_id)
+        )
+    """)
+
+def migrate_response_tallies(conn):
+    # Materialized per-statement tallies maintained by submit_poll_responses
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS poll_statement_tallies (
+            poll_id TEXT NOT NULL,
+            statement_index INTEGER NOT NULL,
+            agree_count INTEGER NOT NULL DEFAULT 0,
+            disagree_count INTEGER NOT NULL DEFAULT 0,
+            skip_count INTEGER NOT NULL DEFAULT 0,
+            response_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (poll_id, statement_index)
+        )
+    """)
+    
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS poll_participant_counts (
+            poll_id TEXT PRIMARY KEY,
+            participant_count INTEGER NOT NULL DEFAULT 0,
+            response_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    
+    rebuild_response_tallies(conn)
+
+def migrate_poll_response_indexes(conn):
+    # Retake lookup and check_participant_status: covers the MAX/ORDER BY timestamp too
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_poll_responses_poll_participant
+        ON poll_responses (poll_id, participant_name, timestamp)
+    """)
+    # Retake delete, debug grouping and per-poll scans (poll_id is the leading column)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_poll_responses_poll_session
+        ON poll_responses (poll_id, participant_session_id, statement_index, response)
+    """)
+    # /polls/stats and /debug/database "recent polls"
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_shared_polls_created_at
+        ON shared_polls (created_at)
+    """)
+
+def migrate_unique_session_statement(conn):
+    # Keep only the latest answer per (poll, session, statement) so the UNIQUE index can be built
+    conn.execute("""
+        DELETE FROM poll_responses
+        WHERE participant_session_id IS NOT NULL AND id NOT IN (
+            SELECT MAX(id) FROM poll_responses
+            GROUP BY poll_id, participant_session_id, statement_index
+        )
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_poll_responses_poll_session")
+    # UPSERT target for submit_poll_responses; also serves the retake delete and debug views
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_poll_responses_session_statement
+        ON poll_responses (poll_id, participant_session_id, statement_index)
+    """)
+    rebuild_response_tallies(conn)
+
+def migrate_response_versions(conn):
+    # Bumped once per committed submission; drives the results ETag
+    conn.execute("""
+        ALTER TABLE poll_participant_counts ADD COLUMN response_version INTEGER NOT NULL DEFAULT 0
+    """)
+
+def migrate_statement_cluster_index(conn):
+    # JSON int array: statement index -> expected_clusters index (-1 = no matching cluster)
+    conn.execute("ALTER TABLE shared_polls ADD COLUMN statement_clusters TEXT")
+    cursor = conn.execute("SELECT poll_id, statements, expected_clusters FROM shared_polls")
+    for row in cursor.fetchall():
+        try:
+            statement_clusters = resolve_statement_clusters(
+                [stmt["expected_cluster"] for stmt in json.loads(row['statements'])],
+                [cluster["name"] for cluster in json.loads(row['expected_clusters'])]
+            )
+        except Exception as e:
+            logger.warning(f"Could not index clusters for poll {row['poll_id']}: {e}")
+            continue
+        conn.execute("""
+            UPDATE shared_polls SET statement_clusters = ? WHERE poll_id = ?
+        """, (json.dumps(statement_clusters), row['poll_id']))
+
+def migrate_activity_events(conn):
+    # One typed row per activity event, partitioned into UTC-day segments for retention
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS activity_events (
+            id INTEGER PRIMARY KEY,
+            occurred_at REAL NOT NULL,
+            segment TEXT NOT NULL,
+            activity_type TEXT NOT NULL,
+            poll_id TEXT,
+            location TEXT,
+            method TEXT,
+            request_ip TEXT,
+            details TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_activity_events_type_time
+        ON activity_events (activity_type, occurred_at)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_activity_events_poll_time
+        ON activity_events (poll_id, occurred_at) WHERE poll_id IS NOT NULL
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_activity_events_segment
+        ON activity_events (segment)
+    """)
+    # Hourly rollup maintained on append; count queries never touch the raw events
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS activity_hourly_counts (
+            hour_start INTEGER NOT NULL,
+            activity_type TEXT NOT NULL,
+            poll_id TEXT NOT NULL DEFAULT '',
+            event_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (hour_start, activity_type, poll_id)
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_activity_hourly_counts_type
+        ON activity_hourly_counts (activity_type, hour_start)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_activity_hourly_counts_poll
+        ON activity_hourly_counts (poll_id, hour_start)
+    """)
+
+def migrate_topic_generation_cache(conn):
+    # Persistent tier of TopicGenerationCache so cached LLM topics survive restarts
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS topic_generation_cache (
+            fingerprint TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_topic_generation_cache_created_at
+        ON topic_generation_cache (created_at)
+    """)
+
+def migrate_vote_matrix_index(conn):
+    # Covers the per-participant vote packing query so loading a vote matrix never reads the table.
+    # Deliberately the same columns as idx_poll_responses_poll_session, which migration 4 dropped:
+    # its unique (poll_id, participant_session_id, statement_index) index serves the retake and
+    # debug lookups, but it lacks response, so the vote matrix query (checked in HOT_QUERIES)
+    # would read every row back from the table without this covering index.
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_poll_responses_vote_matrix
+        ON poll_responses (poll_id, participant_session_id, statement_index, response)
+    """)
+
+def migrate_analytics_jobs(conn):
+    # Background analytics: the job queue and the latest completed snapshot per poll and kind
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS analytics_jobs (
+            job_id INTEGER PRIMARY KEY,
+            poll_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            run_after REAL NOT NULL,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            response_version INTEGER,
+            last_error TEXT
+        )
+    """)
+    # At most one pending job per poll and kind; enqueueing again only raises its priority
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_jobs_pending
+        ON analytics_jobs (poll_id, kind) WHERE status = 'pending'
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_analytics_jobs_queue
+        ON analytics_jobs (status, priority, run_after)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_analytics_jobs_poll
+        ON analytics_jobs (poll_id, created_at)
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS analytics_snapshots (
+            poll_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            response_version INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            computed_at TEXT NOT NULL,
+            compute_ms REAL NOT NULL,
+            job_id INTEGER,
+            PRIMARY KEY (poll_id, kind)
+        )
+    """)
+
+SCHEMA_MIGRATIONS = [
+    (1, "initial_schema", migrate_initial_schema),
+    (2, "response_tallies", migrate_response_tallies),
+    (3, "poll_response_indexes", migrate_poll_response_indexes),
+    (4, "unique_session_statement", migrate_unique_session_statement),
+    (5, "response_versions", migrate_response_versions),
+    (6, "statement_cluster_index", migrate_statement_cluster_index),
+    (7, "activity_events", migrate_activity_events),
+    (8, "topic_generation_cache", migrate_topic_generation_cache),
+    (9, "vote_matrix_index", migrate_vote_matrix_index),
+    (10, "analytics_jobs", migrate_analytics_jobs),
+]
+
+def apply_migrations(conn):
+    """Apply every migration newer than the recorded schema version"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+    cursor = conn.execute("SELECT version FROM schema_migrations")
+    applied_versions = {row['version'] for row in cursor.fetchall()}
+    
+    for version, name, migrate in SCHEMA_MIGRATIONS:
+        if version in applied_versions:
+            continue
+        
+        logger.info(f"Applying schema migration {version}: {name}")
+        try:
+            with write_transaction(conn):
+                migrate(conn)
+                conn.execute("""
+                    INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)
+                """, (version, name, datetime.now().isoformat()))
+        except Exception:
+            logger.error(f"Schema migration {version} ({name}) failed")
+            raise
+
+def vote_matrix_sql(statement_count: int) -> str:
+    """One row per participant session: the session id, then column k+1 packs statements
+    31k..31k+30 at 2 bits each"""
+    per_word = opinion_analysis.STATEMENTS_PER_WORD
+    code = "CASE response " + " ".join(
+        f"WHEN '{response}' THEN {value}" for response, value in opinion_analysis.PACKED_CODES.items()
+    ) + " ELSE 0 END"
+    columns = ", ".join(
+        f"SUM(CASE WHEN statement_index / {per_word} = {word} "
+        f"THEN ({code}) << (2 * (statement_index % {per_word})) ELSE 0 END)"
+        for word in range(opinion_analysis.packed_word_count(statement_count))
+    )
+    return f"""
+        SELECT participant_session_id, {columns}
+        FROM poll_responses
+        WHERE poll_id = ? AND participant_session_id IS NOT NULL
+          AND statement_index BETWEEN 0 AND {statement_count - 1}
+        GROUP BY participant_session_id
+    """
+
+# Hot request-path queries that must always be served by an index. Checked at startup and
+# exposed on /debug/database so an index regression shows up before it shows up as latency.
+HOT_QUERIES = {
+    "participant_lookup": """
+        SELECT DISTINCT participant_session_id FROM poll_responses
+        WHERE poll_id = ? AND participant_name = ? ORDER BY timestamp DESC LIMIT 1
+    """,
+    "participant_status": """
+        SELECT COUNT(*), MAX(timestamp) FROM poll_responses WHERE poll_id = ? AND participant_name = ?
+    """,
+    "retake_responses": """
+        SELECT statement_index, response FROM poll_responses
+        WHERE poll_id = ? AND participant_session_id = ?
+    """,
+    "retake_delete": """
+        DELETE FROM poll_responses WHERE poll_id = ? AND participant_session_id = ?
+    """,
+    "statement_tallies": """
+        SELECT statement_index, agree_count, disagree_count, skip_count, response_count
+        FROM poll_statement_tallies WHERE poll_id = ?
+    """,
+    "debug_participants": """
+        SELECT participant_session_id, participant_name, COUNT(*), MIN(timestamp), MAX(timestamp)
+        FROM poll_responses WHERE poll_id = ? GROUP BY participant_session_id, participant_name
+    """,
+    "debug_responses": """
+        SELECT participant_session_id, participant_name, statement_index, response, timestamp
+        FROM poll_responses WHERE poll_id = ? ORDER BY participant_session_id, statement_index
+    """,
+    "recent_polls": """
+        SELECT poll_id, title, created_at FROM shared_polls ORDER BY created_at DESC LIMIT 5
+    """,
+    "vote_matrix": vote_matrix_sql(12),
+    "analytics_job_next": """
+        SELECT MIN(run_after) FROM analytics_jobs WHERE status = 'pending'
+    """,
+    "analytics_job_claim": """
+        SELECT job_id, poll_id, kind, attempts FROM analytics_jobs
+        WHERE status = 'pending' AND run_after <= ? ORDER BY priority DESC, run_after LIMIT 1
+    """,
+    "analytics_snapshots": """
+        SELECT kind, response_version, computed_at FROM analytics_snapshots WHERE poll_id = ?
+    """,
+}
+
+def find_full_table_scans(conn) -> Dict[str, List[str]]:
+    """Return EXPLAIN QUERY PLAN steps of HOT_QUERIES that scan a whole table"""
+    full_scans = {}
+    for name, sql in HOT_QUERIES.items():
+        placeholder_count = sql.count("?")
+        cursor = conn.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * placeholder_count)
+        scans = [
+            row['detail'] for row in cursor.fetchall()
+            if row['detail'].startswith("SCAN") and "USING" not in row['detail']
+        ]
+        if scans:
+            full_scans[name] = scans
+    return full_scans
+
+class ActivityEventStore:
+    """Typed, queryable copy of user activity events.
+    
+    Appended to in batches by the activity log writer thread. Events live in UTC-day segments
+    that are pruned after ACTIVITY_RETENTION_DAYS, and an hourly rollup keeps count queries
+    proportional to the number of hours asked for rather than the number of events.
+    """
+    
+    GROUP_BY_COLUMNS = {
+        "activity_type": "activity_type",
+        "poll_id": "poll_id",
+        "hour": "hour_start",
+        "day": "(hour_start / 86400) * 86400"
+    }
+    # The same buckets computed from raw events, for the partial hours at the ends of a window
+    EVENT_GROUP_BY_COLUMNS = {
+        "activity_type": "activity_type",
+        "poll_id": "COALESCE(poll_id, '')",
+        "hour": "(CAST(occurred_at AS INTEGER) / 3600) * 3600",
+        "day": "(CAST(occurred_at AS INTEGER) / 86400) * 86400"
+    }
+    
+    def __init__(self, retention_days: int):
+        self.retention_days = retention_days
+        self._current_segment: Optional[str] = None
+    
+    def append(self, batch: List[Dict[str, Any]]):
+        rows = []
+        hourly_counts: Dict[tuple, int] = {}
+        for activity in batch:
+            occurred_at = datetime.fromisoformat(activity["timestamp"]).timestamp()
+            details = activity.get("details") or {}
+            poll_id = details.get("poll_id")
+            rows.append((
+                occurred_at,
+                time.strftime("%Y-%m-%d", time.gmtime(occurred_at)),
+                activity["activity_type"],
+                poll_id,
+                details.get("location"),
+                details.get("method"),
+                activity.get("request_ip"),
+                json.dumps(details)
+            ))
+            key = (int(occurred_at // 3600) * 3600, activity["activity_type"], poll_id or "")
+            hourly_counts[key] = hourly_counts.get(key, 0) + 1
+        
+        with get_db_connection() as conn:
+            with write_transaction(conn):
+                conn.executemany("""
+                    INSERT INTO activity_events
+                    (occurred_at, segment, activity_type, poll_id, location, method, request_ip, details)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.executemany("""
+                    INSERT INTO activity_hourly_counts (hour_start, activity_type, poll_id, event_count)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(hour_start, activity_type, poll_id) DO UPDATE SET
+                        event_count = event_count + excluded.event_count
+                """, [(*key, count) for key, count in hourly_counts.items()])
+                
+                # Prune expired segments whenever a new day's segment starts
+                newest_segment = max(row[1] for row in rows)
+                if newest_segment != self._current_segment:
+                    self._current_segment = newest_segment
+                    self._prune(conn, rows[-1][0])
+    
+    def _prune(self, conn, now: float):
+        cutoff = now - self.retention_days * 86400
+        cutoff_segment = time.strftime("%Y-%m-%d", time.gmtime(cutoff))
+        conn.execute("DELETE FROM activity_events WHERE segment < ?", (cutoff_segment,))
+        conn.execute("DELETE FROM activity_hourly_counts WHERE hour_start < ?", (int(cutoff // 86400) * 86400,))
+    
+    def counts(self, group_by: str, activity_type: Optional[str], poll_id: Optional[str],
+               since: Optional[float], until: Optional[float]) -> List[Dict[str, Any]]:
+        """Event counts grouped by type, poll, hour or day over [since, until).
+        
+        Whole hours inside the window come from the hourly rollup and the partial hours at
+        either end are counted from the raw events, so the bounds are exact to the second.
+        """
+        filters, filter_params = [], []
+        if activity_type:
+            filters.append("activity_type = ?")
+            filter_params.append(activity_type)
+        if poll_id:
+            filters.append("poll_id = ?")
+            filter_params.append(poll_id)
+        
+        # Rollup hours are [first_hour, end_hour); the raw edges are what the window adds around them
+        first_hour = None if since is None else int(-(-since // 3600)) * 3600
+        end_hour = None if until is None else int(until // 3600) * 3600
+        within_one_hour = first_hour is not None and end_hour is not None and first_hour >= end_hour
+        edges = []
+        if within_one_hour:
+            edges.append((since, until))
+        else:
+            if since is not None and since < first_hour:
+                edges.append((since, first_hour))
+            if until is not None and end_hour < until:
+                edges.append((end_hour, until))
+        
+        totals: Dict[Any, int] = {}
+        with get_db_connection() as conn:
+            if not within_one_hour:
+                conditions, params = list(filters), list(filter_params)
+                if first_hour is not None:
+                    conditions.append("hour_start >= ?")
+                    params.append(first_hour)
+                if end_hour is not None:
+                    conditions.append("hour_start < ?")
+                    params.append(end_hour)
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                for row in conn.execute(f"""
+                    SELECT {self.GROUP_BY_COLUMNS[group_by]} as bucket, SUM(event_count) as count
+                    FROM activity_hourly_counts
+                    {where}
+                    GROUP BY bucket
+                """, params):
+                    totals[row['bucket']] = totals.get(row['bucket'], 0) + row['count']
+            
+            for start, end in edges:
+                # An edge lies within one hour, so within one day segment
+                for row in conn.execute(f"""
+                    SELECT {self.EVENT_GROUP_BY_COLUMNS[group_by]} as bucket, COUNT(*) as count
+                    FROM activity_events
+                    WHERE {' AND '.join(filters + ["segment = ?", "occurred_at >= ?", "occurred_at < ?"])}
+                    GROUP BY bucket
+                """, (*filter_params, time.strftime("%Y-%m-%d", time.gmtime(start)), start, end)):
+                    totals[row['bucket']] = totals.get(row['bucket'], 0) + row['count']
+        
+        return [{"bucket": bucket, "count": totals[bucket]} for bucket in sorted(totals)]
+    
+    def events(self, activity_type: Optional[str], poll_id: Optional[str],
+               since: Optional[float], until: Optional[float], limit: int) -> List[Dict[str, Any]]:
+        """Most recent raw events matching the filters"""
+        conditions, params = [], []
+        if activity_type:
+            conditions.append("activity_type = ?")
+            params.append(activity_type)
+        if poll_id:
+            conditions.append("poll_id = ?")
+            params.append(poll_id)
+        if since is not None:
+            conditions.append("occurred_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("occurred_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        with get_db_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT occurred_at, activity_type, poll_id, location, method, request_ip, details
+                FROM activity_events
+                {where}
+                ORDER BY occurred_at DESC
+                LIMIT ?
+            """, (*params, limit))
+            return [
+                {**dict(row), "details": json.loads(row['details'])}
+                for row in cursor.fetchall()
+            ]
+
+activity_store = ActivityEventStore(ACTIVITY_RETENTION_DAYS)
+
 # Initialize database on startup
 init_database()
 
@@ -201,6 +1079,9 @@ class TopicRequest(BaseModel):
     statement_count: int = 10
     language: str = "en"
 
+class BatchTopicRequest(BaseModel):
+    requests: List[TopicRequest]
+
 # Legacy support for old API format
 class GenerateTopicRequest(BaseModel):
     community_context: CommunityContext
@@ -238,6 +1119,207 @@ class PollResultsResponse(BaseModel):
     total_participants: int
     response_summary: Dict[str, Any]  # Aggregated response data
     cluster_analysis: List[Dict[str, Any]]
+    analytics: Dict[str, Dict[str, Any]] = {}  # kind -> last completed snapshot's version, computed_at, stale
+
+# Keyword vocabulary for picking a demo domain from free-text community issues
+DOMAIN_KEYWORDS = {
+    "housing": [
+        'housing', 'rent', 'affordable', 'development', 'zoning', 'homelessness',
+        'home', 'house', 'property', 'real estate', 'mortgage', 'landlord', 'tenant',
+        'apartment', 'condo', 'neighborhood', 'residential', 'gentrification',
+        'solar', 'energy', 'power', 'electricity', 'utilities', 'hvac', 'heating',
+        'cooling', 'insulation', 'renovation', 'construction', 'building'
+    ],
+    "education": [
+        'school', 'education', 'teacher', 'student', 'learning',
+        'classroom', 'curriculum', 'graduation', 'college', 'university',
+        'kindergarten', 'elementary', 'middle school', 'high school',
+        'academic', 'literacy', 'math', 'science', 'arts', 'sports',
+        'extracurricular', 'funding', 'budget', 'principal', 'administrator'
+    ],
+    "transportation": [
+        'transportation', 'transit', 'bus', 'train', 'subway', 'metro',
+        'car', 'vehicle', 'traffic', 'parking', 'road', 'highway',
+        'bike', 'bicycle', 'pedestrian', 'walkability', 'commute',
+        'rideshare', 'uber', 'lyft', 'taxi', 'scooter', 'infrastructure'
+    ],
+    "crime-public-safety": [
+        'crime', 'police', 'policing', 'public safety', 'safety', 'theft', 'burglary',
+        'violence', 'gun', 'shooting', 'drug', 'vandalism', 'assault', 'gang',
+        'noise', 'emergency response', 'security', 'homicide'
+    ],
+    "housing-affordability": [
+        'affordable housing', 'housing costs', 'cost of living', 'eviction', 'rent burden',
+        'rent control', 'rent increase', 'housing crisis', 'displacement', 'affordability'
+    ],
+    "infrastructure": [
+        'infrastructure', 'water', 'sewer', 'pothole', 'bridge', 'utilities', 'power outage',
+        'electricity', 'stormwater', 'flooding', 'drainage', 'streetlight', 'maintenance',
+        'public works', 'sidewalk', 'healthcare', 'hospital', 'clinic'
+    ],
+    "local-economy": [
+        'jobs', 'employment', 'unemployment', 'small business', 'business', 'economy',
+        'economic', 'downtown', 'retail', 'wages', 'workforce', 'tourism', 'main street'
+    ],
+    "traffic-school-safety": [
+        'school zone', 'crosswalk', 'crossing guard', 'speeding', 'school bus',
+        'safe routes', 'drop-off', 'pickup line', 'traffic safety'
+    ],
+    "property-taxes": [
+        'property tax', 'taxes', 'tax', 'assessment', 'millage', 'levy', 'tax rate'
+    ],
+    "digital-infrastructure": [
+        'broadband', 'internet', 'wifi', 'wi-fi', 'cell service', 'cell coverage', 'fiber',
+        'connectivity', 'digital divide', '5g'
+    ],
+    "student-housing-shortage": [
+        'student housing', 'dorm', 'dormitory', 'off-campus', 'student rental', 'campus housing'
+    ]
+}
+
+# Tie-break order; matches the order domains were checked in before scoring
+DOMAIN_PRIORITY = ["housing", "education", "transportation"]
+
+# Frontend domain values -> backend demo topic keys
+FRONTEND_DOMAIN_MAPPING = {
+    # Urban Community mappings
+    'crime-public-safety': 'crime-public-safety',
+    'housing-affordability': 'housing-affordability', 
+    'economic-development': 'local-economy',
+    'infrastructure-services': 'infrastructure',
+    'transportation': 'transportation',
+    
+    # Suburban Town mappings
+    'traffic-school-safety': 'traffic-school-safety',
+    'infrastructure-maintenance': 'infrastructure',
+    'school-quality': 'education',
+    'property-taxes': 'property-taxes',
+    'environmental-concerns': 'infrastructure',
+    
+    # Rural Area mappings
+    'digital-infrastructure': 'digital-infrastructure',
+    'healthcare-access': 'infrastructure',  # Could create specific healthcare domain later
+    'economic-opportunities': 'local-economy',
+    'aging-population': 'infrastructure',  # Could create specific aging services domain later
+    'infrastructure-decay': 'infrastructure',
+    
+    # University Town mappings
+    'student-housing-shortage': 'student-housing-shortage',
+    'town-gown-relations': 'local-economy',  # Could create specific domain later
+    'parking-transportation': 'transportation',
+    'noise-disruption': 'crime-public-safety',  # Maps to public safety
+    'economic-dependence': 'local-economy',
+    
+    # Direct mappings for backend keys
+    'housing': 'housing',
+    'education': 'education',
+    'local-economy': 'local-economy',
+    'infrastructure': 'infrastructure'
+}
+
+class KeywordDomainClassifier:
+    """Scores every domain against issue text in a single pass over its words.
+    
+    Keywords (with plural "s"/"es" forms) are compiled once into a word-level trie, so matches
+    fall on whole words only and each word costs a dict lookup. Hyphens split words on both
+    sides, so "after-school" matches "school" and "off-campus" matches "off campus". The
+    longest keyword wins where phrases overlap, and a keyword listed under several domains
+    splits its point between them.
+    """
+    
+    TOKEN_PATTERN = re.compile(r"\w+")
+    
+    def __init__(self, domain_keywords: Dict[str, List[str]], domains: List[str]):
+        self.domains = [domain for domain in DOMAIN_PRIORITY if domain in domains]
+        self.domains += [domain for domain in domains if domain not in self.domains]
+        self._order = {domain: position for position, domain in enumerate(self.domains)}
+        
+        keyword_domains: Dict[tuple, List[str]] = {}
+        for domain, keywords in domain_keywords.items():
+            if domain not in self._order:
+                continue
+            for keyword in keywords:
+                keyword_domains.setdefault(tuple(self.TOKEN_PATTERN.findall(keyword.lower())), []).append(domain)
+        
+        # Each trie node maps the next word to a child node; the None key holds the
+        # (domain, weight) pairs of a keyword ending there
+        self._trie: Dict[Any, Any] = {}
+        for words, matched in keyword_domains.items():
+            weights = tuple((domain, 1 / len(matched)) for domain in matched)
+            for last in (words[-1], words[-1] + "s", words[-1] + "es"):
+                node = self._trie
+                for word in words[:-1] + (last,):
+                    node = node.setdefault(word, {})
+                node.setdefault(None, weights)
+    
+    def rank(self, text: str) -> List[tuple]:
+        """(domain, score) pairs for every matching domain, best first"""
+        tokens = self.TOKEN_PATTERN.findall(text.lower())
+        trie = self._trie
+        scores: Dict[str, float] = {}
+        i, count = 0, len(tokens)
+        while i < count:
+            node = trie.get(tokens[i])
+            if node is None:
+                i += 1
+                continue
+            matched, width = node.get(None), 1
+            j = i + 1
+            while j < count:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if None in node:
+                    matched, width = node[None], j - i
+            if matched:
+                for domain, weight in matched:
+                    scores[domain] = scores.get(domain, 0.0) + weight
+            i += width
+        return sorted(
+            ((domain, round(score, 3)) for domain, score in scores.items()),
+            key=lambda item: (-item[1], self._order[item[0]])
+        )
+
+# JSON encoded the way FastAPI's JSONResponse renders it
+compact_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+class DemoStatement(Statement):
+    """A template statement; frozen because every demo topic built from the template shares it"""
+    model_config = ConfigDict(frozen=True)
+
+class DemoTemplate(NamedTuple):
+    """A demo topic validated once at startup, with its location-independent JSON pre-rendered"""
+    domain: str
+    title: str
+    description: str
+    main_theme: str
+    statements: tuple  # DemoStatement instances, shared by every topic built from this template
+    expected_clusters: tuple  # read-only cluster mappings, copied into each topic
+    statement_json: tuple  # one JSON fragment per statement
+    main_theme_json: str
+    expected_clusters_json: str
+
+def build_demo_template(domain: str, topic_data: Dict[str, Any], clusters: List[Dict[str, str]]) -> DemoTemplate:
+    validated = GeneratedTopic(
+        title=topic_data["title"],
+        description=topic_data["description"],
+        main_theme=topic_data["main_theme"],
+        statements=topic_data["statements"],
+        expected_clusters=clusters,
+        metadata={}
+    )
+    return DemoTemplate(
+        domain=domain,
+        title=validated.title,
+        description=validated.description,
+        main_theme=validated.main_theme,
+        statements=tuple(DemoStatement(**statement.model_dump()) for statement in validated.statements),
+        expected_clusters=tuple(MappingProxyType(dict(cluster)) for cluster in validated.expected_clusters),
+        statement_json=tuple(compact_json(statement.model_dump()) for statement in validated.statements),
+        main_theme_json=compact_json(validated.main_theme),
+        expected_clusters_json=compact_json(validated.expected_clusters)
+    )
 
 class DemoTopicGenerator:
     def __init__(self):
@@ -510,159 +1592,103 @@ class DemoTopicGenerator:
                 {"name": "Whole Child", "description": "Support student wellness and development"}
             ]
         }
+        
+        self.templates = {
+            domain: build_demo_template(domain, topic_data, self.demo_clusters[domain])
+            for domain, topic_data in self.demo_topics.items()
+        }
+        self.domains = list(self.templates)
+        self.domain_classifier = KeywordDomainClassifier(DOMAIN_KEYWORDS, self.domains)
+    
+    def rank_domains_from_issues(self, issues: List[str]) -> List[tuple]:
+        """Score every demo domain against the community issues, best first"""
+        return self.domain_classifier.rank(" ".join(issues))
     
     def determine_domain_from_issues(self, issues: List[str]) -> str:
         """Determine the most relevant domain based on community issues"""
         if not issues:
             return "transportation"
         
-        issue_text = " ".join(issues).lower()
-        
-        # Check for housing-related keywords (expanded)
-        housing_keywords = [
-            'housing', 'rent', 'affordable', 'development', 'zoning', 'homelessness',
-            'home', 'house', 'property', 'real estate', 'mortgage', 'landlord', 'tenant',
-            'apartment', 'condo', 'neighborhood', 'residential', 'gentrification',
-            'solar', 'energy', 'power', 'electricity', 'utilities', 'hvac', 'heating',
-            'cooling', 'insulation', 'renovation', 'construction', 'building'
-        ]
-        if any(keyword in issue_text for keyword in housing_keywords):
-            return "housing"
-        
-        # Check for education-related keywords (expanded)
-        education_keywords = [
-            'school', 'education', 'teacher', 'student', 'learning',
-            'classroom', 'curriculum', 'graduation', 'college', 'university',
-            'kindergarten', 'elementary', 'middle school', 'high school',
-            'academic', 'literacy', 'math', 'science', 'arts', 'sports',
-            'extracurricular', 'funding', 'budget', 'principal', 'administrator'
-        ]
-        if any(keyword in issue_text for keyword in education_keywords):
-            return "education"
-        
-        # Check for transportation-related keywords (explicit)
-        transportation_keywords = [
-            'transportation', 'transit', 'bus', 'train', 'subway', 'metro',
-            'car', 'vehicle', 'traffic', 'parking', 'road', 'highway',
-            'bike', 'bicycle', 'pedestrian', 'walkability', 'commute',
-            'rideshare', 'uber', 'lyft', 'taxi', 'scooter', 'infrastructure'
-        ]
-        if any(keyword in issue_text for keyword in transportation_keywords):
-            return "transportation"
+        ranking = self.rank_domains_from_issues(issues)
+        if ranking:
+            return ranking[0][0]
         
         # Default to housing for general community issues
         return "housing"
     
     def map_frontend_domain_to_backend(self, frontend_domain: str) -> str:
         """Map frontend domain values to backend demo topic keys"""
-        domain_mapping = {
-            # Urban Community mappings
-            'crime-public-safety': 'crime-public-safety',
-            'housing-affordability': 'housing-affordability', 
-            'economic-development': 'local-economy',
-            'infrastructure-services': 'infrastructure',
-            'transportation': 'transportation',
-            
-            # Suburban Town mappings
-            'traffic-school-safety': 'traffic-school-safety',
-            'infrastructure-maintenance': 'infrastructure',
-            'school-quality': 'education',
-            'property-taxes': 'property-taxes',
-            'environmental-concerns': 'infrastructure',
-            
-            # Rural Area mappings
-            'digital-infrastructure': 'digital-infrastructure',
-            'healthcare-access': 'infrastructure',  # Could create specific healthcare domain later
-            'economic-opportunities': 'local-economy',
-            'aging-population': 'infrastructure',  # Could create specific aging services domain later
-            'infrastructure-decay': 'infrastructure',
-            
-            # University Town mappings
-            'student-housing-shortage': 'student-housing-shortage',
-            'town-gown-relations': 'local-economy',  # Could create specific domain later
-            'parking-transportation': 'transportation',
-            'noise-disruption': 'crime-public-safety',  # Maps to public safety
-            'economic-dependence': 'local-economy',
-            
-            # Direct mappings for backend keys
-            'housing': 'housing',
-            'education': 'education',
-            'local-economy': 'local-economy',
-            'infrastructure': 'infrastructure'
-        }
+        return FRONTEND_DOMAIN_MAPPING.get(frontend_domain, frontend_domain)
+    
+    def resolve_domain(self, request: TopicRequest) -> str:
+        """Pick the demo domain for a request"""
+        if request.topic_domain and request.topic_domain != 'auto':
+            # Map frontend domain to backend key
+            mapped_domain = self.map_frontend_domain_to_backend(request.topic_domain)
+            if mapped_domain in self.templates:
+                return mapped_domain
+            # If mapped domain still doesn't exist, use a sensible default
+            return 'housing'  # Default to housing instead of random
         
-        mapped_result = domain_mapping.get(frontend_domain, frontend_domain)
-        logger.info(f"Domain mapping: '{frontend_domain}' -> '{mapped_result}'")
-        return mapped_result
+        # For 'auto' or None, select based on community context
+        if request.community_context.current_issues:
+            return self.determine_domain_from_issues(request.community_context.current_issues)
+        
+        # Select a domain based on community type if no issues provided
+        return random.choice(self.domains)
 
     async def generate_topic(self, request: TopicRequest) -> GeneratedTopic:
         """Generate a demo topic based on community context"""
         
         try:
-            # Determine topic domain
-            if request.topic_domain and request.topic_domain != 'auto':
-                # Map frontend domain to backend key
-                mapped_domain = self.map_frontend_domain_to_backend(request.topic_domain)
-                if mapped_domain in self.demo_topics:
-                    domain = mapped_domain
-                else:
-                    # If mapped domain still doesn't exist, use a sensible default
-                    domain = 'housing'  # Default to housing instead of random
-            else:
-                # For 'auto' or None, select based on community context
-                if request.community_context.current_issues:
-                    domain = self.determine_domain_from_issues(request.community_context.current_issues)
-                else:
-                    # Select a domain based on community type if no issues provided
-                    import random
-                    available_domains = list(self.demo_topics.keys())
-                    domain = random.choice(available_domains)
-            
-            # Get the appropriate demo topic
-            topic_data = self.demo_topics[domain]
-            clusters = self.demo_clusters[domain]
-            
-            # Customize title for the specific location
-            customized_title = f"{request.community_context.location} {topic_data['title']}"
-            customized_description = f"{topic_data['description']} in {request.community_context.location}"
-            
-            # Convert statements to Statement objects
-            statements = [
-                Statement(
-                    text=stmt["text"],
-                    category=stmt["category"],
-                    expected_cluster=stmt["expected_cluster"]
-                )
-                for stmt in topic_data["statements"][:request.statement_count]
-            ]
+            template = self.templates[self.resolve_domain(request)]
+            location = request.community_context.location
+            statements = list(template.statements[:request.statement_count])
             
             # Create metadata
             metadata = {
                 "generated_at": datetime.now().isoformat(),
-                "community_location": request.community_context.location,
+                "community_location": location,
                 "statement_count": len(statements),
                 "language": request.language,
                 "generation_method": "demo",
-                "domain": domain
+                "domain": template.domain
             }
             
-            logger.info(f"Generated demo topic: {customized_title} (domain: {domain}, frontend_domain: {request.topic_domain})")
+            logger.debug(f"Generated demo topic for {location} (domain: {template.domain}, frontend_domain: {request.topic_domain})")
             
-            return GeneratedTopic(
-                title=customized_title,
-                description=customized_description,
-                main_theme=topic_data["main_theme"],
+            # Template fields were validated at startup; only the location is substituted here
+            return GeneratedTopic.model_construct(
+                title=f"{location} {template.title}",
+                description=f"{template.description} in {location}",
+                main_theme=template.main_theme,
                 statements=statements,
-                expected_clusters=clusters,
+                expected_clusters=[dict(cluster) for cluster in template.expected_clusters],
                 metadata=metadata
             )
             
         except Exception as e:
             logger.error(f"Error generating demo topic: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Demo topic generation failed: {str(e)}")
+    
+    def topic_json(self, topic: GeneratedTopic) -> bytes:
+        """Serialize a topic returned by generate_topic using its template's pre-rendered fragments"""
+        template = self.templates[topic.metadata["domain"]]
+        return (
+            '{"title":' + compact_json(topic.title)
+            + ',"description":' + compact_json(topic.description)
+            + ',"main_theme":' + template.main_theme_json
+            + ',"statements":[' + ",".join(template.statement_json[:len(topic.statements)])
+            + '],"expected_clusters":' + template.expected_clusters_json
+            + ',"metadata":' + compact_json(topic.metadata)
+            + "}"
+        ).encode()
+    
+    def topic_response(self, topic: GeneratedTopic) -> Response:
+        return Response(content=self.topic_json(topic), media_type="application/json")
 
-async def generate_topic_with_llm(context: CommunityContext, topic_domain: str = None) -> GeneratedTopic:
-    """Generate a polling topic using OpenAI's GPT model"""
+def build_topic_messages(context: CommunityContext, topic_domain: str = None) -> List[Dict[str, str]]:
+    """Chat messages asking the model for a polling topic as JSON"""
     
     # Map topic domain to specific focus areas
     domain_prompts = {
@@ -724,57 +1750,64 @@ async def generate_topic_with_llm(context: CommunityContext, topic_domain: str =
     }}
     """
     
+    return [
+        {"role": "system", "content": "You are an expert in community engagement and polling design. Generate thoughtful, balanced polling topics that encourage civic participation. Make content specific to the location and topic domain provided. YOU MUST ALWAYS GENERATE EXACTLY 4 OPINION CLUSTERS - NO EXCEPTIONS."},
+        {"role": "user", "content": prompt}
+    ]
+
+def topic_from_llm_data(topic_data: Dict[str, Any], context: CommunityContext, topic_domain: str = None) -> GeneratedTopic:
+    """Validate the model's parsed JSON and convert it to a GeneratedTopic"""
+    
+    # VALIDATE: Ensure exactly 4 clusters
+    if len(topic_data.get("expected_clusters", [])) != 4:
+        logger.warning(f"OpenAI generated {len(topic_data.get('expected_clusters', []))} clusters instead of 4, falling back to demo")
+        raise Exception(f"Invalid cluster count: {len(topic_data.get('expected_clusters', []))} (expected 4)")
+    
+    # Convert to our model
+    statements = [
+        Statement(
+            text=stmt["text"],
+            category=stmt["category"],
+            expected_cluster=stmt["expected_cluster"]
+        )
+        for stmt in topic_data["statements"]
+    ]
+    
+    # Create metadata
+    metadata = {
+        "generated_at": datetime.now().isoformat(),
+        "community_location": context.location,
+        "statement_count": len(statements),
+        "generation_method": "llm",
+        "model": "gpt-4",
+        "topic_domain": topic_domain
+    }
+    
+    return GeneratedTopic(
+        title=topic_data["title"],
+        description=topic_data["description"],
+        main_theme=topic_data.get("main_theme", "Community perspective question"),
+        statements=statements,
+        expected_clusters=topic_data["expected_clusters"],
+        metadata=metadata
+    )
+
+async def generate_topic_with_llm(context: CommunityContext, topic_domain: str = None) -> GeneratedTopic:
+    """Generate a polling topic using OpenAI's GPT model"""
     try:
         if not openai_client:
             raise Exception("OpenAI client not initialized (API key missing)")
             
-        response = openai_client.chat.completions.create(
+        response = await openai_client.chat.completions.create(
             model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an expert in community engagement and polling design. Generate thoughtful, balanced polling topics that encourage civic participation. Make content specific to the location and topic domain provided. YOU MUST ALWAYS GENERATE EXACTLY 4 OPINION CLUSTERS - NO EXCEPTIONS."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=build_topic_messages(context, topic_domain),
             max_tokens=2000,
             temperature=0.7
         )
         
         # Parse the JSON response
         content = response.choices[0].message.content
-        topic_data = json.loads(content)
-        
-        # VALIDATE: Ensure exactly 4 clusters
-        if len(topic_data.get("expected_clusters", [])) != 4:
-            logger.warning(f"OpenAI generated {len(topic_data.get('expected_clusters', []))} clusters instead of 4, falling back to demo")
-            raise Exception(f"Invalid cluster count: {len(topic_data.get('expected_clusters', []))} (expected 4)")
-        
-        # Convert to our model
-        statements = [
-            Statement(
-                text=stmt["text"],
-                category=stmt["category"],
-                expected_cluster=stmt["expected_cluster"]
-            )
-            for stmt in topic_data["statements"]
-        ]
-        
-        # Create metadata
-        metadata = {
-            "generated_at": datetime.now().isoformat(),
-            "community_location": context.location,
-            "statement_count": len(statements),
-            "generation_method": "llm",
-            "model": "gpt-4",
-            "topic_domain": topic_domain
-        }
-        
-        return GeneratedTopic(
-            title=topic_data["title"],
-            description=topic_data["description"],
-            main_theme=topic_data.get("main_theme", "Community perspective question"),
-            statements=statements,
-            expected_clusters=topic_data["expected_clusters"],
-            metadata=metadata
-        )
+        return topic_from_llm_data(json.loads(content), context, topic_domain)
         
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse OpenAI JSON response: {str(e)}")
@@ -783,24 +1816,859 @@ async def generate_topic_with_llm(context: CommunityContext, topic_domain: str =
         logger.error(f"OpenAI generation failed: {str(e)}")
         raise Exception(f"LLM generation failed: {str(e)}")
 
-# Initialize the demo topic generator
-topic_generator = DemoTopicGenerator()
+class IncrementalTopicParser:
+    """Incremental parser for the topic JSON as it streams from the model.
+    
+    feed() scans only the newly received text and returns (field, value) pairs for each
+    top-level string field and each element of "statements" / "expected_clusters" that has
+    been completed so far. document() parses the whole object once the stream ends.
+    """
+    
+    STREAMED_ARRAYS = {"statements": "statement", "expected_clusters": "expected_cluster"}
+    
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = True
+        self._key: Optional[str] = None
+        self._array_field: Optional[str] = None
+        self._token_start = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+    
+    def feed(self, chunk: str) -> List[tuple]:
+        self._text += chunk
+        text = self._text
+        events = []
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        value = json.loads(text[self._token_start:i + 1])
+                        if self._expect_key:
+                            self._key = value
+                        else:
+                            events.append((self._key, value))
+                continue
+            
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._token_start = i
+            elif ch in "{[":
+                if self._depth == 0:
+                    if ch == "{" and self._start is None:
+                        self._start = i
+                        self._expect_key = True
+                elif self._depth == 1 and ch == "[":
+                    self._array_field = self.STREAMED_ARRAYS.get(self._key)
+                elif self._depth == 2 and ch == "{":
+                    self._token_start = i
+                self._depth += 1
+            elif ch in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 2 and ch == "}" and self._array_field:
+                    events.append((self._array_field, json.loads(text[self._token_start:i + 1])))
+                elif self._depth == 1 and ch == "]":
+                    self._array_field = None
+                elif self._depth == 0 and self._end is None:
+                    self._end = i + 1
+            elif self._depth == 1:
+                if ch == ":":
+                    self._expect_key = False
+                elif ch == ",":
+                    self._expect_key = True
+        self._pos = len(text)
+        return events
+    
+    def document(self) -> Dict[str, Any]:
+        if self._start is None or self._end is None:
+            return json.loads(self._text)
+        return json.loads(self._text[self._start:self._end])
 
-@app.post("/generate-topic", response_model=GeneratedTopic)
-async def generate_topic_endpoint(request: TopicRequest):
-    """Generate a community-relevant polling topic"""
+async def stream_topic_with_llm(context: CommunityContext, topic_domain: str = None):
+    """Stream a polling topic from OpenAI's GPT model.
+    
+    Yields (field, value) pairs from IncrementalTopicParser as the model produces them,
+    then ("topic", GeneratedTopic) once the full response has passed validation.
+    """
+    if not openai_client:
+        raise Exception("OpenAI client not initialized (API key missing)")
+    
+    stream = await openai_client.chat.completions.create(
+        model="gpt-4",
+        messages=build_topic_messages(context, topic_domain),
+        max_tokens=2000,
+        temperature=0.7,
+        stream=True
+    )
+    parser = IncrementalTopicParser()
     try:
-        if not request.community_context.location:
-            raise HTTPException(status_code=400, detail="Location is required")
-        
-        # Log user activity
-        log_user_activity("topic_generation_request", {
-            "location": request.community_context.location,
-            "topic_domain": request.topic_domain,
-            "population_size": request.community_context.population_size,
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                for event in parser.feed(delta):
+                    yield event
+    finally:
+        await stream.close()
+    
+    try:
+        topic_data = parser.document()
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse streamed OpenAI JSON response: {str(e)}")
+        raise Exception("OpenAI returned invalid JSON")
+    yield "topic", topic_from_llm_data(topic_data, context, topic_domain)
+
+# LLM generation cache
+TOPIC_CACHE_MAX_ENTRIES = int(os.getenv("TOPIC_CACHE_MAX_ENTRIES", "512"))
+TOPIC_CACHE_DISK_MAX_ENTRIES = int(os.getenv("TOPIC_CACHE_DISK_MAX_ENTRIES", "5000"))
+TOPIC_CACHE_TTL_SECONDS = float(os.getenv("TOPIC_CACHE_TTL_SECONDS", str(6 * 3600)))
+TOPIC_CACHE_STALE_SECONDS = float(os.getenv("TOPIC_CACHE_STALE_SECONDS", str(24 * 3600)))
+TOPIC_CACHE_STALE_WHILE_REVALIDATE = os.getenv("TOPIC_CACHE_STALE_WHILE_REVALIDATE", "true").lower() == "true"
+TOPIC_CACHE_PERSIST = os.getenv("TOPIC_CACHE_PERSIST", "true").lower() == "true"
+
+def normalize_text(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+def topic_request_fingerprint(request: TopicRequest) -> str:
+    """Stable key over everything generate_topic_with_llm puts in its prompt.
+    
+    Case, whitespace and the order of issues/previous topics do not change the key.
+    """
+    context = request.community_context
+    normalized = {
+        "location": normalize_text(context.location),
+        "topic_domain": normalize_text(request.topic_domain or ""),
+        "population_size": context.population_size,
+        "current_issues": sorted({normalize_text(issue) for issue in context.current_issues or [] if issue.strip()}),
+        "previous_topics": sorted({normalize_text(topic) for topic in context.previous_topics or [] if topic.strip()})
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+def load_cached_topic(fingerprint: str):
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            SELECT payload, created_at FROM topic_generation_cache WHERE fingerprint = ?
+        """, (fingerprint,))
+        row = cursor.fetchone()
+    if not row:
+        return None
+    return GeneratedTopic.model_validate_json(row['payload']), row['created_at']
+
+def save_cached_topic(fingerprint: str, payload: str, created_at: float, expire_before: float):
+    with get_db_connection() as conn:
+        with write_transaction(conn):
+            conn.execute("""
+                INSERT INTO topic_generation_cache (fingerprint, payload, created_at) VALUES (?, ?, ?)
+                ON CONFLICT(fingerprint) DO UPDATE SET payload = excluded.payload, created_at = excluded.created_at
+            """, (fingerprint, payload, created_at))
+            conn.execute("DELETE FROM topic_generation_cache WHERE created_at < ?", (expire_before,))
+            conn.execute("""
+                DELETE FROM topic_generation_cache WHERE fingerprint NOT IN (
+                    SELECT fingerprint FROM topic_generation_cache ORDER BY created_at DESC LIMIT ?
+                )
+            """, (TOPIC_CACHE_DISK_MAX_ENTRIES,))
+
+class TopicGenerationCache:
+    """Two-tier (memory LRU + SQLite) cache of LLM-generated topics keyed by request fingerprint.
+    
+    Entries are fresh for ttl_seconds. For stale_seconds after that they can still be served
+    while one background call regenerates them (stale-while-revalidate).
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float, stale_seconds: float,
+                 stale_while_revalidate: bool, persist: bool):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.stale_while_revalidate = stale_while_revalidate
+        self.persist = persist
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # fingerprint -> (topic, created_at)
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "refresh_failures": 0
+        }
+    
+    def _remember(self, fingerprint: str, topic: GeneratedTopic, created_at: float):
+        self._entries[fingerprint] = (topic, created_at)
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+    
+    async def _lookup(self, fingerprint: str):
+        entry = self._entries.get(fingerprint)
+        if entry is not None:
+            self._entries.move_to_end(fingerprint)
+            return entry
+        if not self.persist:
+            return None
+        entry = await run_db(load_cached_topic, fingerprint)
+        if entry is not None:
+            self._stats["disk_hits"] += 1
+            self._remember(fingerprint, *entry)
+        return entry
+    
+    async def store(self, fingerprint: str, topic: GeneratedTopic):
+        created_at = time.time()
+        self._remember(fingerprint, topic, created_at)
+        self._stats["stores"] += 1
+        if self.persist:
+            try:
+                await run_db(
+                    save_cached_topic, fingerprint, topic.model_dump_json(), created_at,
+                    created_at - self.ttl_seconds - self.stale_seconds
+                )
+            except Exception as e:
+                logger.warning(f"Failed to persist cached topic: {str(e)}")
+    
+    def _served_copy(self, topic: GeneratedTopic, cache_status: str) -> GeneratedTopic:
+        served = topic.model_copy(deep=True)
+        served.metadata["cache_status"] = cache_status
+        return served
+    
+    def _schedule_refresh(self, fingerprint: str, request: TopicRequest, generate):
+        if fingerprint in self._refresh_tasks:
+            return
+        
+        async def refresh():
+            try:
+                await self.store(fingerprint, await generate(request))
+                self._stats["refreshes"] += 1
+            except Exception as e:
+                self._stats["refresh_failures"] += 1
+                logger.warning(f"Background topic refresh failed: {str(e)}")
+            finally:
+                self._refresh_tasks.pop(fingerprint, None)
+        
+        self._refresh_tasks[fingerprint] = asyncio.create_task(refresh())
+    
+    async def lookup(self, request: TopicRequest, generate):
+        """Serve a cached topic for this request without generating on a miss.
+        
+        Returns (topic, cache_status); topic is None when cache_status is "miss". A stale
+        hit schedules a background generate(request) refresh.
+        """
+        fingerprint = topic_request_fingerprint(request)
+        entry = await self._lookup(fingerprint)
+        if entry is not None:
+            topic, created_at = entry
+            age = time.time() - created_at
+            if age < self.ttl_seconds:
+                self._stats["hits"] += 1
+                return self._served_copy(topic, "hit"), "hit"
+            if self.stale_while_revalidate and age < self.ttl_seconds + self.stale_seconds:
+                self._stats["stale_hits"] += 1
+                self._schedule_refresh(fingerprint, request, generate)
+                return self._served_copy(topic, "stale"), "stale"
+        
+        self._stats["misses"] += 1
+        return None, "miss"
+    
+    async def get_or_generate(self, request: TopicRequest, generate):
+        """Serve a cached topic for this request or call generate(request) and cache the result.
+        
+        Returns (topic, cache_status) with cache_status one of "hit", "stale" or "miss".
+        """
+        topic, cache_status = await self.lookup(request, generate)
+        if topic is not None:
+            return topic, cache_status
+        
+        topic = await generate(request)
+        await self.store(topic_request_fingerprint(request), topic)
+        return topic, "miss"
+    
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "stale_while_revalidate": self.stale_while_revalidate,
+            "persist": self.persist,
+            "hit_rate": round((self._stats["hits"] + self._stats["stale_hits"]) / lookups, 3) if lookups else None,
+            "refreshes_in_flight": len(self._refresh_tasks),
+            **self._stats
+        }
+
+topic_cache = TopicGenerationCache(
+    TOPIC_CACHE_MAX_ENTRIES, TOPIC_CACHE_TTL_SECONDS, TOPIC_CACHE_STALE_SECONDS,
+    TOPIC_CACHE_STALE_WHILE_REVALIDATE, TOPIC_CACHE_PERSIST
+)
+
+# Single-flight: identical in-flight generations share one upstream call
+SINGLE_FLIGHT_WINDOW_SECONDS = float(os.getenv("SINGLE_FLIGHT_WINDOW_SECONDS", "2"))
+SINGLE_FLIGHT_KEY_MODE = os.getenv("SINGLE_FLIGHT_KEY_MODE", "normalized")  # "normalized" or "exact"
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one shared upstream task.
+    
+    The upstream call runs as its own task, so a caller that disconnects never cancels it
+    for everyone else. A finished result is still shared for window_seconds so requests
+    arriving just after completion are coalesced too.
+    """
+    
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._recent: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, result)
+        self._stats = {"upstream_calls": 0, "coalesced": 0, "window_hits": 0, "upstream_failures": 0}
+    
+    def _recent_result(self, key: str):
+        now = time.monotonic()
+        while self._recent and next(iter(self._recent.values()))[0] <= now:
+            self._recent.popitem(last=False)
+        entry = self._recent.get(key)
+        return entry[1] if entry else None
+    
+    def joinable(self, key: str) -> bool:
+        """Whether do(key, ...) would share a call in flight or a recent result instead of calling func"""
+        return key in self._in_flight or self._recent_result(key) is not None
+    
+    async def do(self, key: str, func):
+        recent = self._recent_result(key)
+        if recent is not None:
+            self._stats["window_hits"] += 1
+            return recent
+        
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["upstream_calls"] += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        return await asyncio.shield(task)
+    
+    def _finished(self, key: str, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self._stats["upstream_failures"] += 1
+        elif self.window_seconds > 0:
+            self._recent[key] = (time.monotonic() + self.window_seconds, task.result())
+            self._recent.move_to_end(key)
+    
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._in_flight),
+            "window_seconds": self.window_seconds,
+            **self._stats
+        }
+
+llm_single_flight = SingleFlight(SINGLE_FLIGHT_WINDOW_SECONDS)
+
+def single_flight_key(request: TopicRequest) -> str:
+    if SINGLE_FLIGHT_KEY_MODE == "exact":
+        return request.model_dump_json()
+    return topic_request_fingerprint(request)
+
+# Circuit breaker and latency budget for the LLM path
+LLM_BREAKER_WINDOW_SIZE = int(os.getenv("LLM_BREAKER_WINDOW_SIZE", "20"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_P95_MS = float(os.getenv("LLM_BREAKER_P95_MS", "30000"))
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+LLM_BREAKER_HALF_OPEN_PROBES = int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", "1"))
+LLM_LATENCY_BUDGET_MS = float(os.getenv("LLM_LATENCY_BUDGET_MS", "0"))  # 0 waits for the LLM however long it takes
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a rolling window of call outcomes.
+    
+    The circuit opens when the window's error rate or p95 latency crosses its threshold,
+    rejects calls for open_seconds, then lets half_open_probes calls through; a fast
+    successful probe closes it again, anything else re-opens it.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, window_size: int, min_calls: int, error_rate_threshold: float,
+                 p95_threshold_ms: float, open_seconds: float, half_open_probes: int):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.p95_threshold_ms = p95_threshold_ms
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window_size)  # (succeeded, latency_ms)
+        self._opened_at = 0.0
+        self._half_open_episode = 0
+        self._probes_in_flight = 0
+        self._transitions: Dict[str, int] = {}
+        self._last_transition_at: Optional[str] = None
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0}
+    
+    def _transition(self, state: str, reason: str):
+        key = f"{self.state}->{state}"
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        self._last_transition_at = datetime.now().isoformat()
+        logger.warning(f"Circuit breaker '{self.name}' {key}: {reason}")
+        self.state = state
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        else:
+            self._outcomes.clear()
+    
+    def _window_stats(self):
+        if not self._outcomes:
+            return None, None
+        failures = sum(1 for succeeded, _ in self._outcomes if not succeeded)
+        latencies = sorted(latency for _, latency in self._outcomes)
+        p95 = latencies[max(0, -(-len(latencies) * 95 // 100) - 1)]
+        return failures / len(self._outcomes), p95
+    
+    def _admit(self) -> Optional[int]:
+        """Admit one call or raise CircuitOpenError; returns the half-open episode for a probe, else None"""
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(self.HALF_OPEN, f"{self.open_seconds}s cool-down elapsed")
+            self._half_open_episode += 1
+            self._probes_in_flight = 0
+        if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._probes_in_flight >= self.half_open_probes):
+            self._stats["rejected"] += 1
+            raise CircuitOpenError(f"Circuit breaker '{self.name}' is {self.state}")
+        self._stats["calls"] += 1
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight += 1
+            return self._half_open_episode
+        return None
+    
+    def allows(self) -> bool:
+        """Whether a call made now would be admitted, without admitting it"""
+        if self.state == self.OPEN:
+            return time.monotonic() - self._opened_at >= self.open_seconds
+        if self.state == self.HALF_OPEN:
+            return self._probes_in_flight < self.half_open_probes
+        return True
+    
+    def _is_live_probe(self, probe: Optional[int]) -> bool:
+        return probe is not None and self.state == self.HALF_OPEN and probe == self._half_open_episode
+    
+    def _record(self, succeeded: bool, latency_ms: float, probe: Optional[int]):
+        if not succeeded:
+            self._stats["failures"] += 1
+        
+        if self.state == self.HALF_OPEN:
+            # Only this episode's probes decide it; calls admitted before it say nothing new
+            if self._is_live_probe(probe):
+                self._probes_in_flight -= 1
+                if succeeded and latency_ms <= self.p95_threshold_ms:
+                    self._transition(self.CLOSED, f"probe succeeded in {latency_ms:.0f}ms")
+                else:
+                    self._transition(self.OPEN, "probe failed" if not succeeded else f"probe took {latency_ms:.0f}ms")
+            return
+        if self.state == self.OPEN:
+            return
+        
+        self._outcomes.append((succeeded, latency_ms))
+        if len(self._outcomes) < self.min_calls:
+            return
+        error_rate, p95 = self._window_stats()
+        if error_rate >= self.error_rate_threshold:
+            self._transition(self.OPEN, f"error rate {error_rate:.0%} over last {len(self._outcomes)} calls")
+        elif p95 > self.p95_threshold_ms:
+            self._transition(self.OPEN, f"p95 latency {p95:.0f}ms over last {len(self._outcomes)} calls")
+    
+    @contextmanager
+    def guard(self):
+        """Admit one call (raising CircuitOpenError when rejected) and record its outcome"""
+        probe = self._admit()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self._record(False, (time.monotonic() - started) * 1000, probe)
+            raise
+        except BaseException:
+            # Cancelled callers say nothing about upstream health; just free the probe slot
+            if self._is_live_probe(probe):
+                self._probes_in_flight -= 1
+            raise
+        else:
+            self._record(True, (time.monotonic() - started) * 1000, probe)
+    
+    async def call(self, func):
+        with self.guard():
+            return await func()
+    
+    async def stream(self, events):
+        """Admit one streaming call and pass its events through, like guard().
+        
+        Only the time spent waiting on the upstream iterator counts as latency; time the
+        consumer spends between events (e.g. a slow client reading the response) does not.
+        """
+        probe = self._admit()
+        iterator = events.__aiter__()
+        upstream_seconds = 0.0
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    event = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    upstream_seconds += time.monotonic() - started
+                yield event
+        except Exception:
+            self._record(False, upstream_seconds * 1000, probe)
+            raise
+        except BaseException:
+            if self._is_live_probe(probe):
+                self._probes_in_flight -= 1
+            raise
+        else:
+            self._record(True, upstream_seconds * 1000, probe)
+        finally:
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+    
+    def metrics(self) -> Dict[str, Any]:
+        error_rate, p95 = self._window_stats()
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_error_rate": round(error_rate, 3) if error_rate is not None else None,
+            "window_p95_ms": round(p95, 1) if p95 is not None else None,
+            "error_rate_threshold": self.error_rate_threshold,
+            "p95_threshold_ms": self.p95_threshold_ms,
+            "open_seconds": self.open_seconds,
+            "transitions": dict(self._transitions),
+            "last_transition_at": self._last_transition_at,
+            **self._stats
+        }
+
+class LatencyBudgetExceeded(Exception):
+    pass
+
+class LatencyBudget:
+    """Races an awaitable against a deadline so callers can serve a fallback instead.
+    
+    The raced task is left running past the deadline, so a late LLM answer still reaches
+    the topic cache and the circuit breaker's latency window.
+    """
+    
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self._stats = {"within_budget": 0, "exceeded": 0, "late_completions": 0, "late_failures": 0}
+    
+    async def run(self, awaitable):
+        task = asyncio.ensure_future(awaitable)
+        if self.budget_ms <= 0:
+            return await task
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), self.budget_ms / 1000)
+        except asyncio.TimeoutError:
+            self._stats["exceeded"] += 1
+            task.add_done_callback(self._finished_late)
+            raise LatencyBudgetExceeded(f"LLM did not answer within {self.budget_ms:.0f}ms")
+        self._stats["within_budget"] += 1
+        return result
+    
+    def _finished_late(self, task: asyncio.Task):
+        if task.cancelled() or task.exception() is not None:
+            self._stats["late_failures"] += 1
+        else:
+            self._stats["late_completions"] += 1
+    
+    def metrics(self) -> Dict[str, Any]:
+        return {"budget_ms": self.budget_ms, **self._stats}
+
+llm_breaker = CircuitBreaker(
+    "openai", LLM_BREAKER_WINDOW_SIZE, LLM_BREAKER_MIN_CALLS, LLM_BREAKER_ERROR_RATE,
+    LLM_BREAKER_P95_MS, LLM_BREAKER_OPEN_SECONDS, LLM_BREAKER_HALF_OPEN_PROBES
+)
+llm_latency_budget = LatencyBudget(LLM_LATENCY_BUDGET_MS)
+
+# Callers with a before_upstream hook coalesce here while it runs, so identical batch items
+# are charged once without making interactive callers wait on the batch budget
+charged_single_flight = SingleFlight(0)
+
+async def generate_llm_topic(request: TopicRequest, before_upstream=None) -> GeneratedTopic:
+    """LLM generation for a TopicRequest, coalesced with identical in-flight requests.
+    
+    before_upstream, if given, is awaited (e.g. to charge a token budget) only when the call
+    would go upstream: not when a call in flight or a recent result can be shared, and not
+    while the circuit breaker would reject it. It runs before the shared upstream task starts.
+    """
+    key = single_flight_key(request)
+    
+    async def upstream():
+        return await llm_breaker.call(
+            lambda: generate_topic_with_llm(request.community_context, request.topic_domain)
+        )
+    
+    if before_upstream is None:
+        return await llm_single_flight.do(key, upstream)
+    
+    async def charged():
+        if llm_breaker.allows() and not llm_single_flight.joinable(key):
+            await before_upstream()
+        return await llm_single_flight.do(key, upstream)
+    
+    return await charged_single_flight.do(key, charged)
+
+# Pre-generated topic pool for the most requested generation contexts
+PREGEN_ENABLED = os.getenv("PREGEN_ENABLED", "false").lower() == "true"
+PREGEN_HOT_KEYS = int(os.getenv("PREGEN_HOT_KEYS", "24"))
+PREGEN_MIN_SCORE = float(os.getenv("PREGEN_MIN_SCORE", "3"))
+PREGEN_HALF_LIFE_SECONDS = float(os.getenv("PREGEN_HALF_LIFE_SECONDS", "3600"))
+PREGEN_TRACKED_KEYS = int(os.getenv("PREGEN_TRACKED_KEYS", "2000"))
+PREGEN_POOL_DEPTH = int(os.getenv("PREGEN_POOL_DEPTH", "2"))
+PREGEN_TTL_SECONDS = float(os.getenv("PREGEN_TTL_SECONDS", str(6 * 3600)))
+PREGEN_MAX_PER_HOUR = int(os.getenv("PREGEN_MAX_PER_HOUR", "60"))
+PREGEN_CONCURRENCY = int(os.getenv("PREGEN_CONCURRENCY", "2"))
+PREGEN_INTERVAL_SECONDS = float(os.getenv("PREGEN_INTERVAL_SECONDS", "30"))
+
+class TopicPregenerator:
+    """Keeps freshly generated LLM topics ready for the hottest generation contexts.
+    
+    Request frequency is tracked per request fingerprint (location, domain and the rest of the
+    prompt context) as an exponentially decayed score. A background task tops up a small pool
+    of topics for the top keys, spending at most max_per_hour LLM generations. Each pooled topic
+    is served once; taking one wakes the task to replace it.
+    """
+    
+    def __init__(self, hot_keys: int, min_score: float, half_life_seconds: float, tracked_keys: int,
+                 pool_depth: int, ttl_seconds: float, max_per_hour: int, concurrency: int,
+                 interval_seconds: float):
+        self.hot_keys = hot_keys
+        self.min_score = min_score
+        self.half_life_seconds = half_life_seconds
+        self.tracked_keys = tracked_keys
+        self.pool_depth = pool_depth
+        self.ttl_seconds = ttl_seconds
+        self.max_per_hour = max_per_hour
+        self.concurrency = concurrency
+        self.interval_seconds = interval_seconds
+        self._scores: Dict[str, list] = {}  # fingerprint -> [score, updated_at, TopicRequest]
+        self._pools: Dict[str, deque] = {}  # fingerprint -> deque of (topic, created_at)
+        self._generation_times = deque()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stats = {
+            "served": 0, "misses": 0, "generated": 0, "generation_failures": 0,
+            "expired": 0, "budget_exhausted": 0
+        }
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+    
+    def _decayed(self, entry: list, now: float) -> float:
+        return entry[0] * 0.5 ** ((now - entry[1]) / self.half_life_seconds)
+    
+    def record(self, request: TopicRequest, at: Optional[float] = None):
+        """Count one generation request for this context"""
+        if not self.running:
+            return
+        now = at if at is not None else time.time()
+        fingerprint = topic_request_fingerprint(request)
+        entry = self._scores.get(fingerprint)
+        if entry is None:
+            if len(self._scores) >= self.tracked_keys:
+                coldest = min(self._scores, key=lambda key: self._decayed(self._scores[key], now))
+                del self._scores[coldest]
+                self._pools.pop(coldest, None)
+            self._scores[fingerprint] = [1.0, now, request]
+        else:
+            entry[0] = self._decayed(entry, now) + 1
+            entry[1] = now
+    
+    def take(self, request: TopicRequest) -> Optional[GeneratedTopic]:
+        """Pop a pre-generated topic for this request's context, if one is ready"""
+        if not self.running:
+            return None
+        pool = self._pools.get(topic_request_fingerprint(request))
+        cutoff = time.time() - self.ttl_seconds
+        while pool:
+            topic, created_at = pool.popleft()
+            if created_at < cutoff:
+                self._stats["expired"] += 1
+                continue
+            self._stats["served"] += 1
+            self._wake.set()
+            topic.metadata["pregenerated_at"] = datetime.fromtimestamp(created_at).isoformat()
+            return topic
+        self._stats["misses"] += 1
+        return None
+    
+    def _hot(self) -> List[tuple]:
+        now = time.time()
+        ranked = sorted(
+            ((self._decayed(entry, now), fingerprint, entry[2]) for fingerprint, entry in self._scores.items()),
+            key=lambda item: item[0],
+            reverse=True
+        )
+        return [(fingerprint, request) for score, fingerprint, request in ranked[:self.hot_keys] if score >= self.min_score]
+    
+    def _budget_remaining(self) -> int:
+        hour_ago = time.monotonic() - 3600
+        while self._generation_times and self._generation_times[0] < hour_ago:
+            self._generation_times.popleft()
+        return self.max_per_hour - len(self._generation_times)
+    
+    async def _generate(self, semaphore: asyncio.Semaphore, fingerprint: str, request: TopicRequest):
+        async with semaphore:
+            try:
+                topic = await llm_breaker.call(
+                    lambda: generate_topic_with_llm(request.community_context, request.topic_domain)
+                )
+            except Exception as e:
+                self._stats["generation_failures"] += 1
+                logger.warning(f"Topic pre-generation failed for {request.community_context.location}: {str(e)}")
+                return
+        self._stats["generated"] += 1
+        if fingerprint in self._scores:
+            self._pools.setdefault(fingerprint, deque()).append((topic, time.time()))
+    
+    async def _replenish(self):
+        cutoff = time.time() - self.ttl_seconds
+        for fingerprint, pool in list(self._pools.items()):
+            while pool and pool[0][1] < cutoff:
+                pool.popleft()
+                self._stats["expired"] += 1
+            if not pool:
+                del self._pools[fingerprint]
+        
+        jobs = []
+        budget = self._budget_remaining()
+        for fingerprint, request in self._hot():
+            for _ in range(self.pool_depth - len(self._pools.get(fingerprint, ()))):
+                if budget <= 0:
+                    self._stats["budget_exhausted"] += 1
+                    break
+                budget -= 1
+                self._generation_times.append(time.monotonic())
+                jobs.append((fingerprint, request))
+        
+        if jobs:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(self._generate(semaphore, fingerprint, request) for fingerprint, request in jobs))
+    
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            # wait_for can swallow a cancel that lands as the event fires, so stop() also sets a flag
+            if self._stopping:
+                break
+            self._wake.clear()
+            try:
+                await self._replenish()
+            except Exception as e:
+                logger.error(f"Topic pre-generation cycle failed: {str(e)}")
+    
+    async def start(self):
+        """Seed frequencies from recent topic_generation_request activity, then start replenishing"""
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        if not ACTIVITY_STORE_ENABLED:
+            return
+        try:
+            events = await run_db(
+                activity_store.events, "topic_generation_request", None,
+                time.time() - 4 * self.half_life_seconds, None, 5000
+            )
+        except Exception as e:
+            logger.warning(f"Could not seed topic pre-generation from activity: {str(e)}")
+            return
+        for event in reversed(events):
+            details = event["details"]
+            if details.get("has_current_issues") or details.get("has_previous_topics") or not details.get("location"):
+                continue
+            self.record(TopicRequest(
+                community_context=CommunityContext(
+                    location=details["location"],
+                    population_size=details.get("population_size")
+                ),
+                topic_domain=details.get("topic_domain")
+            ), at=event["occurred_at"])
+        self._wake.set()
+    
+    async def stop(self):
+        if not self.running:
+            return
+        self._stopping = True
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    def metrics(self) -> Dict[str, Any]:
+        hot = self._hot() if self.running else []
+        return {
+            "enabled": self.running,
+            "tracked_keys": len(self._scores),
+            "hot_keys": [
+                {
+                    "location": request.community_context.location,
+                    "topic_domain": request.topic_domain,
+                    "pooled": len(self._pools.get(fingerprint, ()))
+                }
+                for fingerprint, request in hot
+            ],
+            "pooled_topics": sum(len(pool) for pool in self._pools.values()),
+            "budget_remaining_this_hour": self._budget_remaining(),
+            **self._stats
+        }
+
+topic_pregen = TopicPregenerator(
+    PREGEN_HOT_KEYS, PREGEN_MIN_SCORE, PREGEN_HALF_LIFE_SECONDS, PREGEN_TRACKED_KEYS, PREGEN_POOL_DEPTH,
+    PREGEN_TTL_SECONDS, PREGEN_MAX_PER_HOUR, PREGEN_CONCURRENCY, PREGEN_INTERVAL_SECONDS
+)
+
+# Initialize the demo topic generator
+topic_generator = DemoTopicGenerator()
+
+@app.post("/generate-topic", response_model=GeneratedTopic)
+async def generate_topic_endpoint(request: TopicRequest):
+    """Generate a community-relevant polling topic"""
+    try:
+        if not request.community_context.location:
+            raise HTTPException(status_code=400, detail="Location is required")
+        
+        # Log user activity
+        log_user_activity("topic_generation_request", {
+            "location": request.community_context.location,
+            "topic_domain": request.topic_domain,
+            "population_size": request.community_context.population_size,
             "has_current_issues": bool(request.community_context.current_issues),
             "has_previous_topics": bool(request.community_context.previous_topics)
         })
+        topic_pregen.record(request)
         
         # Debug logging
         logger.info(f"Received request - topic_domain: {request.topic_domain}, location: {request.community_context.location}")
@@ -809,7 +2677,13 @@ async def generate_topic_endpoint(request: TopicRequest):
         if openai_client:
             try:
                 logger.info("Using OpenAI LLM generation")
-                topic = await generate_topic_with_llm(request.community_context, request.topic_domain)
+                topic = topic_pregen.take(request)
+                if topic is not None:
+                    cache_status = "pregenerated"
+                else:
+                    topic, cache_status = await llm_latency_budget.run(
+                        topic_cache.get_or_generate(request, generate_llm_topic)
+                    )
                 
                 # Validate cluster count
                 if len(topic.expected_clusters) != 4:
@@ -818,6 +2692,7 @@ async def generate_topic_endpoint(request: TopicRequest):
                 # Log successful LLM generation
                 log_user_activity("topic_generated", {
                     "method": "llm",
+                    "cache_status": cache_status,
                     "location": request.community_context.location,
                     "topic_title": topic.title,
                     "statement_count": len(topic.statements),
@@ -849,7 +2724,7 @@ async def generate_topic_endpoint(request: TopicRequest):
                     "cluster_count": len(topic.expected_clusters)
                 })
                 
-                return topic
+                return topic_generator.topic_response(topic)
         else:
             logger.info("No OpenAI API key, using demo generation")
             topic = await topic_generator.generate_topic(request)
@@ -863,7 +2738,7 @@ async def generate_topic_endpoint(request: TopicRequest):
                 "cluster_count": len(topic.expected_clusters)
             })
             
-            return topic
+            return topic_generator.topic_response(topic)
         
     except Exception as e:
         logger.error(f"Error generating topic: {str(e)}")
@@ -876,6 +2751,248 @@ async def generate_topic_endpoint(request: TopicRequest):
         
         raise HTTPException(status_code=500, detail=f"Error generating topic: {str(e)}")
 
+def format_ndjson(event: str, data: Any, **fields) -> str:
+    return json.dumps({"event": event, **fields, "data": data}, separators=(',', ':')) + "\n"
+
+@app.post("/generate-topic/stream")
+async def generate_topic_stream_endpoint(request: TopicRequest):
+    """Stream topic generation as NDJSON, one {"event", "data"} object per line.
+    
+    "title", "description", "main_theme", "statement" and "expected_cluster" events are sent
+    as soon as the model finishes each one. The last event is "topic" with the validated
+    GeneratedTopic. If the LLM fails or its output fails validation, a "fallback" event is sent
+    and the "topic" event carries a demo topic that replaces any partial fields already shown.
+    """
+    if not request.community_context.location:
+        raise HTTPException(status_code=400, detail="Location is required")
+    
+    log_user_activity("topic_generation_request", {
+        "location": request.community_context.location,
+        "topic_domain": request.topic_domain,
+        "population_size": request.community_context.population_size,
+        "has_current_issues": bool(request.community_context.current_issues),
+        "has_previous_topics": bool(request.community_context.previous_topics),
+        "stream": True
+    })
+    topic_pregen.record(request)
+    
+    async def event_stream():
+        started = time.perf_counter()
+        first_statement_ms = None
+        topic = None
+        method = "demo"
+        cache_status = None
+        
+        try:
+            if openai_client:
+                topic = topic_pregen.take(request)
+                cache_status = "pregenerated"
+                if topic is None:
+                    topic, cache_status = await topic_cache.lookup(request, generate_llm_topic)
+                method = "llm"
+                if topic is None:
+                    try:
+                        statement_index = 0
+                        cluster_index = 0
+                        # The breaker times only the upstream reads, not the client reading our events
+                        upstream = stream_topic_with_llm(request.community_context, request.topic_domain)
+                        async with aclosing(llm_breaker.stream(upstream)) as events:
+                            async for field, value in events:
+                                if field == "topic":
+                                    topic = value
+                                elif field == "statement":
+                                    if first_statement_ms is None:
+                                        first_statement_ms = round((time.perf_counter() - started) * 1000, 1)
+                                    yield format_ndjson("statement", value, index=statement_index)
+                                    statement_index += 1
+                                elif field == "expected_cluster":
+                                    yield format_ndjson("expected_cluster", value, index=cluster_index)
+                                    cluster_index += 1
+                                elif field in ("title", "description", "main_theme"):
+                                    yield format_ndjson(field, value)
+                        
+                        topic.metadata["time_to_first_statement_ms"] = first_statement_ms
+                        await topic_cache.store(topic_request_fingerprint(request), topic)
+                    except Exception as e:
+                        logger.warning(f"Streaming OpenAI generation failed, falling back to demo: {str(e)}")
+                        log_user_activity("topic_generation_fallback", {
+                            "reason": str(e),
+                            "location": request.community_context.location
+                        })
+                        yield format_ndjson("fallback", {"reason": str(e)})
+                        topic = None
+                        method = "demo_fallback"
+            
+            if topic is None:
+                topic = await topic_generator.generate_topic(request)
+            
+            log_user_activity("topic_generated", {
+                "method": method,
+                "cache_status": cache_status,
+                "stream": True,
+                "time_to_first_statement_ms": first_statement_ms,
+                "location": request.community_context.location,
+                "topic_title": topic.title,
+                "statement_count": len(topic.statements),
+                "cluster_count": len(topic.expected_clusters)
+            })
+            yield format_ndjson("topic", topic.model_dump(mode="json"))
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.error(f"Error streaming topic: {detail}")
+            log_user_activity("topic_generation_error", {
+                "error": detail,
+                "location": request.community_context.location,
+                "stream": True
+            })
+            yield format_ndjson("error", {"detail": f"Error generating topic: {detail}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Batch generation: bounded LLM concurrency under a tokens-per-minute budget
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+BATCH_TOKENS_PER_MINUTE = int(os.getenv("BATCH_TOKENS_PER_MINUTE", "40000"))
+LLM_TOKENS_PER_GENERATION = int(os.getenv("LLM_TOKENS_PER_GENERATION", "2800"))  # prompt + max_tokens
+
+class TokenRateLimiter:
+    """Token bucket over LLM tokens per minute; waiters are served in arrival order"""
+    
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._stats = {"acquired": 0, "throttled": 0, "wait_seconds": 0.0}
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+    
+    async def acquire(self, tokens: int):
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                self._stats["throttled"] += 1
+                started = time.monotonic()
+                while self._tokens < tokens:
+                    await asyncio.sleep((tokens - self._tokens) * 60 / self.capacity)
+                    self._refill()
+                self._stats["wait_seconds"] += time.monotonic() - started
+            self._tokens -= tokens
+            self._stats["acquired"] += 1
+    
+    def metrics(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "tokens_per_minute": self.capacity,
+            "available_tokens": int(self._tokens),
+            **self._stats,
+            "wait_seconds": round(self._stats["wait_seconds"], 3)
+        }
+
+batch_llm_semaphore = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+batch_token_limiter = TokenRateLimiter(BATCH_TOKENS_PER_MINUTE)
+
+async def generate_batch_item(request: TopicRequest) -> tuple:
+    """Generate one batch item, returning (topic, method, cache_status)"""
+    if not request.community_context.location:
+        raise HTTPException(status_code=400, detail="Location is required")
+    
+    if openai_client:
+        try:
+            topic = topic_pregen.take(request)
+            if topic is not None:
+                return topic, "llm", "pregenerated"
+            topic, cache_status = await topic_cache.lookup(request, generate_llm_topic)
+            if topic is None:
+                async with batch_llm_semaphore:
+                    # Charged only for upstream calls; coalesced items spend no tokens
+                    topic = await generate_llm_topic(
+                        request, functools.partial(batch_token_limiter.acquire, LLM_TOKENS_PER_GENERATION)
+                    )
+                await topic_cache.store(topic_request_fingerprint(request), topic)
+            if len(topic.expected_clusters) != 4:
+                raise Exception(f"Generated {len(topic.expected_clusters)} clusters instead of 4")
+            return topic, "llm", cache_status
+        except Exception as e:
+            logger.warning(f"Batch item LLM generation failed, falling back to demo: {str(e)}")
+            log_user_activity("topic_generation_fallback", {
+                "reason": str(e),
+                "location": request.community_context.location,
+                "batch": True
+            })
+            return await topic_generator.generate_topic(request), "demo_fallback", None
+    
+    return await topic_generator.generate_topic(request), "demo", None
+
+@app.post("/generate-topics/batch")
+async def generate_topics_batch(batch: BatchTopicRequest):
+    """Generate topics for many requests, streamed as NDJSON in completion order.
+    
+    Each item produces a "topic" line (with the item's index, method and cache_status) or an
+    "error" line; a final "summary" line reports the counts. Items that fail on the LLM path
+    fall back to the demo generator individually.
+    """
+    if not batch.requests:
+        raise HTTPException(status_code=400, detail="At least one request is required")
+    if len(batch.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {BATCH_MAX_ITEMS} requests")
+    
+    log_user_activity("topic_batch_request", {
+        "item_count": len(batch.requests),
+        "locations": sorted({request.community_context.location for request in batch.requests})[:20]
+    })
+    for request in batch.requests:
+        topic_pregen.record(request)
+    
+    async def run_item(index: int, request: TopicRequest):
+        try:
+            return index, await generate_batch_item(request), None
+        except Exception as e:
+            return index, None, e.detail if isinstance(e, HTTPException) else str(e)
+    
+    async def event_stream():
+        started = time.perf_counter()
+        counts: Dict[str, int] = {}
+        tasks = [asyncio.ensure_future(run_item(index, request)) for index, request in enumerate(batch.requests)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result, error = await next_done
+                if error is not None:
+                    counts["error"] = counts.get("error", 0) + 1
+                    yield format_ndjson("error", {"detail": error}, index=index)
+                    continue
+                topic, method, cache_status = result
+                counts[method] = counts.get(method, 0) + 1
+                yield format_ndjson(
+                    "topic", topic.model_dump(mode="json"),
+                    index=index, method=method, cache_status=cache_status
+                )
+            
+            summary = {
+                "item_count": len(tasks),
+                "methods": counts,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+            log_user_activity("topic_batch_generated", summary)
+            yield format_ndjson("summary", summary)
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Legacy endpoint for backward compatibility
 @app.post("/generate-topic-legacy", response_model=GeneratedTopic)
 async def generate_topic_legacy(request: GenerateTopicRequest):
@@ -886,41 +3003,1512 @@ async def generate_topic_legacy(request: GenerateTopicRequest):
         community_context=request.community_context,
         statement_count=10
     )
-    
-    return await generate_topic_endpoint(topic_request)
+    
+    return await generate_topic_endpoint(topic_request)
+
+@app.get("/demo-domains")
+async def get_demo_domains():
+    """Get available demo domains"""
+    return {
+        "available_domains": list(topic_generator.demo_topics.keys()),
+        "description": "Available topic domains for demo generation"
+    }
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return {"status": "healthy", "service": "community-topic-generator", "timestamp": datetime.now().isoformat()}
+
+@app.get("/")
+async def root():
+    """Root endpoint with service info"""
+    return {
+        "service": "Community Polling Topic Generator",
+        "version": "1.0.0",
+        "description": "Generate community-relevant polling topics using LLM or demo data",
+        "endpoints": {
+            "generate": "/generate-topic",
+            "legacy": "/generate-topic-legacy", 
+            "health": "/health",
+            "domains": "/demo-domains",
+            "docs": "/docs"
+        },
+        "features": {
+            "llm_generation": bool(os.getenv("OPENAI_API_KEY")),
+            "demo_domains": list(topic_generator.demo_topics.keys())
+        }
+    }
+
+# Poll sharing data access - blocking helpers called through run_db()
+def insert_shared_poll(values: tuple):
+    """Insert a shared_polls row and verify it was written"""
+    poll_id = values[0]
+    with get_db_connection() as conn:
+        logger.info("Database connection established")
+        conn.execute("""
+            INSERT INTO shared_polls 
+            (poll_id, title, description, main_theme, statements, expected_clusters, metadata, created_at,
+             creator_name, statement_clusters)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, values)
+        conn.commit()
+        logger.info(f"Poll {poll_id} successfully saved to database")
+        
+        # Verify the save worked
+        cursor = conn.execute("SELECT poll_id FROM shared_polls WHERE poll_id = ?", (poll_id,))
+        if cursor.fetchone():
+            logger.info(f"Verification: Poll {poll_id} found in database")
+        else:
+            logger.error(f"Verification failed: Poll {poll_id} not found after save")
+
+def fetch_poll_row(poll_id: str):
+    """Fetch a raw shared_polls row, or None if the poll does not exist"""
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            SELECT * FROM shared_polls WHERE poll_id = ?
+        """, (poll_id,))
+        return cursor.fetchone()
+
+def fetch_poll_stats() -> Dict[str, Any]:
+    with get_db_connection() as conn:
+        cursor = conn.execute("SELECT COUNT(*) as total_polls FROM shared_polls")
+        total_polls = cursor.fetchone()['total_polls']
+        
+        cursor = conn.execute("""
+            SELECT poll_id, title, created_at FROM shared_polls 
+            ORDER BY created_at DESC LIMIT 5
+        """)
+        recent_polls = [dict(row) for row in cursor.fetchall()]
+    
+    return {"total_polls": total_polls, "recent_polls": recent_polls}
+
+def fetch_database_summary() -> Dict[str, Any]:
+    with get_db_connection() as conn:
+        # Check if tables exist
+        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row['name'] for row in cursor.fetchall()]
+        
+        # Get poll count
+        cursor = conn.execute("SELECT COUNT(*) as count FROM shared_polls")
+        poll_count = cursor.fetchone()['count']
+        
+        # Get response count  
+        cursor = conn.execute("SELECT COUNT(*) as count FROM poll_responses")
+        response_count = cursor.fetchone()['count']
+        
+        # Get recent polls
+        cursor = conn.execute("SELECT poll_id, title, created_at FROM shared_polls ORDER BY created_at DESC LIMIT 3")
+        recent_polls = [dict(row) for row in cursor.fetchall()]
+        
+        cursor = conn.execute("SELECT MAX(version) as version FROM schema_migrations")
+        schema_version = cursor.fetchone()['version']
+        full_scans = find_full_table_scans(conn)
+    
+    return {
+        "schema_version": schema_version,
+        "query_plan_full_scans": full_scans,
+        "tables": tables,
+        "polls_count": poll_count,
+        "responses_count": response_count,
+        "recent_polls": recent_polls
+    }
+
+def count_shared_polls() -> int:
+    with get_db_connection() as conn:
+        cursor = conn.execute("SELECT COUNT(*) as count FROM shared_polls")
+        return cursor.fetchone()['count']
+
+class AppliedSubmission(NamedTuple):
+    """What one committed submission changed, for the post-commit hooks"""
+    session_id: str  # the participant session the responses were written under
+    previous_session_id: Optional[str]  # None for a first attempt
+    previous_responses: List[tuple]  # (statement_index, response) pairs a retake replaced
+    responses: List[tuple]  # (statement_index, response) pairs written
+    response_version: int  # the poll's response_version after this submission
+
+def apply_poll_submission(conn, poll_id: str, participant_name: Optional[str],
+                          responses: List[Dict[str, Any]], participant_session_id: str, timestamp: str) -> AppliedSubmission:
+    """Write one participant's submission on an open write transaction.
+    
+    Replaces the participant's earlier attempt on a retake and keeps the tally tables in step.
+    An empty submission is rejected: as a retake it would delete the earlier attempt and
+    leave the participant uncounted.
+    """
+    if not responses:
+        raise HTTPException(status_code=400, detail="A submission needs at least one response")
+    cursor = conn.execute("SELECT poll_id FROM shared_polls WHERE poll_id = ?", (poll_id,))
+    if not cursor.fetchone():
+        raise HTTPException(status_code=404, detail="Poll not found")
+    
+    # Check if participant has already responded
+    existing_session_id = None
+    if participant_name:
+        cursor = conn.execute("""
+            SELECT DISTINCT participant_session_id 
+            FROM poll_responses 
+            WHERE poll_id = ? AND participant_name = ?
+            ORDER BY timestamp DESC LIMIT 1
+        """, (poll_id, participant_name))
+        existing_row = cursor.fetchone()
+        if existing_row:
+            existing_session_id = existing_row['participant_session_id']
+    
+    # If retaking, delete previous responses and take them back out of the tallies
+    previous_responses = []
+    if existing_session_id:
+        cursor = conn.execute("""
+            SELECT statement_index, response FROM poll_responses 
+            WHERE poll_id = ? AND participant_session_id = ?
+        """, (poll_id, existing_session_id))
+        previous_responses = [(row['statement_index'], row['response']) for row in cursor.fetchall()]
+        
+        conn.execute("""
+            DELETE FROM poll_responses 
+            WHERE poll_id = ? AND participant_session_id = ?
+        """, (poll_id, existing_session_id))
+        apply_response_tallies(conn, poll_id, previous_responses, direction=-1)
+    
+    # A repeated statementIndex keeps its last answer, matching the UPSERT below
+    final_responses = {}
+    for response in responses:
+        final_responses[response["statementIndex"]] = response["response"]
+    
+    conn.executemany("""
+        INSERT INTO poll_responses 
+        (poll_id, participant_name, statement_index, response, timestamp, participant_session_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(poll_id, participant_session_id, statement_index) DO UPDATE SET
+            response = excluded.response,
+            timestamp = excluded.timestamp
+    """, [
+        (poll_id, participant_name, statement_index, answer, timestamp, participant_session_id)
+        for statement_index, answer in final_responses.items()
+    ])
+    apply_response_tallies(conn, poll_id, list(final_responses.items()))
+    
+    # Every committed submission invalidates cached results for this poll
+    cursor = conn.execute("""
+        INSERT INTO poll_participant_counts (poll_id, response_version) VALUES (?, 1)
+        ON CONFLICT(poll_id) DO UPDATE SET response_version = response_version + 1
+        RETURNING response_version
+    """, (poll_id,))
+    
+    return AppliedSubmission(
+        participant_session_id, existing_session_id, previous_responses, list(final_responses.items()),
+        cursor.fetchone()[0]
+    )
+
+def store_poll_responses(poll_id: str, participant_name: Optional[str], responses: List[Dict[str, Any]]):
+    """Persist one participant's responses in a single transaction (one commit, one fsync).
+    
+    Returns (participant_session_id, AppliedSubmission).
+    """
+    participant_session_id = str(uuid.uuid4())
+    timestamp = datetime.now().isoformat()
+    
+    with get_db_connection() as conn:
+        with write_transaction(conn):
+            applied = apply_poll_submission(
+                conn, poll_id, participant_name, responses, participant_session_id, timestamp
+            )
+    
+    return participant_session_id, applied
+
+def store_poll_submission_batch(submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Group-commit many submissions in one transaction.
+    
+    Each submission runs inside its own savepoint, so one bad submission is rolled back
+    without discarding the rest of the batch.
+    """
+    outcomes = []
+    with get_db_connection() as conn:
+        with write_transaction(conn):
+            for submission in submissions:
+                conn.execute("SAVEPOINT submission")
+                try:
+                    applied = apply_poll_submission(conn, **submission)
+                    conn.execute("RELEASE SAVEPOINT submission")
+                    outcomes.append({"success": True, "applied": applied})
+                except Exception as e:
+                    conn.execute("ROLLBACK TO SAVEPOINT submission")
+                    conn.execute("RELEASE SAVEPOINT submission")
+                    outcomes.append({"success": False, "error": str(e)})
+    return outcomes
+
+# Vote ingestion: "direct" commits each submission on the request path, "queue" accepts it
+# immediately and group-commits batches from a single writer task
+VOTE_INGESTION_MODE = os.getenv("VOTE_INGESTION_MODE", "direct")
+VOTE_QUEUE_MAX_SIZE = int(os.getenv("VOTE_QUEUE_MAX_SIZE", "10000"))
+VOTE_QUEUE_BATCH_SIZE = int(os.getenv("VOTE_QUEUE_BATCH_SIZE", "200"))
+VOTE_QUEUE_FLUSH_INTERVAL_MS = int(os.getenv("VOTE_QUEUE_FLUSH_INTERVAL_MS", "50"))
+
+class VoteIngestionQueue:
+    """Bounded in-process queue of validated submissions drained by one group-committing writer"""
+    
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "enqueued": 0,
+            "rejected_full": 0,
+            "committed": 0,
+            "failed": 0,
+            "hook_failures": 0,
+            "batches": 0,
+            "largest_batch": 0
+        }
+    
+    @property
+    def running(self) -> bool:
+        return self._writer_task is not None
+    
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._writer_task = asyncio.create_task(self._run())
+    
+    def submit(self, submission: Dict[str, Any]):
+        """Enqueue a submission, or raise 429 when the queue is full (503 if the writer has stopped)"""
+        if self._writer_task.done():
+            raise HTTPException(status_code=503, detail="Vote ingestion is not running, please retry shortly")
+        try:
+            self._queue.put_nowait(submission)
+        except asyncio.QueueFull:
+            self._stats["rejected_full"] += 1
+            raise HTTPException(status_code=429, detail="Too many submissions in flight, please retry shortly")
+        self._stats["enqueued"] += 1
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error(f"Vote queue writer failed on a batch of {len(batch)} submissions: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        self._stats["batches"] += 1
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+        try:
+            outcomes = await run_db(store_poll_submission_batch, batch)
+        except Exception as e:
+            self._stats["failed"] += len(batch)
+            logger.error(f"Failed to commit batch of {len(batch)} vote submissions: {str(e)}")
+            return
+        
+        for submission, outcome in zip(batch, outcomes):
+            if not outcome["success"]:
+                self._stats["failed"] += 1
+                logger.error(f"Queued submission for poll {submission['poll_id']} failed: {outcome['error']}")
+                continue
+            
+            self._stats["committed"] += 1
+            try:
+                self._after_commit(submission, outcome["applied"])
+            except Exception as e:
+                # Already committed: a failing hook must not take the rest of the batch or the writer down
+                self._stats["hook_failures"] += 1
+                logger.error(f"Post-commit hook failed for queued submission to poll {submission['poll_id']}: {str(e)}")
+    
+    def _after_commit(self, submission: Dict[str, Any], applied: AppliedSubmission):
+        on_responses_committed(submission["poll_id"], applied)
+        previous_session_id = applied.previous_session_id
+        if previous_session_id:
+            log_user_activity("poll_retaken", {
+                "poll_id": submission["poll_id"],
+                "participant_name": submission["participant_name"],
+                "previous_session_id": previous_session_id
+            })
+        log_user_activity("poll_responses_submitted", {
+            "poll_id": submission["poll_id"],
+            "participant_name": submission["participant_name"],
+            "response_count": len(submission["responses"]),
+            "participant_session_id": submission["participant_session_id"],
+            "is_retake": previous_session_id is not None,
+            "ingestion": "queue"
+        })
+    
+    async def stop(self):
+        """Flush everything still queued, then stop the writer"""
+        if not self.running:
+            return
+        # Waiting on the writer too means a writer that has died cannot hang shutdown on join()
+        drained = asyncio.ensure_future(self._queue.join())
+        await asyncio.wait({drained, self._writer_task}, return_when=asyncio.FIRST_COMPLETED)
+        drained.cancel()
+        if self._writer_task.done() and not self._writer_task.cancelled() and self._writer_task.exception():
+            logger.error(f"Vote queue writer had stopped, {self._queue.qsize()} submissions were not written: "
+                         f"{self._writer_task.exception()}")
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+        self._writer_task = None
+        logger.info(f"Vote queue drained: {self._stats['committed']} committed, {self._stats['failed']} failed")
+    
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "mode": VOTE_INGESTION_MODE,
+            "depth": self._queue.qsize() if self._queue else 0,
+            "max_size": self.max_size,
+            **self._stats
+        }
+
+vote_queue = VoteIngestionQueue(VOTE_QUEUE_MAX_SIZE, VOTE_QUEUE_BATCH_SIZE, VOTE_QUEUE_FLUSH_INTERVAL_MS / 1000)
+
+def fetch_participant_status(poll_id: str, participant_name: str):
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            SELECT COUNT(*) as response_count, MAX(timestamp) as last_taken
+            FROM poll_responses 
+            WHERE poll_id = ? AND participant_name = ?
+        """, (poll_id, participant_name))
+        return cursor.fetchone()
+
+def fetch_poll_tallies(poll_id: str):
+    """Fetch a poll's materialized tallies.
+    
+    Returns (tallies_by_statement, counts_row); counts_row is None before the first submission.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            SELECT statement_index, agree_count, disagree_count, skip_count, response_count
+            FROM poll_statement_tallies
+            WHERE poll_id = ?
+        """, (poll_id,))
+        tallies = {row['statement_index']: row for row in cursor.fetchall()}
+        
+        cursor = conn.execute("""
+            SELECT participant_count, response_count, response_version
+            FROM poll_participant_counts WHERE poll_id = ?
+        """, (poll_id,))
+        counts_row = cursor.fetchone()
+    
+    return tallies, counts_row
+
+def fetch_response_version(poll_id: str) -> int:
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            SELECT response_version FROM poll_participant_counts WHERE poll_id = ?
+        """, (poll_id,))
+        row = cursor.fetchone()
+        return row['response_version'] if row else 0
+
+def fetch_vote_matrix(poll_id: str, statement_count: int):
+    """(response_version, VoteMatrix, session id per matrix row) for a poll, read from one snapshot"""
+    with get_db_connection() as conn:
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute("""
+                SELECT response_version FROM poll_participant_counts WHERE poll_id = ?
+            """, (poll_id,)).fetchone()
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(vote_matrix_sql(statement_count), (poll_id,))
+            sessions = []
+            
+            def packed_words():
+                for session_id, *words in cursor:
+                    sessions.append(session_id)
+                    yield words
+            
+            matrix = opinion_analysis.vote_matrix_from_packed(packed_words(), statement_count)
+        finally:
+            conn.rollback()
+    return (row['response_version'] if row else 0), matrix, sessions
+
+def fetch_poll_participants_debug(poll_id: str) -> Dict[str, Any]:
+    with get_db_connection() as conn:
+        cursor = conn.execute("""
+            SELECT participant_session_id, participant_name, COUNT(*) as response_count, 
+                   MIN(timestamp) as first_response, MAX(timestamp) as last_response
+            FROM poll_responses 
+            WHERE poll_id = ?
+            GROUP BY participant_session_id, participant_name
+            ORDER BY first_response
+        """, (poll_id,))
+        participants = [dict(row) for row in cursor.fetchall()]
+        
+        # Get total unique session IDs
+        cursor = conn.execute("""
+            SELECT COUNT(DISTINCT participant_session_id) as unique_participants
+            FROM poll_responses 
+            WHERE poll_id = ?
+        """, (poll_id,))
+        unique_count = cursor.fetchone()['unique_participants']
+        
+        # Get all responses for detailed view
+        cursor = conn.execute("""
+            SELECT participant_session_id, participant_name, statement_index, response, timestamp
+            FROM poll_responses 
+            WHERE poll_id = ?
+            ORDER BY participant_session_id, statement_index
+        """, (poll_id,))
+        all_responses = [dict(row) for row in cursor.fetchall()]
+    
+    return {
+        "participants": participants,
+        "unique_count": unique_count,
+        "all_responses": all_responses
+    }
+
+# Decoded poll cache - a saved poll never changes, so share links are served from memory
+POLL_CACHE_MAX_ENTRIES = int(os.getenv("POLL_CACHE_MAX_ENTRIES", "1024"))
+POLL_CACHE_TTL_SECONDS = float(os.getenv("POLL_CACHE_TTL_SECONDS", "3600"))
+
+class CachedPoll(NamedTuple):
+    poll: SharedPoll
+    payload: bytes  # pre-serialized SharedPoll JSON
+    etag: str  # strong ETag of the payload; the poll row never changes after save
+    statement_clusters: List[int]  # statement index -> expected_clusters index, -1 if none
+    expires_at: float
+
+class PollCache:
+    """Bounded LRU of decoded SharedPoll objects with per-entry TTL"""
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedPoll]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+    
+    def get(self, poll_id: str) -> Optional[CachedPoll]:
+        with self._lock:
+            entry = self._entries.get(poll_id)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[poll_id]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(poll_id)
+            self._stats["hits"] += 1
+            return entry
+    
+    def put(self, poll_id: str, poll: SharedPoll, statement_clusters: List[int]) -> CachedPoll:
+        payload = poll.model_dump_json().encode()
+        entry = CachedPoll(
+            poll=poll,
+            payload=payload,
+            etag=f'"{hashlib.sha256(payload).hexdigest()[:32]}"',
+            statement_clusters=statement_clusters,
+            expires_at=time.monotonic() + self.ttl_seconds
+        )
+        with self._lock:
+            self._entries[poll_id] = entry
+            self._entries.move_to_end(poll_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return entry
+    
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else None,
+                **self._stats
+            }
+
+poll_cache = PollCache(POLL_CACHE_MAX_ENTRIES, POLL_CACHE_TTL_SECONDS)
+
+def shared_poll_from_row(row) -> SharedPoll:
+    """Decode a shared_polls row back into a SharedPoll"""
+    statements = [Statement(**stmt) for stmt in json.loads(row['statements'])]
+    expected_clusters = json.loads(row['expected_clusters'])
+    metadata = json.loads(row['metadata'])
+    
+    # VALIDATE: Ensure exactly 4 clusters
+    if len(expected_clusters) != 4:
+        logger.warning(f"Poll {row['poll_id']} has {len(expected_clusters)} clusters instead of 4")
+    
+    return SharedPoll(
+        poll_id=row['poll_id'],
+        title=row['title'],
+        description=row['description'],
+        main_theme=row['main_theme'],
+        statements=statements,
+        expected_clusters=expected_clusters,
+        metadata=metadata,
+        created_at=row['created_at'],
+        creator_name=row['creator_name']
+    )
+
+async def load_shared_poll(poll_id: str) -> Optional[CachedPoll]:
+    """Return the decoded poll from the cache, loading it from SQLite on a miss"""
+    cached = poll_cache.get(poll_id)
+    if cached:
+        return cached
+    
+    row = await run_db(fetch_poll_row, poll_id)
+    if not row:
+        return None
+    
+    try:
+        poll = shared_poll_from_row(row)
+        if row['statement_clusters']:
+            statement_clusters = json.loads(row['statement_clusters'])
+        else:
+            statement_clusters = resolve_statement_clusters(
+                [stmt.expected_cluster for stmt in poll.statements],
+                [cluster["name"] for cluster in poll.expected_clusters]
+            )
+    except Exception as e:
+        logger.error(f"Error converting poll data for poll {poll_id}: {str(e)}")
+        logger.error(f"Raw data - statements: {row['statements']}")
+        raise HTTPException(status_code=500, detail=f"Data conversion error: {str(e)}")
+    
+    return poll_cache.put(poll_id, poll, statement_clusters)
+
+def summarize_poll_results(cached: CachedPoll, tallies: Dict[int, Any]):
+    """Build the per-statement summary and cluster analysis from materialized tallies.
+    
+    One pass over the statements; each statement's tally is added to the cluster it was
+    resolved to at save time. Returns (response_summary, cluster_analysis).
+    """
+    poll = cached.poll
+    cluster_totals = [[0, 0, 0, 0, 0] for _ in poll.expected_clusters]  # agree, disagree, skip, total, statements
+    
+    # Response summary by statement - use string keys for Pydantic compatibility
+    response_summary = {}
+    for i, statement in enumerate(poll.statements):
+        tally = tallies.get(i)
+        agree = tally['agree_count'] if tally else 0
+        disagree = tally['disagree_count'] if tally else 0
+        skip = tally['skip_count'] if tally else 0
+        total = tally['response_count'] if tally else 0
+        
+        response_summary[str(i)] = {
+            "statement": statement.text,
+            "category": statement.category,
+            "expected_cluster": statement.expected_cluster,
+            "responses": {
+                "agree": agree,
+                "disagree": disagree,
+                "skip": skip
+            },
+            "total_responses": total
+        }
+        
+        cluster_index = cached.statement_clusters[i] if i < len(cached.statement_clusters) else -1
+        if 0 <= cluster_index < len(cluster_totals):
+            totals = cluster_totals[cluster_index]
+            totals[0] += agree
+            totals[1] += disagree
+            totals[2] += skip
+            totals[3] += total
+            totals[4] += 1
+    
+    cluster_analysis = []
+    for cluster, (agree_count, disagree_count, skip_count, total_count, statement_count) in zip(
+        poll.expected_clusters, cluster_totals
+    ):
+        logger.info(f"Cluster '{cluster['name']}': found {statement_count} statements, {total_count} responses")
+        
+        cluster_analysis.append({
+            "cluster_name": cluster['name'],
+            "cluster_description": cluster['description'],
+            "responses": {
+                "agree": agree_count,
+                "disagree": disagree_count,
+                "skip": skip_count
+            },
+            "total_responses": total_count,
+            "agreement_percentage": round((agree_count / total_count * 100) if total_count > 0 else 0, 1)
+        })
+    
+    return response_summary, cluster_analysis
+
+# Conditional GET support
+POLL_CACHE_CONTROL = "public, max-age=3600"
+RESULTS_CACHE_CONTROL = "public, no-cache"  # always revalidate; a 304 costs one counter lookup
+
+def results_etag(cached: CachedPoll, response_version: int) -> str:
+    return f'"{cached.etag.strip(chr(34))}-v{response_version}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers the given strong ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+# Live results streaming (Server-Sent Events)
+RESULTS_STREAM_TICK_MS = int(os.getenv("RESULTS_STREAM_TICK_MS", "1000"))
+RESULTS_STREAM_HEARTBEAT_SECONDS = float(os.getenv("RESULTS_STREAM_HEARTBEAT_SECONDS", "15"))
+RESULTS_STREAM_QUEUE_SIZE = int(os.getenv("RESULTS_STREAM_QUEUE_SIZE", "32"))
+RESULTS_STREAM_HISTORY = int(os.getenv("RESULTS_STREAM_HISTORY", "64"))
+
+# Queue markers for subscribers: fell behind (send a fresh snapshot) / server closing
+STREAM_RESYNC = "resync"
+STREAM_CLOSED = "closed"
+
+def results_snapshot(cached: CachedPoll, tallies: Dict[int, Any], counts_row) -> Dict[str, Any]:
+    """Compact, diffable view of a poll's current results"""
+    response_summary, cluster_analysis = summarize_poll_results(cached, tallies)
+    return {
+        "response_version": counts_row['response_version'] if counts_row else 0,
+        "total_participants": counts_row['participant_count'] if counts_row else 0,
+        "total_responses": counts_row['response_count'] if counts_row else 0,
+        "statements": {
+            index: {**summary["responses"], "total": summary["total_responses"]}
+            for index, summary in response_summary.items()
+        },
+        "clusters": {
+            cluster["cluster_name"]: {
+                **cluster["responses"],
+                "total": cluster["total_responses"],
+                "agreement_percentage": cluster["agreement_percentage"]
+            }
+            for cluster in cluster_analysis
+        }
+    }
+
+def results_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Only the statements and clusters whose counts changed, plus the new totals"""
+    return {
+        "response_version": current["response_version"],
+        "total_participants": current["total_participants"],
+        "total_responses": current["total_responses"],
+        "statements": {
+            key: value for key, value in current["statements"].items()
+            if previous["statements"].get(key) != value
+        },
+        "clusters": {
+            key: value for key, value in current["clusters"].items()
+            if previous["clusters"].get(key) != value
+        }
+    }
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+class ResultsChannel:
+    """Subscribers and coalescing state for one poll's results stream"""
+    
+    def __init__(self, poll_id: str, history_size: int):
+        self.poll_id = poll_id
+        self.subscribers: set = set()
+        self.dirty = False
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.history = deque(maxlen=history_size)  # (from_version, to_version, delta)
+        self.ticker: Optional[asyncio.Task] = None
+
+class ResultsBroadcaster:
+    """Per-poll fan-out of coalesced tally deltas.
+    
+    Commits only mark a poll dirty; one ticker per watched poll re-aggregates at most once per
+    tick and fans the delta out, so a thousand viewers share a single aggregation.
+    """
+    
+    def __init__(self, tick_seconds: float, queue_size: int, history_size: int):
+        self.tick_seconds = tick_seconds
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self._channels: Dict[str, ResultsChannel] = {}
+        self._stats = {"aggregations": 0, "deltas_published": 0, "subscriber_resyncs": 0, "subscriptions": 0}
+    
+    def notify(self, poll_id: str):
+        channel = self._channels.get(poll_id)
+        if channel:
+            channel.dirty = True
+    
+    async def _load_snapshot(self, cached: CachedPoll) -> Dict[str, Any]:
+        tallies, counts_row = await run_db(fetch_poll_tallies, cached.poll.poll_id)
+        self._stats["aggregations"] += 1
+        return results_snapshot(cached, tallies, counts_row)
+    
+    async def subscribe(self, cached: CachedPoll, last_event_id: Optional[int]):
+        """Register a subscriber; returns (queue, initial SSE events)"""
+        poll_id = cached.poll.poll_id
+        channel = self._channels.get(poll_id)
+        if channel is None:
+            channel = ResultsChannel(poll_id, self.history_size)
+            self._channels[poll_id] = channel
+        if channel.snapshot is None:
+            try:
+                channel.snapshot = await self._load_snapshot(cached)
+            except BaseException:
+                # Drop the channel this subscriber created, unless another one has joined it since
+                if not channel.subscribers and self._channels.get(poll_id) is channel:
+                    del self._channels[poll_id]
+                raise
+        
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        channel.subscribers.add(queue)
+        self._stats["subscriptions"] += 1
+        if channel.ticker is None:
+            channel.ticker = asyncio.create_task(self._tick(channel, cached))
+        
+        return queue, self._catch_up_events(channel, last_event_id)
+    
+    def _catch_up_events(self, channel: ResultsChannel, last_event_id: Optional[int]) -> List[str]:
+        current_version = channel.snapshot["response_version"]
+        if last_event_id == current_version:
+            return []
+        if last_event_id is not None:
+            # Replay missed deltas if the history still reaches back to the client's last event
+            replay = []
+            for from_version, to_version, delta in channel.history:
+                if replay or from_version == last_event_id:
+                    replay.append(format_sse("delta", delta, to_version))
+            if replay:
+                return replay
+        return [format_sse("snapshot", channel.snapshot, current_version)]
+    
+    def snapshot_event(self, poll_id: str) -> str:
+        snapshot = self._channels[poll_id].snapshot
+        return format_sse("snapshot", snapshot, snapshot["response_version"])
+    
+    def unsubscribe(self, poll_id: str, queue: asyncio.Queue):
+        channel = self._channels.get(poll_id)
+        if channel is None:
+            return
+        channel.subscribers.discard(queue)
+        if not channel.subscribers:
+            if channel.ticker:
+                channel.ticker.cancel()
+            del self._channels[poll_id]
+    
+    async def _tick(self, channel: ResultsChannel, cached: CachedPoll):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            if not channel.dirty:
+                continue
+            channel.dirty = False
+            try:
+                snapshot = await self._load_snapshot(cached)
+            except Exception as e:
+                logger.error(f"Results stream aggregation failed for poll {channel.poll_id}: {str(e)}")
+                continue
+            
+            previous = channel.snapshot
+            if snapshot["response_version"] == previous["response_version"]:
+                continue
+            delta = results_delta(previous, snapshot)
+            channel.snapshot = snapshot
+            channel.history.append((previous["response_version"], snapshot["response_version"], delta))
+            self._publish(channel, format_sse("delta", delta, snapshot["response_version"]))
+    
+    def _publish(self, channel: ResultsChannel, event: str):
+        self._stats["deltas_published"] += 1
+        for queue in channel.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and have it start over from a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(STREAM_RESYNC)
+                self._stats["subscriber_resyncs"] += 1
+    
+    def close(self):
+        """End every open stream (used on shutdown)"""
+        for channel in list(self._channels.values()):
+            if channel.ticker:
+                channel.ticker.cancel()
+            for queue in channel.subscribers:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(STREAM_CLOSED)
+        self._channels.clear()
+    
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "watched_polls": len(self._channels),
+            "subscribers": sum(len(channel.subscribers) for channel in self._channels.values()),
+            "tick_seconds": self.tick_seconds,
+            **self._stats
+        }
+
+results_broadcaster = ResultsBroadcaster(
+    RESULTS_STREAM_TICK_MS / 1000, RESULTS_STREAM_QUEUE_SIZE, RESULTS_STREAM_HISTORY
+)
+
+def on_responses_committed(poll_id: str, applied: AppliedSubmission):
+    """Hook run on the event loop after a submission for poll_id has been committed"""
+    results_broadcaster.notify(poll_id)
+    online_opinion_groups.on_commit(poll_id, applied)
+
+# Process-pool compute tier: CPU-bound vote-matrix analysis runs in worker processes (the
+# matrix is handed over in shared memory), so it neither holds the GIL nor queues behind DB
+# work; with COMPUTE_WORKERS=0 (the default) it runs on the calling thread pool instead.
+# Opt-in because spawned workers re-import __main__: serve through `uvicorn main:app` when
+# enabling it, as `python main.py` would rerun this module's start-up work in every worker
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", "0"))
+COMPUTE_TIMEOUT_SECONDS = float(os.getenv("COMPUTE_TIMEOUT_SECONDS", "60"))
+COMPUTE_START_METHOD = os.getenv("COMPUTE_START_METHOD", "spawn")
+
+compute_executor = compute_pool.ComputePool(COMPUTE_WORKERS, COMPUTE_TIMEOUT_SECONDS, COMPUTE_START_METHOD)
+
+async def run_matrix_compute(func, matrix: opinion_analysis.VoteMatrix, *args, run=None, **kwargs):
+    """func(matrix, *args, **kwargs) on the compute pool, or through run (default run_db) without one"""
+    if compute_executor.running:
+        return await compute_executor.run(func, matrix, *args, **kwargs)
+    return await (run or run_db)(func, matrix, *args, **kwargs)
+
+# Vote-matrix analysis, cached per poll until its response_version moves on
+VOTE_ANALYSIS_CACHE_MAX_POLLS = int(os.getenv("VOTE_ANALYSIS_CACHE_MAX_POLLS", "16"))
+
+class VoteAnalysis(NamedTuple):
+    response_version: int
+    matrix: opinion_analysis.VoteMatrix
+    sessions: List[str]  # participant session id per matrix row
+    analysis: Dict[str, Any]
+    computed_at: str
+    compute_ms: float
+
+async def compute_vote_analysis(poll_id: str, statement_count: int, run=None) -> VoteAnalysis:
+    """Load the vote matrix through run (default run_db) and analyze it on the compute tier"""
+    started = time.perf_counter()
+    response_version, matrix, sessions = await (run or run_db)(fetch_vote_matrix, poll_id, statement_count)
+    analysis = await run_matrix_compute(opinion_analysis.analyze_votes, matrix, run=run)
+    return VoteAnalysis(
+        response_version, matrix, sessions, analysis, datetime.now().isoformat(),
+        round((time.perf_counter() - started) * 1000, 1)
+    )
+
+class VoteAnalysisCache:
+    """Bounded LRU of the latest VoteAnalysis per poll"""
+    
+    def __init__(self, max_polls: int):
+        self.max_polls = max_polls
+        self._entries: "OrderedDict[str, VoteAnalysis]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+    
+    def get(self, poll_id: str, response_version: int) -> Optional[VoteAnalysis]:
+        entry = self._entries.get(poll_id)
+        if entry is None or entry.response_version != response_version:
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(poll_id)
+        self._stats["hits"] += 1
+        return entry
+    
+    def put(self, poll_id: str, entry: VoteAnalysis) -> VoteAnalysis:
+        current = self._entries.get(poll_id)
+        if current is not None and current.response_version > entry.response_version:
+            return current
+        self._entries[poll_id] = entry
+        self._entries.move_to_end(poll_id)
+        while len(self._entries) > self.max_polls:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+        return entry
+    
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "polls": len(self._entries),
+            "max_polls": self.max_polls,
+            "matrix_bytes": sum(entry.matrix.votes.nbytes + entry.matrix.answered.nbytes for entry in self._entries.values()),
+            **self._stats
+        }
+
+vote_analysis_cache = VoteAnalysisCache(VOTE_ANALYSIS_CACHE_MAX_POLLS)
+
+async def load_vote_analysis(cached: CachedPoll, poll_id: str, response_version: int, run=None) -> VoteAnalysis:
+    """Cached VoteAnalysis for response_version, computed through run (default run_db) on a miss"""
+    entry = vote_analysis_cache.get(poll_id, response_version)
+    if entry is None:
+        entry = vote_analysis_cache.put(
+            poll_id, await compute_vote_analysis(poll_id, len(cached.poll.statements), run)
+        )
+    return entry
+
+# Opinion groups (PCA + k-means), served as opinion_groups analytics snapshots
+OPINION_GROUPS_DEFAULT_K = int(os.getenv("OPINION_GROUPS_DEFAULT_K", "4"))
+OPINION_GROUPS_MAX_K = 8
+
+# Online opinion groups: with "online" the default-k opinion_groups job describes groups kept
+# current on every committed submission; with "refresh" every job reclusters from scratch
+OPINION_GROUPS_MODE = os.getenv("OPINION_GROUPS_MODE", "online")
+OPINION_DRIFT_THRESHOLD = float(os.getenv("OPINION_DRIFT_THRESHOLD", "0.25"))
+OPINION_RECOMPUTE_SECONDS = float(os.getenv("OPINION_RECOMPUTE_SECONDS", "300"))
+
+class OnlinePollGroups:
+    """Online opinion-group state for one poll"""
+    
+    def __init__(self, cached: CachedPoll):
+        self.cached = cached
+        self.model: Optional[opinion_analysis.OnlineOpinionGroups] = None
+        self.response_version = 0
+        self.participant_count = 0  # at the last recompute, reported while too small to group
+        self.seeded_at = 0.0
+        self.recomputed_at: Optional[str] = None
+        self.described: Optional[Dict[str, Any]] = None  # describe() result, valid for response_version
+        self.recompute: Optional[asyncio.Task] = None
+        self.pending: List[AppliedSubmission] = []  # committed while a recompute was loading
+
+class OnlineOpinionGroupTracker:
+    """Keeps the opinion groups of recently analysed polls current from the commit hook.
+    
+    Each committed submission is folded into the poll's OnlineOpinionGroups at constant
+    cost, so an opinion_groups job only describes the current statistics. A full recompute
+    (warm-started from the current groups) runs in the background when drift passes
+    drift_threshold, when updates have been folded in for recompute_seconds, or when the
+    model missed a commit (another worker process, or a poll too small to group yet).
+    Submissions that commit while it loads are replayed on top of its snapshot.
+    """
+    
+    def __init__(self, max_polls: int, k: int, drift_threshold: float, recompute_seconds: float):
+        self.max_polls = max_polls
+        self.k = k
+        self.drift_threshold = drift_threshold
+        self.recompute_seconds = recompute_seconds
+        self._polls: "OrderedDict[str, OnlinePollGroups]" = OrderedDict()
+        self._stats = {
+            "updates": 0,
+            "describes": 0,
+            "recomputes": 0,
+            "seed_recomputes": 0,
+            "drift_recomputes": 0,
+            "scheduled_recomputes": 0,
+            "catch_up_recomputes": 0,
+            "recompute_failures": 0,
+            "replayed": 0
+        }
+    
+    def on_commit(self, poll_id: str, applied: AppliedSubmission):
+        state = self._polls.get(poll_id)
+        if state is None:
+            return
+        if state.recompute is not None:
+            state.pending.append(applied)
+        self._apply(poll_id, state, applied)
+    
+    def _apply(self, poll_id: str, state: OnlinePollGroups, applied: AppliedSubmission):
+        if applied.response_version <= state.response_version:
+            return  # already part of the snapshot the model was built from
+        missed = applied.response_version != state.response_version + 1
+        state.response_version = applied.response_version
+        state.described = None
+        if state.model is None:
+            self._schedule(poll_id, state, "catch_up")
+            return
+        
+        statement_count = len(state.cached.poll.statements)
+        if applied.previous_responses:
+            state.model.remove(
+                *opinion_analysis.vote_vector(applied.previous_responses, statement_count), key=applied.previous_session_id
+            )
+        state.model.add(*opinion_analysis.vote_vector(applied.responses, statement_count), key=applied.session_id)
+        self._stats["updates"] += 1
+        
+        if missed:
+            self._schedule(poll_id, state, "catch_up")
+        elif max(state.model.drift().values()) >= self.drift_threshold:
+            self._schedule(poll_id, state, "drift")
+        elif time.monotonic() - state.seeded_at >= self.recompute_seconds:
+            self._schedule(poll_id, state, "scheduled")
+    
+    def _schedule(self, poll_id: str, state: OnlinePollGroups, reason: str, run=None) -> asyncio.Task:
+        if state.recompute is None:
+            self._stats[f"{reason}_recomputes"] += 1
+            state.pending = []
+            state.recompute = asyncio.ensure_future(self._recompute(poll_id, state, run))
+            state.recompute.add_done_callback(functools.partial(self._finished, poll_id, state))
+        return state.recompute
+    
+    async def _recompute(self, poll_id: str, state: OnlinePollGroups, run=None):
+        self._stats["recomputes"] += 1
+        response_version = await run_db(fetch_response_version, poll_id)
+        analysis = await load_vote_analysis(state.cached, poll_id, response_version, run)
+        previous = state.model.centroids() if state.model is not None else None
+        state.model = await run_matrix_compute(
+            opinion_analysis.OnlineOpinionGroups.from_matrix, analysis.matrix, self.k, previous,
+            keys=analysis.sessions, run=run
+        )
+        state.response_version = analysis.response_version
+        state.participant_count = analysis.matrix.participant_count
+        state.seeded_at = time.monotonic()
+        state.recomputed_at = datetime.now().isoformat()
+        state.described = None
+        
+        pending, state.pending = state.pending, []
+        for applied in sorted(pending, key=lambda applied: applied.response_version):
+            if applied.response_version > state.response_version:
+                self._stats["replayed"] += 1
+            self._apply(poll_id, state, applied)
+    
+    def _finished(self, poll_id: str, state: OnlinePollGroups, task: asyncio.Task):
+        state.recompute = None
+        if not task.cancelled() and task.exception() is not None:
+            self._stats["recompute_failures"] += 1
+            logger.error(f"Opinion group recompute failed for poll {poll_id}: {task.exception()}")
+    
+    async def current(self, cached: CachedPoll, poll_id: str, response_version: int, run=None):
+        """(response_version, describe() result) for a poll, after seeding or catching up the model
+        through run (default run_db) when it is behind response_version"""
+        self._stats["describes"] += 1
+        state = self._polls.get(poll_id)
+        reason = None
+        if state is None:
+            state = OnlinePollGroups(cached)
+            self._polls[poll_id] = state
+            while len(self._polls) > self.max_polls:
+                self._polls.popitem(last=False)
+            reason = "seed"
+        elif response_version > state.response_version:
+            # Committed by another process, or while this poll was still too small to group
+            reason = "catch_up"
+        if reason is not None:
+            await asyncio.shield(self._schedule(poll_id, state, reason, run))
+        self._polls.move_to_end(poll_id)
+        
+        if state.described is None:
+            cached = state.cached
+            if state.model is None:
+                state.described = opinion_analysis.insufficient_groups(self.k, state.participant_count)
+            else:
+                state.described = state.model.describe(cached.statement_clusters, len(cached.poll.expected_clusters))
+            state.described["recomputed_at"] = state.recomputed_at
+        return state.response_version, state.described
+    
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "mode": OPINION_GROUPS_MODE,
+            "polls": len(self._polls),
+            "max_polls": self.max_polls,
+            "recomputing": sum(1 for state in self._polls.values() if state.recompute is not None),
+            "drift_threshold": self.drift_threshold,
+            "recompute_seconds": self.recompute_seconds,
+            **self._stats
+        }
+
+online_opinion_groups = OnlineOpinionGroupTracker(
+    VOTE_ANALYSIS_CACHE_MAX_POLLS, OPINION_GROUPS_DEFAULT_K, OPINION_DRIFT_THRESHOLD, OPINION_RECOMPUTE_SECONDS
+)
+
+# Background analytics jobs: heavy per-poll analytics run on a worker pool from a SQLite job
+# table, and results endpoints serve the last completed snapshot instead of computing inline
+ANALYTICS_WORKERS = int(os.getenv("ANALYTICS_WORKERS", "2"))
+ANALYTICS_JOB_MAX_ATTEMPTS = int(os.getenv("ANALYTICS_JOB_MAX_ATTEMPTS", "3"))
+ANALYTICS_RETRY_BASE_SECONDS = float(os.getenv("ANALYTICS_RETRY_BASE_SECONDS", "2"))
+# Workers are woken by enqueue() and sleep until the next retry is due; this bounds how long
+# a job queued by another process waits to be noticed
+ANALYTICS_POLL_SECONDS = float(os.getenv("ANALYTICS_POLL_SECONDS", "30"))
+ANALYTICS_WAIT_SECONDS = float(os.getenv("ANALYTICS_WAIT_SECONDS", "2"))
+ANALYTICS_SNAPSHOT_CACHE_ENTRIES = int(os.getenv("ANALYTICS_SNAPSHOT_CACHE_ENTRIES", "256"))
+ANALYTICS_JOB_RETENTION_HOURS = float(os.getenv("ANALYTICS_JOB_RETENTION_HOURS", "24"))
+
+analytics_executor = ThreadPoolExecutor(max_workers=max(1, ANALYTICS_WORKERS), thread_name_prefix="analytics")
+
+async def run_analytics(func, *args, **kwargs):
+    """Run blocking analytics work on the analytics executor, off the DB executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(analytics_executor, functools.partial(func, *args, **kwargs))
+
+async def run_analysis_job(cached: CachedPoll, poll_id: str, response_version: int):
+    entry = await load_vote_analysis(cached, poll_id, response_version, run=run_analytics)
+    return entry.response_version, entry.analysis
+
+def opinion_groups_kind(k: int) -> str:
+    return "opinion_groups" if k == OPINION_GROUPS_DEFAULT_K else f"opinion_groups_k{k}"
+
+async def run_opinion_groups_job(cached: CachedPoll, poll_id: str, response_version: int,
+                                 k: int = OPINION_GROUPS_DEFAULT_K):
+    if OPINION_GROUPS_MODE == "online" and k == online_opinion_groups.k:
+        return await online_opinion_groups.current(cached, poll_id, response_version, run=run_analytics)
+    entry = await load_vote_analysis(cached, poll_id, response_version, run=run_analytics)
+    result, _ = await run_matrix_compute(
+        opinion_analysis.opinion_groups, entry.matrix, cached.statement_clusters,
+        len(cached.poll.expected_clusters), k, run=run_analytics
+    )
+    return entry.response_version, result
 
-@app.get("/demo-domains")
-async def get_demo_domains():
-    """Get available demo domains"""
-    return {
-        "available_domains": list(topic_generator.demo_topics.keys()),
-        "description": "Available topic domains for demo generation"
-    }
+# Job kind -> async handler(cached, poll_id, response_version) returning (response_version, payload)
+ANALYTICS_JOB_KINDS = {
+    "analysis": run_analysis_job,
+    **{
+        opinion_groups_kind(k): functools.partial(run_opinion_groups_job, k=k)
+        for k in range(2, OPINION_GROUPS_MAX_K + 1)
+    },
+}
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "community-topic-generator", "timestamp": datetime.now().isoformat()}
+class AnalyticsSnapshot(NamedTuple):
+    poll_id: str
+    kind: str
+    response_version: int
+    payload: Dict[str, Any]
+    computed_at: str
+    compute_ms: float
 
-@app.get("/")
-async def root():
-    """Root endpoint with service info"""
-    return {
-        "service": "Community Polling Topic Generator",
-        "version": "1.0.0",
-        "description": "Generate community-relevant polling topics using LLM or demo data",
-        "endpoints": {
-            "generate": "/generate-topic",
-            "legacy": "/generate-topic-legacy", 
-            "health": "/health",
-            "domains": "/demo-domains",
-            "docs": "/docs"
-        },
-        "features": {
-            "llm_generation": bool(os.getenv("OPENAI_API_KEY")),
-            "demo_domains": list(topic_generator.demo_topics.keys())
+class NonRetryableJobError(Exception):
+    pass
+
+class AnalyticsJobScheduler:
+    """Runs per-poll analytics jobs from the analytics_jobs table and keeps their snapshots.
+    
+    At most one job per poll and kind is pending; enqueueing it again only raises its
+    priority. Worker tasks claim the highest-priority due job, run its handler (blocking work
+    goes to the analytics executor) and store the result as that poll's snapshot for the
+    kind. A failed job is retried with exponential backoff up to max_attempts. Jobs left
+    running by a crash are requeued on start.
+    """
+    
+    PRIORITY_BACKGROUND = 0  # stale snapshot noticed on a results view
+    PRIORITY_STALE = 5  # stale snapshot served from its own endpoint, or an explicit refresh
+    PRIORITY_WAITING = 10  # a request is waiting for the first snapshot
+    REQUEUE_AFTER_SECONDS = 30  # request_refresh() skips keys this process queued more recently
+    
+    def __init__(self, handlers: Dict[str, Any], workers: int, max_attempts: int, retry_base_seconds: float,
+                 poll_seconds: float, snapshot_cache_entries: int, retention_seconds: float):
+        self.handlers = handlers
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.poll_seconds = poll_seconds
+        self.snapshot_cache_entries = snapshot_cache_entries
+        self.retention_seconds = retention_seconds
+        self._snapshots: "OrderedDict[tuple, AnalyticsSnapshot]" = OrderedDict()
+        self._recently_enqueued: Dict[tuple, float] = {}  # (poll_id, kind) -> time.monotonic()
+        self._done: Dict[tuple, asyncio.Event] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self._running_jobs = 0
+        self._last_prune = 0.0
+        self._stats = {
+            "enqueued": 0, "deduplicated": 0, "claimed": 0, "succeeded": 0, "up_to_date": 0,
+            "retried": 0, "failed": 0, "inline_runs": 0
+        }
+    
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+    
+    # Job table access - blocking, called through run_db()
+    def _insert_job(self, poll_id: str, kind: str, priority: int):
+        """(job_id, created) for the pending job of this poll and kind"""
+        now = time.time()
+        with get_db_connection() as conn:
+            with write_transaction(conn):
+                cursor = conn.execute("""
+                    INSERT INTO analytics_jobs (poll_id, kind, priority, status, run_after, created_at)
+                    VALUES (?, ?, ?, 'pending', ?, ?)
+                    ON CONFLICT(poll_id, kind) WHERE status = 'pending' DO UPDATE SET
+                        priority = MAX(priority, excluded.priority)
+                    RETURNING job_id, created_at
+                """, (poll_id, kind, priority, now, now))
+                row = cursor.fetchone()
+                return row['job_id'], row['created_at'] == now
+    
+    def _next_run_after(self) -> Optional[float]:
+        """run_after of the earliest pending job, read without taking the write lock"""
+        with get_db_connection() as conn:
+            return conn.execute(HOT_QUERIES["analytics_job_next"]).fetchone()[0]
+    
+    def _claim_job(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with get_db_connection() as conn:
+            with write_transaction(conn):
+                cursor = conn.execute(HOT_QUERIES["analytics_job_claim"], (now,))
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                conn.execute("""
+                    UPDATE analytics_jobs SET status = 'running', attempts = attempts + 1, started_at = ?
+                    WHERE job_id = ?
+                """, (now, row['job_id']))
+                return {**dict(row), "attempts": row['attempts'] + 1}
+    
+    def _complete_job(self, job_id: int, response_version: int, snapshot: Optional[AnalyticsSnapshot]):
+        with get_db_connection() as conn:
+            with write_transaction(conn):
+                if snapshot is not None:
+                    conn.execute("""
+                        INSERT INTO analytics_snapshots
+                        (poll_id, kind, response_version, payload, computed_at, compute_ms, job_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(poll_id, kind) DO UPDATE SET
+                            response_version = excluded.response_version,
+                            payload = excluded.payload,
+                            computed_at = excluded.computed_at,
+                            compute_ms = excluded.compute_ms,
+                            job_id = excluded.job_id
+                        WHERE excluded.response_version >= analytics_snapshots.response_version
+                    """, (
+                        snapshot.poll_id, snapshot.kind, snapshot.response_version, json.dumps(snapshot.payload),
+                        snapshot.computed_at, snapshot.compute_ms, job_id
+                    ))
+                conn.execute("""
+                    UPDATE analytics_jobs SET status = 'succeeded', finished_at = ?, response_version = ?
+                    WHERE job_id = ?
+                """, (time.time(), response_version, job_id))
+    
+    def _fail_job(self, job: Dict[str, Any], error: str, retryable: bool) -> Optional[float]:
+        """Requeue a failed job with backoff and return the delay, or mark it failed and return None"""
+        now = time.time()
+        with get_db_connection() as conn:
+            with write_transaction(conn):
+                if retryable and job["attempts"] < self.max_attempts:
+                    delay = self.retry_base_seconds * 2 ** (job["attempts"] - 1)
+                    cursor = conn.execute("""
+                        UPDATE OR IGNORE analytics_jobs SET status = 'pending', run_after = ?, last_error = ?
+                        WHERE job_id = ?
+                    """, (now + delay, error, job["job_id"]))
+                    if cursor.rowcount:
+                        return delay
+                    # Otherwise a newer pending job for this poll and kind already covers the retry
+                conn.execute("""
+                    UPDATE analytics_jobs SET status = 'failed', finished_at = ?, last_error = ? WHERE job_id = ?
+                """, (now, error, job["job_id"]))
+                return None
+    
+    def _recover(self):
+        """Requeue jobs a previous process left running"""
+        with get_db_connection() as conn:
+            with write_transaction(conn):
+                cursor = conn.execute("""
+                    UPDATE OR IGNORE analytics_jobs SET status = 'pending', run_after = ? WHERE status = 'running'
+                """, (time.time(),))
+                requeued = cursor.rowcount
+                conn.execute("""
+                    UPDATE analytics_jobs SET status = 'failed', finished_at = ?, last_error = 'Interrupted by restart'
+                    WHERE status = 'running'
+                """, (time.time(),))
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted analytics jobs")
+    
+    def _prune(self):
+        with get_db_connection() as conn:
+            with write_transaction(conn):
+                conn.execute("""
+                    DELETE FROM analytics_jobs WHERE status IN ('succeeded', 'failed') AND created_at < ?
+                """, (time.time() - self.retention_seconds,))
+    
+    def _load_snapshot(self, poll_id: str, kind: str) -> Optional[AnalyticsSnapshot]:
+        with get_db_connection() as conn:
+            cursor = conn.execute("""
+                SELECT response_version, payload, computed_at, compute_ms FROM analytics_snapshots
+                WHERE poll_id = ? AND kind = ?
+            """, (poll_id, kind))
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return AnalyticsSnapshot(
+            poll_id, kind, row['response_version'], json.loads(row['payload']), row['computed_at'], row['compute_ms']
+        )
+    
+    def snapshot_summaries(self, poll_id: str) -> Dict[str, Dict[str, Any]]:
+        with get_db_connection() as conn:
+            cursor = conn.execute(HOT_QUERIES["analytics_snapshots"], (poll_id,))
+            return {
+                row['kind']: {"response_version": row['response_version'], "computed_at": row['computed_at']}
+                for row in cursor.fetchall()
+            }
+    
+    def job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with get_db_connection() as conn:
+            cursor = conn.execute("SELECT * FROM analytics_jobs WHERE job_id = ?", (job_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def jobs(self, poll_id: str, limit: int) -> List[Dict[str, Any]]:
+        with get_db_connection() as conn:
+            cursor = conn.execute("""
+                SELECT * FROM analytics_jobs WHERE poll_id = ? ORDER BY created_at DESC LIMIT ?
+            """, (poll_id, limit))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    # Snapshot tier: recently used snapshots in memory over the analytics_snapshots table
+    def _remember(self, snapshot: AnalyticsSnapshot):
+        key = (snapshot.poll_id, snapshot.kind)
+        current = self._snapshots.get(key)
+        if current is None or current.response_version <= snapshot.response_version:
+            self._snapshots[key] = snapshot
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.snapshot_cache_entries:
+            self._snapshots.popitem(last=False)
+    
+    async def snapshot(self, poll_id: str, kind: str) -> Optional[AnalyticsSnapshot]:
+        snapshot = self._snapshots.get((poll_id, kind))
+        if snapshot is None:
+            snapshot = await run_db(self._load_snapshot, poll_id, kind)
+            if snapshot is not None:
+                self._remember(snapshot)
+        return snapshot
+    
+    async def enqueue(self, poll_id: str, kind: str, priority: int = PRIORITY_STALE) -> int:
+        job_id, created = await run_db(self._insert_job, poll_id, kind, priority)
+        self._stats["enqueued" if created else "deduplicated"] += 1
+        self._recently_enqueued[(poll_id, kind)] = time.monotonic()
+        if self._wake is not None:
+            self._wake.set()
+        return job_id
+    
+    def request_refresh(self, poll_id: str, kind: str, priority: int):
+        """Queue a recompute without waiting, unless this process queued one that is not claimed yet"""
+        key = (poll_id, kind)
+        queued_at = self._recently_enqueued.get(key)
+        if queued_at is not None and time.monotonic() - queued_at < self.REQUEUE_AFTER_SECONDS:
+            return
+        self._recently_enqueued[key] = time.monotonic()
+        task = asyncio.ensure_future(self.enqueue(poll_id, kind, priority))
+        task.add_done_callback(self._enqueued_in_background)
+    
+    def _enqueued_in_background(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Could not queue analytics job: {task.exception()}")
+    
+    async def current(self, cached: CachedPoll, poll_id: str, kind: str, response_version: int,
+                      wait_seconds: float) -> Optional[AnalyticsSnapshot]:
+        """The latest snapshot for a results endpoint.
+        
+        A snapshot behind response_version is served as is while a recompute is queued. With no
+        snapshot yet, a high-priority job is queued and waited on for up to wait_seconds (run
+        inline if the workers are not running); None means it is still being computed.
+        """
+        snapshot = await self.snapshot(poll_id, kind)
+        if snapshot is not None:
+            if snapshot.response_version < response_version:
+                self.request_refresh(poll_id, kind, self.PRIORITY_STALE)
+            return snapshot
+        
+        if not self.running:
+            self._stats["inline_runs"] += 1
+            return await self._execute(cached, poll_id, kind, None)
+        done = self._done.setdefault((poll_id, kind), asyncio.Event())
+        await self.enqueue(poll_id, kind, self.PRIORITY_WAITING)
+        try:
+            await asyncio.wait_for(asyncio.shield(done.wait()), wait_seconds)
+        except asyncio.TimeoutError:
+            return None
+        return self._snapshots.get((poll_id, kind))
+    
+    async def _execute(self, cached: CachedPoll, poll_id: str, kind: str, job_id: Optional[int]) -> AnalyticsSnapshot:
+        response_version = await run_db(fetch_response_version, poll_id)
+        started = time.perf_counter()
+        version, payload = await self.handlers[kind](cached, poll_id, response_version)
+        snapshot = AnalyticsSnapshot(
+            poll_id, kind, version, payload, datetime.now().isoformat(),
+            round((time.perf_counter() - started) * 1000, 1)
+        )
+        await run_db(self._complete_job, job_id, version, snapshot)
+        self._remember(snapshot)
+        return snapshot
+    
+    async def _run_job(self, job: Dict[str, Any]):
+        key = (job["poll_id"], job["kind"])
+        self._recently_enqueued.pop(key, None)
+        self._running_jobs += 1
+        try:
+            if job["kind"] not in self.handlers:
+                raise NonRetryableJobError(f"Unknown analytics job kind: {job['kind']}")
+            cached = await load_shared_poll(job["poll_id"])
+            if cached is None:
+                raise NonRetryableJobError("Poll not found")
+            
+            # Another worker or process may already have caught the snapshot up
+            response_version = await run_db(fetch_response_version, job["poll_id"])
+            stored = await run_db(self._load_snapshot, *key)
+            if stored is not None and stored.response_version >= response_version:
+                self._remember(stored)
+                await run_db(self._complete_job, job["job_id"], stored.response_version, None)
+                self._stats["up_to_date"] += 1
+            else:
+                await self._execute(cached, job["poll_id"], job["kind"], job["job_id"])
+                self._stats["succeeded"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            retry_in = await run_db(self._fail_job, job, str(e), not isinstance(e, NonRetryableJobError))
+            if retry_in is None:
+                self._stats["failed"] += 1
+                logger.error(f"Analytics job {job['job_id']} ({job['kind']} for poll {job['poll_id']}) failed: {str(e)}")
+            else:
+                self._stats["retried"] += 1
+                logger.warning(f"Analytics job {job['job_id']} failed, retrying in {retry_in:.0f}s: {str(e)}")
+        finally:
+            self._running_jobs -= 1
+            done = self._done.pop(key, None)
+            if done is not None:
+                done.set()
+    
+    async def _worker(self):
+        while not self._stopping:
+            self._wake.clear()
+            job = run_after = None
+            try:
+                # Only a due job is worth the BEGIN IMMEDIATE of a claim
+                run_after = await run_db(self._next_run_after)
+                if run_after is not None and run_after <= time.time():
+                    job = await run_db(self._claim_job)
+                if time.monotonic() - self._last_prune > 3600:
+                    self._last_prune = time.monotonic()
+                    await run_db(self._prune)
+            except Exception as e:
+                logger.error(f"Could not claim analytics job: {str(e)}")
+            if job is not None:
+                self._stats["claimed"] += 1
+                await self._run_job(job)
+                continue
+            timeout = self.poll_seconds
+            if run_after is not None:
+                timeout = min(timeout, max(0.0, run_after - time.time()))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def start(self):
+        await run_db(self._recover)
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        if not self.running:
+            return
+        # wait_for can swallow a cancel that lands as the event fires, so workers also check a flag
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "running_jobs": self._running_jobs,
+            "cached_snapshots": len(self._snapshots),
+            "max_attempts": self.max_attempts,
+            **self._stats
         }
-    }
+
+analytics_scheduler = AnalyticsJobScheduler(
+    ANALYTICS_JOB_KINDS, ANALYTICS_WORKERS, ANALYTICS_JOB_MAX_ATTEMPTS, ANALYTICS_RETRY_BASE_SECONDS,
+    ANALYTICS_POLL_SECONDS, ANALYTICS_SNAPSHOT_CACHE_ENTRIES, ANALYTICS_JOB_RETENTION_HOURS * 3600
+)
 
 # Poll sharing endpoints
 @app.post("/save-poll", response_model=Dict[str, str])
@@ -936,18 +4524,18 @@ async def save_poll(request: SavePollRequest):
         # Convert topic to database format
         statements_json = json.dumps([stmt.dict() for stmt in request.topic.statements])
         clusters_json = json.dumps(request.topic.expected_clusters)
+        statement_clusters_json = json.dumps(resolve_statement_clusters(
+            [stmt.expected_cluster for stmt in request.topic.statements],
+            [cluster["name"] for cluster in request.topic.expected_clusters]
+        ))
         metadata_json = json.dumps(request.topic.metadata)
         
         logger.info(f"Converted data - statements: {len(request.topic.statements)} items")
         logger.info(f"Database file: {DATABASE_PATH}")
         
-        with get_db_connection() as conn:
-            logger.info("Database connection established")
-            conn.execute("""
-                INSERT INTO shared_polls 
-                (poll_id, title, description, main_theme, statements, expected_clusters, metadata, created_at, creator_name)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        await run_db(
+            insert_shared_poll,
+            (
                 poll_id,
                 request.topic.title,
                 request.topic.description,
@@ -956,17 +4544,10 @@ async def save_poll(request: SavePollRequest):
                 clusters_json,
                 metadata_json,
                 created_at,
-                request.creator_name
-            ))
-            conn.commit()
-            logger.info(f"Poll {poll_id} successfully saved to database")
-            
-            # Verify the save worked
-            cursor = conn.execute("SELECT poll_id FROM shared_polls WHERE poll_id = ?", (poll_id,))
-            if cursor.fetchone():
-                logger.info(f"Verification: Poll {poll_id} found in database")
-            else:
-                logger.error(f"Verification failed: Poll {poll_id} not found after save")
+                request.creator_name,
+                statement_clusters_json
+            )
+        )
         
         # Log poll sharing activity
         log_user_activity("poll_saved", {
@@ -986,41 +4567,26 @@ async def save_poll(request: SavePollRequest):
         raise HTTPException(status_code=500, detail=f"Error saving poll: {str(e)}")
 
 @app.get("/poll/{poll_id}", response_model=SharedPoll)
-async def get_shared_poll(poll_id: str):
+async def get_shared_poll(poll_id: str, request: Request):
     """Get a shared poll by ID"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM shared_polls WHERE poll_id = ?
-            """, (poll_id,))
-            row = cursor.fetchone()
+        cached = await load_shared_poll(poll_id)
         
-        if not row:
+        if not cached:
             raise HTTPException(status_code=404, detail="Poll not found")
         
-        # Convert back to objects
-        statements = [Statement(**stmt) for stmt in json.loads(row['statements'])]
-        expected_clusters = json.loads(row['expected_clusters'])
-        metadata = json.loads(row['metadata'])
-        
         # Log poll access
         log_user_activity("poll_accessed", {
             "poll_id": poll_id,
-            "title": row['title'],
-            "creator_name": row['creator_name']
+            "title": cached.poll.title,
+            "creator_name": cached.poll.creator_name
         })
         
-        return SharedPoll(
-            poll_id=row['poll_id'],
-            title=row['title'],
-            description=row['description'],
-            main_theme=row['main_theme'],
-            statements=statements,
-            expected_clusters=expected_clusters,
-            metadata=metadata,
-            created_at=row['created_at'],
-            creator_name=row['creator_name']
-        )
+        headers = {"ETag": cached.etag, "Cache-Control": POLL_CACHE_CONTROL}
+        if etag_matches(request, cached.etag):
+            return Response(status_code=304, headers=headers)
+        
+        return Response(content=cached.payload, media_type="application/json", headers=headers)
         
     except HTTPException:
         raise
@@ -1032,19 +4598,11 @@ async def get_shared_poll(poll_id: str):
 async def get_poll_stats():
     """Get basic statistics about shared polls"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.execute("SELECT COUNT(*) as total_polls FROM shared_polls")
-            total_polls = cursor.fetchone()['total_polls']
-            
-            cursor = conn.execute("""
-                SELECT poll_id, title, created_at FROM shared_polls 
-                ORDER BY created_at DESC LIMIT 5
-            """)
-            recent_polls = [dict(row) for row in cursor.fetchall()]
+        stats = await run_db(fetch_poll_stats)
         
         return {
-            "total_shared_polls": total_polls,
-            "recent_polls": recent_polls,
+            "total_shared_polls": stats["total_polls"],
+            "recent_polls": stats["recent_polls"],
             "database_working": True
         }
         
@@ -1063,36 +4621,23 @@ async def debug_database():
         dir_contents = os.listdir(directory) if os.path.exists(directory) else []
         
         # Database info
-        with get_db_connection() as conn:
-            # Check if tables exist
-            cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row['name'] for row in cursor.fetchall()]
-            
-            # Get poll count
-            cursor = conn.execute("SELECT COUNT(*) as count FROM shared_polls")
-            poll_count = cursor.fetchone()['count']
-            
-            # Get response count  
-            cursor = conn.execute("SELECT COUNT(*) as count FROM poll_responses")
-            response_count = cursor.fetchone()['count']
-            
-            # Get recent polls
-            cursor = conn.execute("SELECT poll_id, title, created_at FROM shared_polls ORDER BY created_at DESC LIMIT 3")
-            recent_polls = [dict(row) for row in cursor.fetchall()]
-            
-            return {
-                "database_file": DATABASE_PATH,
-                "file_exists": file_exists,
-                "file_size": file_size,
-                "directory": directory,
-                "directory_contents": dir_contents,
-                "tables": tables,
-                "polls_count": poll_count,
-                "responses_count": response_count,
-                "recent_polls": recent_polls,
-                "status": "healthy",
-                "timestamp": datetime.now().isoformat()
-            }
+        summary = await run_db(fetch_database_summary)
+        
+        return {
+            "database_file": DATABASE_PATH,
+            "file_exists": file_exists,
+            "file_size": file_size,
+            "directory": directory,
+            "directory_contents": dir_contents,
+            "schema_version": summary["schema_version"],
+            "query_plan_full_scans": summary["query_plan_full_scans"],
+            "tables": summary["tables"],
+            "polls_count": summary["polls_count"],
+            "responses_count": summary["responses_count"],
+            "recent_polls": summary["recent_polls"],
+            "status": "healthy",
+            "timestamp": datetime.now().isoformat()
+        }
     except Exception as e:
         logger.error(f"Database debug error: {str(e)}")
         return {
@@ -1103,14 +4648,34 @@ async def debug_database():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/debug/metrics")
+async def debug_metrics():
+    """Internal performance counters for the backend subsystems"""
+    return {
+        "db_pool": db_pool.metrics(),
+        "vote_queue": vote_queue.metrics(),
+        "poll_cache": poll_cache.metrics(),
+        "results_stream": results_broadcaster.metrics(),
+        "activity_log": activity_sink.metrics(),
+        "topic_cache": topic_cache.metrics(),
+        "llm_single_flight": llm_single_flight.metrics(),
+        "llm_circuit_breaker": llm_breaker.metrics(),
+        "llm_latency_budget": llm_latency_budget.metrics(),
+        "topic_pregen": topic_pregen.metrics(),
+        "batch_token_limiter": batch_token_limiter.metrics(),
+        "vote_analysis_cache": vote_analysis_cache.metrics(),
+        "online_opinion_groups": online_opinion_groups.metrics(),
+        "analytics_jobs": analytics_scheduler.metrics(),
+        "compute_pool": compute_executor.metrics(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/health")
 async def health_check():
     """Quick health check that logs database state"""
     try:
         file_exists = os.path.exists(DATABASE_PATH)
-        with get_db_connection() as conn:
-            cursor = conn.execute("SELECT COUNT(*) as count FROM shared_polls")
-            poll_count = cursor.fetchone()['count']
+        poll_count = await run_db(count_shared_polls)
             
         logger.info(f"Health check - DB exists: {file_exists}, Polls: {poll_count}")
         return {
@@ -1131,62 +4696,47 @@ async def health_check():
 async def submit_poll_responses(poll_id: str, request: SubmitPollResponseRequest):
     """Submit responses for a shared poll"""
     try:
-        # Verify poll exists
-        with get_db_connection() as conn:
-            cursor = conn.execute("SELECT poll_id FROM shared_polls WHERE poll_id = ?", (poll_id,))
-            if not cursor.fetchone():
+        if not request.responses:
+            raise HTTPException(status_code=400, detail="A submission needs at least one response")
+        for response in request.responses:
+            if "statementIndex" not in response or "response" not in response:
+                raise HTTPException(status_code=400, detail="Each response needs a statementIndex and a response")
+        
+        if vote_queue.running:
+            if not await load_shared_poll(poll_id):
                 raise HTTPException(status_code=404, detail="Poll not found")
+            
+            # Write-behind: the writer task commits this and logs the submission afterwards
+            participant_session_id = str(uuid.uuid4())
+            vote_queue.submit({
+                "poll_id": poll_id,
+                "participant_name": request.participant_name,
+                "responses": request.responses,
+                "participant_session_id": participant_session_id,
+                "timestamp": datetime.now().isoformat()
+            })
+            
+            return {
+                "success": True,
+                "participant_session_id": participant_session_id,
+                "responses_saved": len(request.responses),
+                "is_retake": None,
+                "queued": True
+            }
+        
+        participant_session_id, applied = await run_db(
+            store_poll_responses, poll_id, request.participant_name, request.responses
+        )
+        on_responses_committed(poll_id, applied)
+        existing_session_id = applied.previous_session_id
         
-        # Check if participant has already responded
-        existing_session_id = None
-        if request.participant_name:
-            with get_db_connection() as conn:
-                cursor = conn.execute("""
-                    SELECT DISTINCT participant_session_id 
-                    FROM poll_responses 
-                    WHERE poll_id = ? AND participant_name = ?
-                    ORDER BY timestamp DESC LIMIT 1
-                """, (poll_id, request.participant_name))
-                existing_row = cursor.fetchone()
-                if existing_row:
-                    existing_session_id = existing_row['participant_session_id']
-        
-        # If retaking, delete previous responses
         if existing_session_id:
-            with get_db_connection() as conn:
-                conn.execute("""
-                    DELETE FROM poll_responses 
-                    WHERE poll_id = ? AND participant_session_id = ?
-                """, (poll_id, existing_session_id))
-                conn.commit()
-            
             log_user_activity("poll_retaken", {
                 "poll_id": poll_id,
                 "participant_name": request.participant_name,
                 "previous_session_id": existing_session_id
             })
         
-        # Generate a new session ID for this participant
-        participant_session_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
-        
-        # Save all responses
-        with get_db_connection() as conn:
-            for response in request.responses:
-                conn.execute("""
-                    INSERT INTO poll_responses 
-                    (poll_id, participant_name, statement_index, response, timestamp, participant_session_id)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    poll_id,
-                    request.participant_name,
-                    response["statementIndex"],
-                    response["response"],
-                    timestamp,
-                    participant_session_id
-                ))
-            conn.commit()
-        
         # Log the response submission
         log_user_activity("poll_responses_submitted", {
             "poll_id": poll_id,
@@ -1213,151 +4763,75 @@ async def submit_poll_responses(poll_id: str, request: SubmitPollResponseRequest
 async def check_participant_status(poll_id: str, participant_name: str):
     """Check if a participant has already taken the poll"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.execute("""
-                SELECT COUNT(*) as response_count, MAX(timestamp) as last_taken
-                FROM poll_responses 
-                WHERE poll_id = ? AND participant_name = ?
-            """, (poll_id, participant_name))
-            result = cursor.fetchone()
-            
-            has_responded = result['response_count'] > 0
-            
-            return {
-                "has_responded": has_responded,
-                "response_count": result['response_count'],
-                "last_taken": result['last_taken'] if has_responded else None
-            }
-            
+        result = await run_db(fetch_participant_status, poll_id, participant_name)
+        
+        has_responded = result['response_count'] > 0
+        
+        return {
+            "has_responded": has_responded,
+            "response_count": result['response_count'],
+            "last_taken": result['last_taken'] if has_responded else None
+        }
+        
     except Exception as e:
         logger.error(f"Error checking participant status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error checking participant status: {str(e)}")
 
 @app.get("/poll/{poll_id}/results", response_model=PollResultsResponse)
-async def get_poll_results(poll_id: str):
+async def get_poll_results(poll_id: str, request: Request, response: Response):
     """Get aggregated results for a shared poll"""
     try:
         logger.info(f"Fetching results for poll ID: {poll_id}")
         
         # Get poll data
-        with get_db_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM shared_polls WHERE poll_id = ?
-            """, (poll_id,))
-            poll_row = cursor.fetchone()
-            
-            if not poll_row:
-                logger.warning(f"Poll not found: {poll_id}")
-                raise HTTPException(status_code=404, detail="Poll not found")
-            
-            # Get all responses for this poll
-            cursor = conn.execute("""
-                SELECT participant_session_id, participant_name, statement_index, response, timestamp
-                FROM poll_responses 
-                WHERE poll_id = ?
-                ORDER BY timestamp
-            """, (poll_id,))
-            responses = cursor.fetchall()
+        cached = await load_shared_poll(poll_id)
         
-        logger.info(f"Found {len(responses)} responses for poll {poll_id}")
+        if not cached:
+            logger.warning(f"Poll not found: {poll_id}")
+            raise HTTPException(status_code=404, detail="Poll not found")
         
-        # Convert poll data back to objects with error handling
-        try:
-            statements_data = json.loads(poll_row['statements'])
-            statements = [Statement(**stmt) for stmt in statements_data]
-            expected_clusters = json.loads(poll_row['expected_clusters'])
-            metadata = json.loads(poll_row['metadata'])
-            
-            # VALIDATE: Ensure exactly 4 clusters
-            if len(expected_clusters) != 4:
-                logger.warning(f"Poll {poll_id} has {len(expected_clusters)} clusters instead of 4")
-                
-        except Exception as e:
-            logger.error(f"Error converting poll data for poll {poll_id}: {str(e)}")
-            logger.error(f"Raw data - statements: {poll_row['statements']}")
-            raise HTTPException(status_code=500, detail=f"Data conversion error: {str(e)}")
-        
-        poll = SharedPoll(
-            poll_id=poll_row['poll_id'],
-            title=poll_row['title'],
-            description=poll_row['description'],
-            main_theme=poll_row['main_theme'],
-            statements=statements,
-            expected_clusters=expected_clusters,
-            metadata=metadata,
-            created_at=poll_row['created_at'],
-            creator_name=poll_row['creator_name']
-        )
+        poll = cached.poll
         
-        # Calculate aggregated results - handle empty responses
-        total_participants = len(set(row['participant_session_id'] for row in responses)) if responses else 0
-        logger.info(f"Poll {poll_id} has {total_participants} unique participants and {len(responses)} total responses")
-        
-        # Response summary by statement - use string keys for Pydantic compatibility
-        response_summary = {}
-        for i, statement in enumerate(statements):
-            statement_responses = [r for r in responses if r['statement_index'] == i]
-            response_summary[str(i)] = {
-                "statement": statement.text,
-                "category": statement.category,
-                "expected_cluster": statement.expected_cluster,
-                "responses": {
-                    "agree": len([r for r in statement_responses if r['response'] == 'agree']),
-                    "disagree": len([r for r in statement_responses if r['response'] == 'disagree']),
-                    "skip": len([r for r in statement_responses if r['response'] == 'skip'])
-                },
-                "total_responses": len(statement_responses)
-            }
+        # Revalidation: an unchanged response version means the client's copy is current
+        if request.headers.get("if-none-match"):
+            etag = results_etag(cached, await run_db(fetch_response_version, poll_id))
+            if etag_matches(request, etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": RESULTS_CACHE_CONTROL})
         
-        # Cluster analysis with improved matching
-        cluster_analysis = []
-        for cluster in expected_clusters:
-            # Try exact match first, then case-insensitive, then contains
-            cluster_statements = []
-            cluster_name = cluster['name']
-            
-            for i, stmt in enumerate(statements):
-                stmt_cluster = stmt.expected_cluster
-                if (stmt_cluster == cluster_name or 
-                    stmt_cluster.lower() == cluster_name.lower() or
-                    stmt_cluster.lower() in cluster_name.lower() or
-                    cluster_name.lower() in stmt_cluster.lower()):
-                    cluster_statements.append(i)
-            
-            cluster_responses = [r for r in responses if r['statement_index'] in cluster_statements]
-            
-            agree_count = len([r for r in cluster_responses if r['response'] == 'agree'])
-            disagree_count = len([r for r in cluster_responses if r['response'] == 'disagree'])
-            skip_count = len([r for r in cluster_responses if r['response'] == 'skip'])
-            total_count = len(cluster_responses)
-            
-            logger.info(f"Cluster '{cluster_name}': found {len(cluster_statements)} statements, {total_count} responses")
-            
-            cluster_analysis.append({
-                "cluster_name": cluster['name'],
-                "cluster_description": cluster['description'],
-                "responses": {
-                    "agree": agree_count,
-                    "disagree": disagree_count,
-                    "skip": skip_count
-                },
-                "total_responses": total_count,
-                "agreement_percentage": round((agree_count / total_count * 100) if total_count > 0 else 0, 1)
-            })
+        tallies, counts_row = await run_db(fetch_poll_tallies, poll_id)
+        response_version = counts_row['response_version'] if counts_row else 0
+        response.headers["ETag"] = results_etag(cached, response_version)
+        response.headers["Cache-Control"] = RESULTS_CACHE_CONTROL
+        total_participants = counts_row['participant_count'] if counts_row else 0
+        total_responses = counts_row['response_count'] if counts_row else 0
+        logger.info(f"Found {total_responses} responses for poll {poll_id}")
+        
+        logger.info(f"Poll {poll_id} has {total_participants} unique participants and {total_responses} total responses")
+        
+        response_summary, cluster_analysis = summarize_poll_results(cached, tallies)
+        
+        # Heavy analytics are never computed here: point at the last completed snapshots and
+        # queue a background recompute for any that have fallen behind
+        analytics = await run_db(analytics_scheduler.snapshot_summaries, poll_id)
+        for kind, summary in analytics.items():
+            summary["stale"] = summary["response_version"] < response_version
+            if summary["stale"]:
+                analytics_scheduler.request_refresh(poll_id, kind, analytics_scheduler.PRIORITY_BACKGROUND)
         
         # Log results access
         log_user_activity("poll_results_accessed", {
             "poll_id": poll_id,
             "total_participants": total_participants,
-            "total_responses": len(responses),
-            "cluster_count": len(expected_clusters)
+            "total_responses": total_responses,
+            "cluster_count": len(poll.expected_clusters)
         })
         
         result = PollResultsResponse(
             poll=poll,
             total_participants=total_participants,
             response_summary=response_summary,
-            cluster_analysis=cluster_analysis
+            cluster_analysis=cluster_analysis,
+            analytics=analytics
         )
         
         logger.info(f"Successfully generated results for poll {poll_id}")
@@ -1371,46 +4845,269 @@ async def get_poll_results(poll_id: str):
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Error getting poll results: {str(e)}")
 
+@app.get("/poll/{poll_id}/results/stream")
+async def stream_poll_results(poll_id: str, request: Request, last_event_id: Optional[int] = None):
+    """Server-Sent Events stream of live results: a snapshot, then coalesced tally deltas"""
+    cached = await load_shared_poll(poll_id)
+    if not cached:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    
+    # EventSource resends the last id it saw as a header when it reconnects
+    header_event_id = request.headers.get("last-event-id")
+    if header_event_id and header_event_id.isdigit():
+        last_event_id = int(header_event_id)
+    
+    queue, initial_events = await results_broadcaster.subscribe(cached, last_event_id)
+    
+    log_user_activity("poll_results_stream_opened", {
+        "poll_id": poll_id,
+        "last_event_id": last_event_id
+    })
+    
+    async def event_stream():
+        try:
+            yield f"retry: {int(RESULTS_STREAM_HEARTBEAT_SECONDS * 1000)}\n\n"
+            for event in initial_events:
+                yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=RESULTS_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event == STREAM_CLOSED:
+                    break
+                if event == STREAM_RESYNC:
+                    event = results_broadcaster.snapshot_event(poll_id)
+                yield event
+        finally:
+            results_broadcaster.unsubscribe(poll_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def analytics_pending_response(poll_id: str, kind: str) -> JSONResponse:
+    """202 for a first snapshot that is still being computed in the background"""
+    return JSONResponse(status_code=202, headers={"Retry-After": str(max(1, round(ANALYTICS_WAIT_SECONDS)))}, content={
+        "poll_id": poll_id,
+        "kind": kind,
+        "status": "computing",
+        "detail": "The first snapshot is being computed; retry shortly or check /analytics/jobs"
+    })
+
+@app.get("/poll/{poll_id}/analysis")
+async def get_poll_analysis(poll_id: str, request: Request, response: Response):
+    """Consensus, divisiveness and statement correlations from the participant x statement vote matrix"""
+    cached = await load_shared_poll(poll_id)
+    if not cached:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    
+    response_version = await run_db(fetch_response_version, poll_id)
+    etag = results_etag(cached, response_version)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": RESULTS_CACHE_CONTROL})
+    
+    snapshot = await analytics_scheduler.current(cached, poll_id, "analysis", response_version, ANALYTICS_WAIT_SECONDS)
+    if snapshot is None:
+        return analytics_pending_response(poll_id, "analysis")
+    etag = results_etag(cached, snapshot.response_version)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": RESULTS_CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = RESULTS_CACHE_CONTROL
+    
+    analysis = snapshot.payload
+    log_user_activity("poll_analysis_accessed", {
+        "poll_id": poll_id,
+        "participant_count": analysis["participant_count"],
+        "compute_ms": snapshot.compute_ms
+    })
+    
+    statements = cached.poll.statements
+    return {
+        "poll_id": poll_id,
+        "response_version": snapshot.response_version,
+        "latest_response_version": max(response_version, snapshot.response_version),
+        "stale": snapshot.response_version < response_version,
+        "computed_at": snapshot.computed_at,
+        "compute_ms": snapshot.compute_ms,
+        **analysis,
+        "statements": [
+            {
+                **item,
+                "statement": statements[item["index"]].text,
+                "expected_cluster": statements[item["index"]].expected_cluster
+            }
+            for item in analysis["statements"]
+        ]
+    }
+
+@app.get("/poll/{poll_id}/analytics/{kind}")
+async def get_poll_analytics_snapshot(poll_id: str, kind: str, request: Request, response: Response):
+    """Last completed snapshot of a background analytics job, queueing a recompute when it is behind"""
+    if kind not in ANALYTICS_JOB_KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown analytics kind: {kind}")
+    cached = await load_shared_poll(poll_id)
+    if not cached:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    
+    response_version = await run_db(fetch_response_version, poll_id)
+    snapshot = await analytics_scheduler.current(cached, poll_id, kind, response_version, ANALYTICS_WAIT_SECONDS)
+    if snapshot is None:
+        return analytics_pending_response(poll_id, kind)
+    etag = f'{results_etag(cached, snapshot.response_version)[:-1]}-{kind}"'
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": RESULTS_CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = RESULTS_CACHE_CONTROL
+    
+    return {
+        "poll_id": poll_id,
+        "kind": kind,
+        "response_version": snapshot.response_version,
+        "latest_response_version": max(response_version, snapshot.response_version),
+        "stale": snapshot.response_version < response_version,
+        "computed_at": snapshot.computed_at,
+        "compute_ms": snapshot.compute_ms,
+        "result": snapshot.payload
+    }
+
+@app.post("/poll/{poll_id}/analytics/{kind}/refresh")
+async def refresh_poll_analytics(poll_id: str, kind: str, priority: int = AnalyticsJobScheduler.PRIORITY_STALE):
+    """Queue a recompute of one analytics kind for a poll (deduplicated against a pending one)"""
+    if kind not in ANALYTICS_JOB_KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown analytics kind: {kind}")
+    if not await load_shared_poll(poll_id):
+        raise HTTPException(status_code=404, detail="Poll not found")
+    job_id = await analytics_scheduler.enqueue(poll_id, kind, priority)
+    return await run_db(analytics_scheduler.job, job_id)
+
+@app.get("/analytics/jobs")
+async def get_analytics_jobs(poll_id: str, limit: int = 20):
+    """Most recent analytics jobs for a poll, with status, attempts and last error"""
+    jobs = await run_db(analytics_scheduler.jobs, poll_id, min(max(limit, 1), 200))
+    return {"poll_id": poll_id, "jobs": jobs, "count": len(jobs)}
+
+@app.get("/analytics/jobs/{job_id}")
+async def get_analytics_job(job_id: int):
+    """Status of one analytics job"""
+    job = await run_db(analytics_scheduler.job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/poll/{poll_id}/opinion-groups")
+async def get_poll_opinion_groups(poll_id: str, request: Request, response: Response, k: int = OPINION_GROUPS_DEFAULT_K):
+    """Participant opinion groups from PCA + k-means, with how they line up with the expected clusters"""
+    cached = await load_shared_poll(poll_id)
+    if not cached:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    k = min(max(k, 2), OPINION_GROUPS_MAX_K)
+    kind = opinion_groups_kind(k)
+    
+    response_version = await run_db(fetch_response_version, poll_id)
+    etag = f'{results_etag(cached, response_version)[:-1]}-k{k}"'
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": RESULTS_CACHE_CONTROL})
+    
+    snapshot = await analytics_scheduler.current(cached, poll_id, kind, response_version, ANALYTICS_WAIT_SECONDS)
+    if snapshot is None:
+        return analytics_pending_response(poll_id, kind)
+    etag = f'{results_etag(cached, snapshot.response_version)[:-1]}-k{k}"'
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": RESULTS_CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = RESULTS_CACHE_CONTROL
+    
+    result = snapshot.payload
+    log_user_activity("poll_opinion_groups_accessed", {
+        "poll_id": poll_id,
+        "k": k,
+        "stale": snapshot.response_version < response_version,
+        "participant_count": result["participant_count"]
+    })
+    
+    statements = cached.poll.statements
+    clusters = cached.poll.expected_clusters
+    return {
+        "poll_id": poll_id,
+        "response_version": snapshot.response_version,
+        "latest_response_version": max(response_version, snapshot.response_version),
+        "stale": snapshot.response_version < response_version,
+        "computed_at": snapshot.computed_at,
+        "compute_ms": snapshot.compute_ms,
+        **result,
+        "groups": [
+            {
+                **group,
+                "expected_cluster": None if group["matched_cluster"] is None else clusters[group["matched_cluster"]].get("name"),
+                "representative_statements": [
+                    {**item, "statement": statements[item["index"]].text}
+                    for item in group["representative_statements"]
+                ]
+            }
+            for group in result["groups"]
+        ]
+    }
+
+def parse_time_filter(value: Optional[str], name: str) -> Optional[float]:
+    """Parse an ISO-8601 query parameter into a unix timestamp"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected an ISO-8601 datetime")
+
+@app.get("/analytics/activity/counts")
+async def get_activity_counts(group_by: str = "activity_type", activity_type: Optional[str] = None,
+                              poll_id: Optional[str] = None, since: Optional[str] = None,
+                              until: Optional[str] = None):
+    """Count activity events by type, poll, hour or day over an optional [since, until) window"""
+    if group_by not in ActivityEventStore.GROUP_BY_COLUMNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"group_by must be one of {', '.join(ActivityEventStore.GROUP_BY_COLUMNS)}"
+        )
+    
+    buckets = await run_db(
+        activity_store.counts, group_by, activity_type, poll_id,
+        parse_time_filter(since, "since"), parse_time_filter(until, "until")
+    )
+    return {
+        "group_by": group_by,
+        "buckets": buckets,
+        "total": sum(bucket["count"] for bucket in buckets)
+    }
+
+@app.get("/analytics/activity/events")
+async def get_activity_events(activity_type: Optional[str] = None, poll_id: Optional[str] = None,
+                              since: Optional[str] = None, until: Optional[str] = None, limit: int = 100):
+    """Most recent activity events matching the filters"""
+    events = await run_db(
+        activity_store.events, activity_type, poll_id,
+        parse_time_filter(since, "since"), parse_time_filter(until, "until"), min(max(limit, 1), 1000)
+    )
+    return {"events": events, "count": len(events)}
+
 @app.get("/poll/{poll_id}/debug")
 async def debug_poll_participants(poll_id: str):
     """Debug endpoint to show all participants and their session IDs"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.execute("""
-                SELECT participant_session_id, participant_name, COUNT(*) as response_count, 
-                       MIN(timestamp) as first_response, MAX(timestamp) as last_response
-                FROM poll_responses 
-                WHERE poll_id = ?
-                GROUP BY participant_session_id, participant_name
-                ORDER BY first_response
-            """, (poll_id,))
-            participants = [dict(row) for row in cursor.fetchall()]
-            
-            # Get total unique session IDs
-            cursor = conn.execute("""
-                SELECT COUNT(DISTINCT participant_session_id) as unique_participants
-                FROM poll_responses 
-                WHERE poll_id = ?
-            """, (poll_id,))
-            unique_count = cursor.fetchone()['unique_participants']
-            
-            # Get all responses for detailed view
-            cursor = conn.execute("""
-                SELECT participant_session_id, participant_name, statement_index, response, timestamp
-                FROM poll_responses 
-                WHERE poll_id = ?
-                ORDER BY participant_session_id, statement_index
-            """, (poll_id,))
-            all_responses = [dict(row) for row in cursor.fetchall()]
-            
-            return {
-                "poll_id": poll_id,
-                "unique_participants": unique_count,
-                "participant_details": participants,
-                "total_responses": len(all_responses),
-                "all_responses": all_responses[:50]  # Limit to first 50 for readability
-            }
-            
+        debug_info = await run_db(fetch_poll_participants_debug, poll_id)
+        all_responses = debug_info["all_responses"]
+        
+        return {
+            "poll_id": poll_id,
+            "unique_participants": debug_info["unique_count"],
+            "participant_details": debug_info["participants"],
+            "total_responses": len(all_responses),
+            "all_responses": all_responses[:50]  # Limit to first 50 for readability
+        }
+        
     except Exception as e:
         logger.error(f"Error debugging poll participants: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Debug error: {str(e)}")
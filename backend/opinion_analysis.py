@@ -0,0 +1,492 @@
+"""Vote-matrix analysis for poll responses.
+
+Plain functions over NumPy arrays with no app, database or logging state, so worker
+processes can import this module as cheaply as the API server does.
+"""
+import itertools
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+AGREE = 1
+DISAGREE = -1
+SKIP = 0
+
+class VoteMatrix(NamedTuple):
+    """Participant x statement votes for one poll"""
+    votes: np.ndarray  # int8: +1 agree, -1 disagree, 0 skip or not answered
+    answered: np.ndarray  # bool: True where the participant responded, skips included
+
+    @property
+    def participant_count(self) -> int:
+        return self.votes.shape[0]
+
+    @property
+    def statement_count(self) -> int:
+        return self.votes.shape[1]
+
+# Packed storage format: each participant's votes as 2-bit codes in 64-bit integers, which
+# SQLite can build with one SUM per participant. 31 statements fit per (signed) word.
+STATEMENTS_PER_WORD = 31
+PACKED_CODES = {"disagree": 1, "skip": 2, "agree": 3}  # 0 = not answered
+CODE_VOTES = np.array([0, DISAGREE, SKIP, AGREE], dtype=np.int8)
+
+def packed_word_count(statement_count: int) -> int:
+    return max(1, -(-statement_count // STATEMENTS_PER_WORD))
+
+def vote_matrix_from_packed(rows: Iterable[tuple], statement_count: int) -> VoteMatrix:
+    """Build a VoteMatrix from one row of packed_word_count() packed words per participant"""
+    words = packed_word_count(statement_count)
+    packed = np.fromiter(
+        itertools.chain.from_iterable(rows), dtype=np.int64
+    ).reshape(-1, words).view(np.uint64)
+    statements = np.arange(statement_count)
+    shifts = (2 * (statements % STATEMENTS_PER_WORD)).astype(np.uint64)
+    codes = ((packed[:, statements // STATEMENTS_PER_WORD] >> shifts) & np.uint64(3)).astype(np.intp)
+    return VoteMatrix(CODE_VOTES[codes], codes > 0)
+
+def vote_vector(responses: Iterable[tuple], statement_count: int):
+    """(votes, answered) row for one participant from (statement_index, response) pairs"""
+    codes = np.zeros(statement_count, dtype=np.intp)
+    for statement_index, response in responses:
+        if 0 <= statement_index < statement_count:
+            codes[statement_index] = PACKED_CODES.get(response, 0)
+    return CODE_VOTES[codes], codes > 0
+
+def statement_statistics(matrix: VoteMatrix) -> Dict[str, np.ndarray]:
+    """Per-statement counts plus consensus and divisiveness.
+
+    consensus is the mean of the agree/disagree votes cast (-1 to 1; NaN with no votes).
+    divisiveness is 1 for an even split that nobody skipped, falling towards 0 as the vote
+    becomes one-sided or the statement is mostly skipped.
+    """
+    agree = np.count_nonzero(matrix.votes == AGREE, axis=0)
+    disagree = np.count_nonzero(matrix.votes == DISAGREE, axis=0)
+    seen = np.count_nonzero(matrix.answered, axis=0)
+    cast = agree + disagree
+    with np.errstate(invalid="ignore", divide="ignore"):
+        consensus = (agree - disagree) / cast
+        divisiveness = (1 - np.abs(consensus)) * (cast / seen)
+    return {
+        "agree": agree,
+        "disagree": disagree,
+        "skip": seen - cast,
+        "seen": seen,
+        "consensus": consensus,
+        "divisiveness": divisiveness
+    }
+
+def statement_correlations(matrix: VoteMatrix) -> np.ndarray:
+    """Pearson correlation between every pair of statement columns (NaN for a constant column)"""
+    if matrix.participant_count < 2:
+        return np.full((matrix.statement_count, matrix.statement_count), np.nan)
+    x = matrix.votes.astype(np.float64)
+    x -= x.mean(axis=0)
+    covariance = x.T @ x
+    spread = np.sqrt(np.diag(covariance))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return covariance / np.outer(spread, spread)
+
+def rounded(values: np.ndarray, digits: int = 3) -> List[Optional[float]]:
+    """JSON-ready list with NaN as None"""
+    return [None if np.isnan(value) else round(float(value), digits) for value in values]
+
+def analyze_votes(matrix: VoteMatrix, top_pairs: int = 5) -> Dict[str, Any]:
+    """Consensus, divisiveness and statement correlations for a poll as plain JSON types"""
+    stats = statement_statistics(matrix)
+    correlations = statement_correlations(matrix)
+    consensus = rounded(stats["consensus"])
+    divisiveness = rounded(stats["divisiveness"])
+
+    statements = [
+        {
+            "index": index,
+            "agree": int(stats["agree"][index]),
+            "disagree": int(stats["disagree"][index]),
+            "skip": int(stats["skip"][index]),
+            "consensus": consensus[index],
+            "divisiveness": divisiveness[index]
+        }
+        for index in range(matrix.statement_count)
+    ]
+
+    upper_a, upper_b = np.triu_indices(matrix.statement_count, k=1)
+    pair_values = correlations[upper_a, upper_b]
+    finite = np.flatnonzero(np.isfinite(pair_values))
+    strongest = finite[np.argsort(-np.abs(pair_values[finite]), kind="stable")[:top_pairs]]
+
+    return {
+        "participant_count": matrix.participant_count,
+        "vote_count": int(np.count_nonzero(matrix.answered)),
+        "statements": statements,
+        "most_consensus": [int(i) for i in np.argsort(-np.nan_to_num(np.abs(stats["consensus"]), nan=-1), kind="stable")],
+        "most_divisive": [int(i) for i in np.argsort(-np.nan_to_num(stats["divisiveness"], nan=-1), kind="stable")],
+        "correlations": [rounded(row) for row in correlations],
+        "strongest_pairs": [
+            {"statements": [int(upper_a[i]), int(upper_b[i])], "correlation": round(float(pair_values[i]), 3)}
+            for i in strongest
+        ]
+    }
+
+def principal_axes(count: int, vote_sum: np.ndarray, cross: np.ndarray, components: int):
+    """Top principal axes from vote moments: participant count, per-statement vote sums and
+    the X^T X cross-product matrix.
+
+    Returns (mean, basis, explained_variance_ratio) where basis rows are unit component
+    vectors in statement space, each signed so its largest loading is positive (keeping
+    orientation stable as votes arrive).
+    """
+    mean = vote_sum / max(count, 1)
+    covariance = (cross - count * np.outer(mean, mean)) / max(1, count - 1)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    eigenvalues = np.maximum(eigenvalues, 0)
+    order = np.argsort(eigenvalues)[::-1][:components]
+    basis = eigenvectors[:, order].T
+    signs = np.sign(basis[np.arange(len(basis)), np.abs(basis).argmax(axis=1)])
+    basis *= np.where(signs == 0, 1, signs)[:, None]
+    total = eigenvalues.sum()
+    explained = eigenvalues[order] / total if total > 0 else np.zeros(len(order))
+    return mean, basis, explained
+
+def principal_components(votes: np.ndarray, components: int):
+    """(mean, basis, explained_variance_ratio, projection) for a participant x statement matrix"""
+    x = votes.astype(np.float64)
+    mean, basis, explained = principal_axes(len(x), x.sum(axis=0), x.T @ x, components)
+    return mean, basis, explained, (x - mean) @ basis.T
+
+def kmeans(points: np.ndarray, k: int, initial: Optional[np.ndarray] = None,
+           max_iterations: int = 50, tolerance: float = 1e-4, seed: int = 0):
+    """Lloyd's k-means, seeded with k-means++ unless initial centroids are given.
+
+    Returns (labels, centroids, iterations). A cluster that empties out is re-seeded
+    with the point farthest from its centroid.
+    """
+    rng = np.random.default_rng(seed)
+    if initial is not None and initial.shape == (k, points.shape[1]):
+        centroids = initial.astype(np.float64).copy()
+    else:
+        centroids = np.empty((k, points.shape[1]))
+        centroids[0] = points[rng.integers(len(points))]
+        closest = ((points - centroids[0]) ** 2).sum(axis=1)
+        for j in range(1, k):
+            total = closest.sum()
+            index = rng.choice(len(points), p=closest / total) if total > 0 else rng.integers(len(points))
+            centroids[j] = points[index]
+            closest = np.minimum(closest, ((points - centroids[j]) ** 2).sum(axis=1))
+
+    for iteration in range(1, max_iterations + 1):
+        labels, distances = nearest_centroids(points, centroids)
+        sizes = np.bincount(labels, minlength=k)
+        updated = np.stack([np.bincount(labels, weights=points[:, d], minlength=k) for d in range(points.shape[1])], axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            updated /= sizes[:, None]
+        for j in np.flatnonzero(sizes == 0):
+            updated[j] = points[distances.argmax()]
+        shift = np.abs(updated - centroids).max()
+        centroids = updated
+        if shift < tolerance:
+            break
+    return nearest_centroids(points, centroids)[0], centroids, iteration
+
+def nearest_centroids(points: np.ndarray, centroids: np.ndarray):
+    """(labels, squared distance to the assigned centroid) via |x|^2 - 2x.c + |c|^2, one matmul"""
+    partial = (centroids ** 2).sum(axis=1) - 2 * (points @ centroids.T)
+    labels = partial.argmin(axis=1)
+    return labels, np.maximum(partial[np.arange(len(points)), labels] + (points ** 2).sum(axis=1), 0)
+
+def match_groups_to_clusters(alignment: np.ndarray) -> List[Optional[int]]:
+    """Greedy one-to-one match of groups (rows) to expected clusters (columns) by alignment"""
+    matches: List[Optional[int]] = [None] * alignment.shape[0]
+    scores = np.where(np.isnan(alignment), -np.inf, alignment)
+    for _ in range(min(alignment.shape)):
+        group, cluster = np.unravel_index(np.argmax(scores), scores.shape)
+        if not np.isfinite(scores[group, cluster]):
+            break
+        matches[group] = int(cluster)
+        scores[group, :] = -np.inf
+        scores[:, cluster] = -np.inf
+    return matches
+
+class Clustering(NamedTuple):
+    """PCA + k-means result for one vote matrix"""
+    k: int
+    labels: np.ndarray  # group per participant
+    mean: np.ndarray  # per-statement mean vote
+    basis: np.ndarray  # principal axes, one row per component
+    explained: np.ndarray  # explained variance ratio per component
+    inertia: float  # mean squared distance from a participant to its group centroid, projected
+    iterations: int
+    warm_started: bool
+
+def cluster_participants(matrix: VoteMatrix, k: int, previous_centroids: Optional[np.ndarray] = None,
+                         components: int = 3, restarts: int = 3) -> Optional[Clustering]:
+    """Cluster participants with k-means on their top principal components.
+
+    k-means runs from `restarts` k-means++ seeds and the best fit (lowest inertia) wins.
+    previous_centroids are group centroids (in statement space) from an earlier run; when
+    they fit, k-means also starts from them, which converges in a few iterations and keeps
+    group order, and that result is kept unless a fresh start fits better (so a stale split
+    of the groups is not locked in). Returns None when there are too few participants or
+    statements to group.
+    """
+    k = min(k, matrix.participant_count)
+    if k < 2 or matrix.statement_count < 2:
+        return None
+    mean, basis, explained, projection = principal_components(matrix.votes, min(components, matrix.statement_count))
+    warm = previous_centroids is not None and previous_centroids.shape == (k, matrix.statement_count)
+    initial = (previous_centroids - mean) @ basis.T if warm else None
+    best = None
+    for seed in range(-1 if warm else 0, restarts):
+        labels, centroids, iterations = kmeans(projection, k, initial if seed < 0 else None, seed=max(seed, 0))
+        inertia = float(nearest_centroids(projection, centroids)[1].mean())
+        # The warm start (seed -1) only loses to a clearly better fresh fit
+        if best is None or inertia < best.inertia * (0.999 if best.warm_started else 1):
+            best = Clustering(k, labels, mean, basis, explained, inertia, iterations, seed < 0)
+    return best
+
+class GroupStatistics:
+    """Per-group sufficient statistics: sizes, per-statement vote sums, agree and answered counts"""
+
+    def __init__(self, k: int, statement_count: int):
+        self.sizes = np.zeros(k)
+        self.vote_sums = np.zeros((k, statement_count))
+        self.agree_counts = np.zeros((k, statement_count))
+        self.answered_counts = np.zeros((k, statement_count))
+
+    @classmethod
+    def from_labels(cls, matrix: VoteMatrix, labels: np.ndarray, k: int) -> "GroupStatistics":
+        stats = cls(k, matrix.statement_count)
+        for j in range(k):
+            members = labels == j
+            stats.sizes[j] = members.sum()
+            stats.vote_sums[j] = matrix.votes[members].sum(axis=0)
+            stats.agree_counts[j] = (matrix.votes[members] == AGREE).sum(axis=0)
+            stats.answered_counts[j] = matrix.answered[members].sum(axis=0)
+        return stats
+
+    @property
+    def k(self) -> int:
+        return len(self.sizes)
+
+    @property
+    def participant_count(self) -> int:
+        return int(self.sizes.sum())
+
+    def add(self, group: int, votes: np.ndarray, answered: np.ndarray, weight: int = 1):
+        """Add one participant's row to a group; weight -1 takes it back out"""
+        self.sizes[group] += weight
+        self.vote_sums[group] += weight * votes
+        self.agree_counts[group] += weight * (votes == AGREE)
+        self.answered_counts[group] += weight * answered
+
+    def means(self) -> np.ndarray:
+        """k x statements mean vote per group, NaN for an empty group"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.vote_sums / self.sizes[:, None]
+
+def describe_groups(stats: GroupStatistics, mean: np.ndarray, basis: np.ndarray, explained: np.ndarray,
+                    statement_clusters: List[int], cluster_count: int, representative_count: int = 3):
+    """JSON-ready description of opinion groups and how they line up with the expected clusters.
+
+    statement_clusters maps each statement to its expected cluster index (-1 for none).
+    Groups are matched one-to-one to expected clusters and ordered by that match; empty
+    groups are dropped. Returns (description, centroids) with the centroids in the same
+    order, ready to warm-start the next clustering.
+    """
+    k, statement_count = stats.vote_sums.shape
+    participant_count = stats.participant_count
+    sizes = stats.sizes
+    with np.errstate(invalid="ignore", divide="ignore"):
+        group_means = stats.vote_sums / sizes[:, None]
+        others_means = (stats.vote_sums.sum(axis=0) - stats.vote_sums) / (participant_count - sizes)[:, None]
+        agree_rates = stats.agree_counts / stats.answered_counts
+
+    clusters = np.asarray(statement_clusters[:statement_count])
+    alignment = np.full((k, cluster_count), np.nan)
+    for cluster in range(cluster_count):
+        in_cluster = clusters == cluster
+        if in_cluster.any():
+            alignment[:, cluster] = group_means[:, in_cluster].mean(axis=1)
+    matches = match_groups_to_clusters(alignment)
+
+    order = sorted((j for j in range(k) if sizes[j] > 0), key=lambda j: (matches[j] is None, matches[j] or 0, -sizes[j]))
+    groups = []
+    for group_id, j in enumerate(order):
+        distinctness = np.nan_to_num(group_means[j] - others_means[j])
+        representative = np.argsort(-np.abs(distinctness), kind="stable")[:representative_count]
+        groups.append({
+            "id": group_id,
+            "size": int(sizes[j]),
+            "share": round(float(sizes[j]) / participant_count, 3),
+            "centroid": rounded((group_means[j] - mean) @ basis[:2].T),
+            "matched_cluster": matches[j],
+            "alignment": None if matches[j] is None else round(float(alignment[j, matches[j]]), 3),
+            "cluster_alignment": rounded(alignment[j]),
+            "representative_statements": [
+                {
+                    "index": int(s),
+                    "direction": "agree" if group_means[j, s] > 0 else "disagree",
+                    "group_agree_rate": None if np.isnan(agree_rates[j, s]) else round(float(agree_rates[j, s]), 3),
+                    "difference": round(float(distinctness[s]), 3)
+                }
+                for s in representative
+            ]
+        })
+
+    matched_scores = [group["alignment"] for group in groups if group["alignment"] is not None]
+    description = {
+        "participant_count": participant_count,
+        "explained_variance": rounded(explained),
+        "alignment_score": round(float(np.mean(matched_scores)), 3) if matched_scores else None,
+        "expected_clusters_matched": sum(1 for score in matched_scores if score > 0),
+        "groups": groups
+    }
+    return description, np.nan_to_num(group_means[order])
+
+def insufficient_groups(k: int, participant_count: int) -> Dict[str, Any]:
+    return {
+        "k": min(k, participant_count),
+        "participant_count": participant_count,
+        "groups": [],
+        "reason": "Not enough participants or statements to form opinion groups"
+    }
+
+def opinion_groups(matrix: VoteMatrix, statement_clusters: List[int], cluster_count: int, k: int = 4,
+                   previous_centroids: Optional[np.ndarray] = None, components: int = 3,
+                   representative_count: int = 3):
+    """Group participants with PCA + k-means and compare the groups with the expected clusters.
+
+    Returns (payload, centroids); see cluster_participants() and describe_groups().
+    """
+    clustering = cluster_participants(matrix, k, previous_centroids, components)
+    if clustering is None:
+        return insufficient_groups(k, matrix.participant_count), None
+    stats = GroupStatistics.from_labels(matrix, clustering.labels, clustering.k)
+    description, centroids = describe_groups(
+        stats, clustering.mean, clustering.basis, clustering.explained,
+        statement_clusters, cluster_count, representative_count
+    )
+    return {
+        "k": clustering.k,
+        **description,
+        "iterations": clustering.iterations,
+        "warm_started": clustering.warm_started
+    }, centroids
+
+class OnlineOpinionGroups:
+    """Opinion groups kept current one submission at a time.
+
+    Seeded from a full clustering. Each submission then updates the vote moments, so the
+    principal axes always reflect every vote, and the per-group statistics: a new vote row
+    joins the nearest group on the current axes (sequential k-means) and a replaced row
+    leaves the group it was assigned to, looked up by the key it was added under. The axes
+    are re-derived once 1% of the poll has changed, so an update costs O(k x statements)
+    whatever the poll size. drift() measures how far the poll has moved from the seed, for
+    the caller to decide when to recluster from scratch.
+    """
+
+    MIN_INERTIA_SAMPLE = 20
+
+    def __init__(self, matrix: VoteMatrix, clustering: Clustering, keys: Optional[Sequence[Hashable]] = None):
+        x = matrix.votes.astype(np.float64)
+        self.count = matrix.participant_count
+        self.vote_sum = x.sum(axis=0)
+        self.cross = x.T @ x
+        self.groups = GroupStatistics.from_labels(matrix, clustering.labels, clustering.k)
+        # Group each keyed row currently counts towards (keys are one per matrix row)
+        self.assignments: Dict[Hashable, int] = dict(zip(keys, clustering.labels.tolist())) if keys is not None else {}
+        self.seed = clustering
+        self.seed_count = self.count
+        self.updates = 0
+        self._added = 0
+        self._added_distance = 0.0
+        self._axes = (clustering.mean, clustering.basis, clustering.explained)
+        self._axes_updates = 0
+
+    @classmethod
+    def from_matrix(cls, matrix: VoteMatrix, k: int, previous_centroids: Optional[np.ndarray] = None,
+                    components: int = 3, keys: Optional[Sequence[Hashable]] = None) -> Optional["OnlineOpinionGroups"]:
+        clustering = cluster_participants(matrix, k, previous_centroids, components)
+        return cls(matrix, clustering, keys) if clustering is not None else None
+
+    def axes(self):
+        """(mean, basis, explained_variance_ratio) of the votes folded in, within 1% of the poll"""
+        if self.updates - self._axes_updates >= max(1, self.count // 100):
+            self._axes = principal_axes(self.count, self.vote_sum, self.cross, len(self.seed.basis))
+            self._axes_updates = self.updates
+        return self._axes
+
+    def _nearest(self, votes: np.ndarray):
+        """(group, squared distance) of the nearest non-empty group on the current axes"""
+        mean, basis, _ = self.axes()
+        point = (votes - mean) @ basis.T
+        centroids = (self.groups.means() - mean) @ basis.T
+        distances = ((centroids - point) ** 2).sum(axis=1)
+        distances[np.isnan(distances)] = np.inf
+        group = int(distances.argmin())
+        return group, float(distances[group])
+
+    def add(self, votes: np.ndarray, answered: np.ndarray, key: Optional[Hashable] = None):
+        x = votes.astype(np.float64)
+        self.count += 1
+        self.vote_sum += x
+        self.cross += np.outer(x, x)
+        group, distance = self._nearest(x)
+        self.groups.add(group, votes, answered)
+        if key is not None:
+            self.assignments[key] = group
+        self.updates += 1
+        if np.isfinite(distance):
+            self._added += 1
+            self._added_distance += distance
+
+    def remove(self, votes: np.ndarray, answered: np.ndarray, key: Optional[Hashable] = None):
+        """Take a row back out; an unknown key falls back to the nearest non-empty group"""
+        if self.count == 0:
+            return
+        x = votes.astype(np.float64)
+        self.count -= 1
+        self.vote_sum -= x
+        self.cross -= np.outer(x, x)
+        group = self.assignments.pop(key, None) if key is not None else None
+        if group is None:
+            group, _ = self._nearest(x)
+        self.groups.add(group, votes, answered, weight=-1)
+        self.updates += 1
+
+    def drift(self) -> Dict[str, float]:
+        """How far the poll has moved since the seed clustering, each 0 when unchanged:
+
+        axis_shift: 1 - mean |cosine| between the seed and current principal axes
+        inertia_increase: relative growth of the distance from new rows to their group
+        turnover: updates since the seed relative to the seed's participant count
+        """
+        _, basis, _ = self.axes()
+        axis_shift = 1 - float(np.abs((basis * self.seed.basis).sum(axis=1)).mean())
+        inertia_increase = 0.0
+        if self._added >= self.MIN_INERTIA_SAMPLE:
+            inertia_increase = max(0.0, (self._added_distance / self._added + 1e-3) / (self.seed.inertia + 1e-3) - 1)
+        return {
+            "axis_shift": max(0.0, axis_shift),
+            "inertia_increase": inertia_increase,
+            "turnover": self.updates / max(self.seed_count, 1)
+        }
+
+    def centroids(self) -> np.ndarray:
+        """Current group means, to warm-start the next full clustering"""
+        return np.nan_to_num(self.groups.means())
+
+    def describe(self, statement_clusters: List[int], cluster_count: int,
+                 representative_count: int = 3) -> Dict[str, Any]:
+        mean, basis, explained = self.axes()
+        description, _ = describe_groups(
+            self.groups, mean, basis, explained, statement_clusters, cluster_count, representative_count
+        )
+        return {
+            "k": self.groups.k,
+            **description,
+            "iterations": self.seed.iterations,
+            "warm_started": self.seed.warm_started,
+            "updates_since_recompute": self.updates,
+            "drift": {name: round(value, 3) for name, value in self.drift().items()}
+        }
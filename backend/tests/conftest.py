@@ -0,0 +1,70 @@
+"""Shared setup for the backend tests.
+
+main.py opens its database and activity log at import time, so point both at a scratch
+directory before any test imports it.
+"""
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_scratch_dir = tempfile.mkdtemp(prefix="polls-tests-")
+os.environ.setdefault("DATABASE_PATH", os.path.join(_scratch_dir, "polls.db"))
+os.environ.setdefault("ACTIVITY_LOG_PATH", os.path.join(_scratch_dir, "user_activity.log"))
+os.environ.pop("OPENAI_API_KEY", None)
+
+TOPIC_DATA = {
+    "title": "Housing in Springfield",
+    "description": "How should Springfield grow?",
+    "main_theme": "What kind of housing does Springfield need?",
+    "statements": [
+        {"text": f"Statement {index} about \"housing\"", "category": "housing", "expected_cluster": f"Cluster {index % 4}"}
+        for index in range(8)
+    ],
+    "expected_clusters": [{"name": f"Cluster {index}", "description": f"Group {index}"} for index in range(4)]
+}
+
+def completion(content: str):
+    """A non-streamed chat completion carrying content"""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+class FakeStream:
+    """Async iterator over streamed chat-completion chunks, like the OpenAI SDK's AsyncStream"""
+
+    def __init__(self, deltas):
+        self._deltas = list(deltas)
+        self.close = AsyncMock()
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for delta in self._deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+@pytest.fixture
+def topic_json() -> str:
+    return json.dumps(TOPIC_DATA)
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Replace main.openai_client with a stub whose chat.completions.create is an AsyncMock"""
+    import main
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock())))
+    monkeypatch.setattr(main, "openai_client", client)
+    return client.chat.completions.create
+
+def save_poll(topic=None) -> str:
+    """Save a poll through /save-poll and return its id"""
+    import main
+    from fastapi.testclient import TestClient
+    reply = TestClient(main.app).post("/save-poll", json={"topic": {**(topic or TOPIC_DATA), "metadata": {}}})
+    assert reply.status_code == 200
+    return reply.json()["poll_id"]
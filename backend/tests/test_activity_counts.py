@@ -0,0 +1,53 @@
+import time
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+import main
+
+HOUR = 3600
+# Recent enough that the retention pruning of other appends leaves these events alone
+BASE = int(time.time() // HOUR) * HOUR - 10 * 86400
+OFFSETS = [-1800, -600, 100, 3599, 3610, 9000, 9600]
+
+def seed(activity_type: str):
+    main.ActivityEventStore(main.ACTIVITY_RETENTION_DAYS).append([
+        {
+            "timestamp": datetime.fromtimestamp(BASE + offset).isoformat(),
+            "activity_type": activity_type,
+            "details": {"poll_id": "p"} if offset > 0 else {}
+        }
+        for offset in OFFSETS
+    ])
+
+def test_unaligned_bounds_count_only_events_inside_the_window():
+    seed("counts-unaligned")
+    buckets = main.activity_store.counts("hour", "counts-unaligned", None, BASE - 900, BASE + 9300)
+    # -1800 and 9600 fall in the edge hours but outside the window
+    assert buckets == [
+        {"bucket": BASE - HOUR, "count": 1},
+        {"bucket": BASE, "count": 2},
+        {"bucket": BASE + HOUR, "count": 1},
+        {"bucket": BASE + 2 * HOUR, "count": 1},
+    ]
+    by_poll = main.activity_store.counts("poll_id", "counts-unaligned", None, BASE - 900, BASE + 9300)
+    assert by_poll == [{"bucket": "", "count": 1}, {"bucket": "p", "count": 4}]
+
+def test_a_window_inside_one_hour_and_open_ended_windows():
+    seed("counts-narrow")
+    counts = main.activity_store.counts
+    assert counts("activity_type", "counts-narrow", None, BASE + 50, BASE + 200) == [
+        {"bucket": "counts-narrow", "count": 1}
+    ]
+    assert counts("activity_type", "counts-narrow", None, BASE + 3600, None)[0]["count"] == 3
+    assert counts("activity_type", "counts-narrow", None, None, BASE + 3600)[0]["count"] == 4
+    assert counts("activity_type", "counts-narrow", "p", None, None)[0]["count"] == 5
+
+def test_endpoint_applies_exact_bounds():
+    seed("counts-endpoint")
+    reply = TestClient(main.app).get("/analytics/activity/counts", params={
+        "activity_type": "counts-endpoint",
+        "since": datetime.fromtimestamp(BASE - 900).isoformat(),
+        "until": datetime.fromtimestamp(BASE + 9300).isoformat()
+    })
+    assert reply.status_code == 200 and reply.json()["total"] == 5
@@ -0,0 +1,47 @@
+import threading
+
+import main
+
+def test_a_full_queue_drops_and_counts_events(monkeypatch):
+    monkeypatch.setattr(main, "ACTIVITY_LOG_QUEUE_SIZE", 8)
+    monkeypatch.setattr(main, "ACTIVITY_STORE_ENABLED", False)
+    sink = main.ActivityLogSink("unused.log", write_file=False)
+    release = threading.Event()
+    write_batch = sink._write_batch
+    monkeypatch.setattr(sink, "_write_batch", lambda batch: release.wait(5) and write_batch(batch))
+
+    sink.emit({"n": 0})
+    while sink._queue.qsize():  # the sink thread has taken it and is held in _write_batch
+        pass
+    emitters = [
+        threading.Thread(target=lambda: [sink.emit({"n": n}) for n in range(50)])
+        for _ in range(4)
+    ]
+    for emitter in emitters:
+        emitter.start()
+    for emitter in emitters:
+        emitter.join()
+
+    metrics = sink.metrics()
+    assert metrics["queue_depth"] == metrics["queue_size"] == 8
+    assert metrics["accepted"] == 1 + 8 and metrics["dropped"] == 200 - 8
+    release.set()
+    sink.close()
+    assert sink.metrics()["written"] == 9
+
+def test_crossing_the_size_threshold_rotates_to_a_new_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ACTIVITY_LOG_MAX_BYTES", 200)
+    monkeypatch.setattr(main, "ACTIVITY_LOG_BACKUP_COUNT", 2)
+    monkeypatch.setattr(main, "ACTIVITY_STORE_ENABLED", False)
+    path = tmp_path / "activity.log"
+    sink = main.ActivityLogSink(str(path), write_file=True)
+
+    for n in range(5):
+        sink.emit({"activity_type": "padding", "details": "x" * 50, "n": n})
+    sink.close()
+    sink.emit({"activity_type": "after_rotation"})
+    sink.close()
+
+    assert sink.metrics()["rotations"] == 1
+    assert len((tmp_path / "activity.log.1").read_text().splitlines()) == 5
+    assert "after_rotation" in path.read_text()
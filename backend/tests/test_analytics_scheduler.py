@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from conftest import TOPIC_DATA
+
+@pytest.fixture
+def poll_id():
+    with main.get_db_connection() as conn:
+        with main.write_transaction(conn):
+            conn.execute("DELETE FROM analytics_jobs WHERE status = 'pending'")
+    return TestClient(main.app).post("/save-poll", json={"topic": {**TOPIC_DATA, "metadata": {}}}).json()["poll_id"]
+
+def scheduler(handler, poll_seconds: float = 30):
+    return main.AnalyticsJobScheduler({"probe": handler}, 1, 3, 0.2, poll_seconds, 16, 3600)
+
+def counting_claims(monkeypatch, jobs: main.AnalyticsJobScheduler):
+    claims = []
+    claim_job = jobs._claim_job
+    monkeypatch.setattr(jobs, "_claim_job", lambda: claims.append(time.monotonic()) or claim_job())
+    return claims
+
+def test_idle_workers_do_not_take_the_write_lock(monkeypatch, poll_id):
+    async def handler(cached, poll_id, response_version):
+        return response_version, {}
+
+    async def scenario():
+        jobs = scheduler(handler, poll_seconds=0.05)
+        claims = counting_claims(monkeypatch, jobs)
+        await jobs.start()
+        await asyncio.sleep(0.5)
+        await jobs.stop()
+        return claims
+
+    assert asyncio.run(scenario()) == []
+
+def test_enqueued_jobs_wake_a_worker_without_polling(monkeypatch, poll_id):
+    async def handler(cached, poll_id, response_version):
+        return response_version, {"ok": True}
+
+    async def scenario():
+        jobs = scheduler(handler)
+        claims = counting_claims(monkeypatch, jobs)
+        await jobs.start()
+        await asyncio.sleep(0.1)
+        job_id = await jobs.enqueue(poll_id, "probe")
+        started = time.monotonic()
+        while (await main.run_db(jobs.job, job_id))["status"] != "succeeded":
+            assert time.monotonic() - started < 5
+            await asyncio.sleep(0.02)
+        await jobs.stop()
+        return claims
+
+    assert len(asyncio.run(scenario())) == 1
+
+def test_retry_runs_when_its_backoff_is_due(monkeypatch, poll_id):
+    calls = []
+
+    async def handler(cached, poll_id, response_version):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+        return response_version, {}
+
+    async def scenario():
+        jobs = scheduler(handler)
+        await jobs.start()
+        job_id = await jobs.enqueue(poll_id, "probe")
+        started = time.monotonic()
+        while (await main.run_db(jobs.job, job_id))["status"] != "succeeded":
+            assert time.monotonic() - started < 5  # far below poll_seconds
+            await asyncio.sleep(0.02)
+        await jobs.stop()
+
+    asyncio.run(scenario())
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.2
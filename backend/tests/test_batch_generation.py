@@ -0,0 +1,65 @@
+import asyncio
+import uuid
+
+import main
+from conftest import completion
+
+def test_coalesced_batch_items_are_charged_one_generation(monkeypatch, fake_openai, topic_json):
+    async def slow_completion(**kwargs):
+        await asyncio.sleep(0.05)
+        return completion(topic_json)
+
+    fake_openai.side_effect = slow_completion
+    limiter = main.TokenRateLimiter(main.LLM_TOKENS_PER_GENERATION * 10)
+    monkeypatch.setattr(main, "batch_token_limiter", limiter)
+    location = f"Batch {uuid.uuid4()}"
+    requests = [
+        main.TopicRequest(community_context=main.CommunityContext(location=location, current_issues=["housing"]))
+        for _ in range(4)
+    ]
+
+    async def scenario():
+        return await asyncio.gather(*(main.generate_batch_item(request) for request in requests))
+
+    results = asyncio.run(scenario())
+    assert [method for _, method, _ in results] == ["llm"] * 4
+    assert fake_openai.await_count == 1
+    assert limiter.metrics()["acquired"] == 1
+
+def open_breaker() -> main.CircuitBreaker:
+    breaker = main.CircuitBreaker(
+        "openai", window_size=10, min_calls=1, error_rate_threshold=0.5, p95_threshold_ms=10_000,
+        open_seconds=60, half_open_probes=1
+    )
+    breaker._transition(breaker.OPEN, "test")
+    return breaker
+
+def test_open_breaker_spends_no_batch_tokens(monkeypatch, fake_openai, topic_json):
+    fake_openai.return_value = completion(topic_json)
+    limiter = main.TokenRateLimiter(main.LLM_TOKENS_PER_GENERATION * 10)
+    monkeypatch.setattr(main, "batch_token_limiter", limiter)
+    monkeypatch.setattr(main, "llm_breaker", open_breaker())
+    request = main.TopicRequest(community_context=main.CommunityContext(location=f"Batch {uuid.uuid4()}"))
+
+    _, method, _ = asyncio.run(main.generate_batch_item(request))
+    assert method == "demo_fallback"
+    assert limiter.metrics()["acquired"] == 0 and fake_openai.await_count == 0
+    assert main.llm_breaker.metrics()["rejected"] == 1
+
+def test_interactive_caller_does_not_wait_on_the_batch_budget(monkeypatch, fake_openai, topic_json):
+    fake_openai.return_value = completion(topic_json)
+    limiter = main.TokenRateLimiter(main.LLM_TOKENS_PER_GENERATION)
+    limiter._tokens = 0  # the next batch generation waits about a minute for tokens
+    request = main.TopicRequest(community_context=main.CommunityContext(location=f"Batch {uuid.uuid4()}"))
+
+    async def scenario():
+        batch = asyncio.ensure_future(main.generate_llm_topic(
+            request, lambda: limiter.acquire(main.LLM_TOKENS_PER_GENERATION)
+        ))
+        await asyncio.sleep(0.05)
+        topic = await asyncio.wait_for(main.generate_llm_topic(request), 2)
+        batch.cancel()
+        return topic
+
+    assert asyncio.run(scenario()).title
+    assert fake_openai.await_count == 1 and limiter.metrics()["acquired"] == 0
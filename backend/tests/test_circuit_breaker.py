@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+import main
+
+def new_breaker(half_open_probes: int = 1) -> main.CircuitBreaker:
+    return main.CircuitBreaker(
+        "test", window_size=10, min_calls=2, error_rate_threshold=0.5, p95_threshold_ms=10_000,
+        open_seconds=0, half_open_probes=half_open_probes
+    )
+
+def fail(breaker: main.CircuitBreaker):
+    with pytest.raises(RuntimeError):
+        with breaker.guard():
+            raise RuntimeError("upstream failed")
+
+def test_opens_on_error_rate_then_closes_after_successful_probe():
+    breaker = new_breaker()
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == breaker.OPEN
+    with breaker.guard():
+        assert breaker.state == breaker.HALF_OPEN
+    assert breaker.state == breaker.CLOSED
+
+def test_failed_probe_reopens():
+    breaker = new_breaker()
+    fail(breaker)
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == breaker.OPEN
+    assert breaker.metrics()["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->open": 1}
+
+def test_call_admitted_while_closed_does_not_count_as_probe():
+    breaker = new_breaker()
+    slow_call = breaker.guard()
+    slow_call.__enter__()
+    fail(breaker)
+    fail(breaker)
+
+    probe = breaker.guard()
+    probe.__enter__()
+    assert breaker.state == breaker.HALF_OPEN
+    slow_call.__exit__(None, None, None)
+    assert breaker.state == breaker.HALF_OPEN
+    assert breaker._probes_in_flight == 1
+    with pytest.raises(main.CircuitOpenError):
+        with breaker.guard():
+            pass
+
+    probe.__exit__(None, None, None)
+    assert breaker.state == breaker.CLOSED
+
+def test_stale_failure_does_not_reopen_half_open_breaker():
+    breaker = new_breaker()
+    slow_call = breaker.guard()
+    slow_call.__enter__()
+    fail(breaker)
+    fail(breaker)
+    probe = breaker.guard()
+    probe.__enter__()
+
+    slow_call.__exit__(RuntimeError, RuntimeError("late failure"), None)
+    assert breaker.state == breaker.HALF_OPEN
+    probe.__exit__(None, None, None)
+    assert breaker.state == breaker.CLOSED
+
+def test_cancelled_stale_call_does_not_free_probe_slot():
+    breaker = new_breaker()
+    slow_call = breaker.guard()
+    slow_call.__enter__()
+    fail(breaker)
+    fail(breaker)
+    probe = breaker.guard()
+    probe.__enter__()
+
+    slow_call.__exit__(asyncio.CancelledError, asyncio.CancelledError(), None)
+    assert breaker._probes_in_flight == 1
+    with pytest.raises(main.CircuitOpenError):
+        with breaker.guard():
+            pass
+
+def test_probe_from_earlier_half_open_episode_is_ignored():
+    breaker = new_breaker(half_open_probes=2)
+    fail(breaker)
+    fail(breaker)
+    old_probe = breaker.guard()
+    old_probe.__enter__()
+    fail(breaker)  # second probe of the episode fails and reopens the breaker
+
+    new_probe = breaker.guard()
+    new_probe.__enter__()
+    old_probe.__exit__(RuntimeError, RuntimeError("late failure"), None)
+    assert breaker.state == breaker.HALF_OPEN
+    assert breaker._probes_in_flight == 1
+    new_probe.__exit__(None, None, None)
+    assert breaker.state == breaker.CLOSED
+
+def timed_breaker() -> main.CircuitBreaker:
+    return main.CircuitBreaker(
+        "stream", window_size=10, min_calls=1, error_rate_threshold=0.5, p95_threshold_ms=100,
+        open_seconds=60, half_open_probes=1
+    )
+
+async def upstream(events: int, delay: float):
+    for index in range(events):
+        await asyncio.sleep(delay)
+        yield index
+
+def consume(breaker: main.CircuitBreaker, events, consumer_delay: float):
+    async def scenario():
+        received = []
+        async for event in breaker.stream(events):
+            received.append(event)
+            await asyncio.sleep(consumer_delay)  # a slow client reading the streamed response
+        return received
+    return asyncio.run(scenario())
+
+def test_slow_consumer_is_not_charged_to_stream_latency():
+    breaker = timed_breaker()
+    assert consume(breaker, upstream(5, 0), consumer_delay=0.05) == [0, 1, 2, 3, 4]
+    assert breaker.state == breaker.CLOSED
+    assert breaker.metrics()["window_p95_ms"] < 100
+
+def test_slow_upstream_stream_opens_the_breaker():
+    breaker = timed_breaker()
+    consume(breaker, upstream(5, 0.03), consumer_delay=0)
+    assert breaker.state == breaker.OPEN
+
+def test_stream_failure_is_recorded_and_closing_early_frees_the_probe():
+    breaker = timed_breaker()
+
+    async def failing():
+        yield 0
+        raise RuntimeError("upstream dropped")
+
+    with pytest.raises(RuntimeError):
+        consume(breaker, failing(), consumer_delay=0)
+    assert breaker.metrics()["failures"] == 1 and breaker.state == breaker.OPEN
+
+    breaker.open_seconds = 0
+    async def abandon():
+        events = breaker.stream(upstream(5, 0))
+        assert await events.__anext__() == 0
+        assert breaker._probes_in_flight == 1
+        await events.aclose()
+    asyncio.run(abandon())
+    assert breaker.state == breaker.HALF_OPEN and breaker._probes_in_flight == 0
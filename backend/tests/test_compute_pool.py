@@ -0,0 +1,96 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+import compute_pool
+import opinion_analysis
+from opinion_analysis import VoteMatrix
+
+# Worker functions live here rather than in a module that imports main, so spawned
+# workers can unpickle them without opening the app database
+
+def slow_sum(matrix: VoteMatrix, seconds: float) -> int:
+    time.sleep(seconds)
+    return int(matrix.votes.sum())
+
+def crash(matrix: VoteMatrix):
+    os._exit(1)
+
+def random_matrix(participants: int = 40, statements: int = 8) -> VoteMatrix:
+    rng = np.random.default_rng(0)
+    votes = rng.integers(-1, 2, size=(participants, statements)).astype(np.int8)
+    return VoteMatrix(votes, votes != 0)
+
+def run_with_pool(scenario, workers: int = 1, timeout_seconds: float = 30):
+    async def main():
+        pool = compute_pool.ComputePool(workers, timeout_seconds)
+        await pool.start()
+        try:
+            return await scenario(pool)
+        finally:
+            pool.stop()
+    return asyncio.run(main())
+
+def test_shared_matrix_result_matches_in_process_analysis():
+    matrix = random_matrix()
+
+    async def scenario(pool):
+        return await pool.run(opinion_analysis.analyze_votes, matrix, top_pairs=3)
+
+    assert run_with_pool(scenario) == opinion_analysis.analyze_votes(matrix, top_pairs=3)
+
+def test_timeout_raises_and_the_block_is_released_when_the_worker_finishes(monkeypatch):
+    names = []
+    share_matrix = compute_pool.share_matrix
+
+    def recording(matrix):
+        block, spec = share_matrix(matrix)
+        names.append(spec.name)
+        return block, spec
+
+    monkeypatch.setattr(compute_pool, "share_matrix", recording)
+
+    async def scenario(pool):
+        with pytest.raises(compute_pool.ComputeTimeoutError):
+            await pool.run(slow_sum, random_matrix(), 1.0)
+        shared_memory.SharedMemory(name=names[0]).close()  # still attached by the busy worker
+        await asyncio.sleep(2)
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=names[0])
+        return pool.metrics()
+
+    metrics = run_with_pool(scenario, timeout_seconds=0.3)
+    assert metrics["timeouts"] == 1 and metrics["in_flight"] == 0
+
+def test_a_crashed_worker_breaks_the_pool_and_the_next_call_gets_a_new_one():
+    matrix = random_matrix()
+
+    async def scenario(pool):
+        with pytest.raises(BrokenProcessPool):
+            await pool.run(crash, matrix)
+        return await pool.run(slow_sum, matrix, 0), pool.metrics()
+
+    result, metrics = run_with_pool(scenario)
+    assert result == int(matrix.votes.sum())
+    assert metrics["restarts"] == 1 and metrics["failed"] == 1
+
+def test_tasks_failing_together_restart_the_pool_once():
+    matrix = random_matrix()
+
+    async def scenario(pool):
+        outcomes = await asyncio.gather(
+            pool.run(slow_sum, matrix, 2), pool.run(crash, matrix), return_exceptions=True
+        )
+        replacement = pool._executor
+        result = await pool.run(slow_sum, matrix, 0)
+        return outcomes, replacement is pool._executor, result, pool.metrics()
+
+    outcomes, same_executor, result, metrics = run_with_pool(scenario, workers=2)
+    assert [type(outcome) for outcome in outcomes] == [BrokenProcessPool, BrokenProcessPool]
+    assert metrics["restarts"] == 1 and same_executor
+    assert result == int(matrix.votes.sum())
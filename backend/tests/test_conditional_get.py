@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+
+import main
+from conftest import save_poll
+
+client = TestClient(main.app)
+
+def submit(poll_id: str, response: str = "agree"):
+    reply = client.post(f"/poll/{poll_id}/responses", json={
+        "poll_id": poll_id, "responses": [{"statementIndex": 0, "response": response}]
+    })
+    assert reply.status_code == 200
+
+def test_poll_revalidates_with_its_etag():
+    poll_id = save_poll()
+    first = client.get(f"/poll/{poll_id}")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json()["poll_id"] == poll_id
+
+    revalidated = client.get(f"/poll/{poll_id}", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert client.get(f"/poll/{poll_id}", headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get(f"/poll/{poll_id}", headers={"If-None-Match": '"other"'}).status_code == 200
+
+def test_results_revalidate_until_a_submission_bumps_the_version():
+    poll_id = save_poll()
+    submit(poll_id)
+    first = client.get(f"/poll/{poll_id}/results")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.endswith('-v1"')
+    assert client.get(f"/poll/{poll_id}/results", headers={"If-None-Match": etag}).status_code == 304
+
+    submit(poll_id, "disagree")
+    changed = client.get(f"/poll/{poll_id}/results", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag and changed.headers["ETag"].endswith('-v2"')
+    assert changed.json()["total_participants"] == 2
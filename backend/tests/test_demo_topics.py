@@ -0,0 +1,41 @@
+import asyncio
+import json
+import warnings
+
+import pydantic
+import pytest
+
+import main
+
+def demo_topic(location: str = "Springfield", domain: str = "housing", statement_count: int = 10) -> main.GeneratedTopic:
+    request = main.TopicRequest(
+        community_context=main.CommunityContext(location=location),
+        topic_domain=domain,
+        statement_count=statement_count
+    )
+    return asyncio.run(main.topic_generator.generate_topic(request))
+
+@pytest.mark.parametrize("domain", sorted(main.topic_generator.templates))
+def test_prerendered_json_matches_model_serialization(domain):
+    topic = demo_topic(domain=domain, statement_count=6)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        expected = topic.model_dump(mode="json")
+    assert json.loads(main.topic_generator.topic_json(topic)) == expected
+    assert topic.title == f"Springfield {main.topic_generator.templates[domain].title}"
+
+def test_shared_template_statements_are_frozen():
+    topic = demo_topic()
+    with pytest.raises(pydantic.ValidationError):
+        topic.statements[0].text = "changed"
+    assert demo_topic().statements[0].text == main.topic_generator.templates["housing"].statements[0].text
+
+def test_clusters_are_copied_per_topic():
+    first = demo_topic()
+    first.expected_clusters[0]["name"] = "changed"
+    first.expected_clusters.append({"name": "extra", "description": "extra"})
+    second = demo_topic()
+    assert second.expected_clusters[0]["name"] != "changed"
+    assert len(second.expected_clusters) == len(main.topic_generator.templates["housing"].expected_clusters)
+    with pytest.raises(TypeError):
+        main.topic_generator.templates["housing"].expected_clusters[0]["name"] = "changed"
@@ -0,0 +1,98 @@
+import numpy as np
+
+import main
+import opinion_analysis
+from opinion_analysis import OnlineOpinionGroups, VoteMatrix
+
+STATEMENTS = 12
+GROUPS = 3
+# Planted group g agrees with statements 4g..4g+3 and disagrees with the rest
+STATEMENT_CLUSTERS = [statement // 4 for statement in range(STATEMENTS)]
+
+# Online groups may differ from a from-scratch clustering of the final matrix by at most this
+# share of participants per group (rows joined on drifting axes are not reassigned later)
+SIZE_TOLERANCE = 0.03
+
+def planted_row(rng, group: int, noise: float = 0.1, skip: float = 0.1):
+    votes = np.where(np.array(STATEMENT_CLUSTERS) == group, 1, -1)
+    votes = np.where(rng.random(STATEMENTS) < noise, -votes, votes)
+    answered = rng.random(STATEMENTS) >= skip
+    return np.where(answered, votes, 0).astype(np.int8), answered
+
+def matrix_of(rows) -> VoteMatrix:
+    votes, answered = zip(*rows)
+    return VoteMatrix(np.array(votes), np.array(answered))
+
+def replay_submissions(seed_size: int = 300, new: int = 200, retakes: int = 50):
+    """Seed an online model, then add new participants and retakes that switch groups.
+
+    Returns (model, rows by key) with the rows that make up the poll afterwards.
+    """
+    rng = np.random.default_rng(0)
+    rows = {f"seed-{i}": planted_row(rng, i % GROUPS) for i in range(seed_size)}
+    model = OnlineOpinionGroups.from_matrix(matrix_of(rows.values()), GROUPS, keys=list(rows))
+
+    for i in range(new):
+        rows[f"new-{i}"] = planted_row(rng, (i % 2) * 2)  # new participants favour groups 0 and 2
+        model.add(*rows[f"new-{i}"], key=f"new-{i}")
+    for i in range(retakes):
+        # A retake writes a new session and deletes the previous one, as apply_poll_submission does
+        previous = f"seed-{3 * i + 1}"
+        model.remove(*rows.pop(previous), key=previous)
+        rows[f"retake-{i}"] = planted_row(rng, 0)
+        model.add(*rows[f"retake-{i}"], key=f"retake-{i}")
+    return model, rows
+
+def test_group_statistics_match_the_rows_assigned_to_each_group():
+    model, rows = replay_submissions()
+    assert set(model.assignments) == set(rows)
+    for group in range(GROUPS):
+        members = [rows[key] for key, assigned in model.assignments.items() if assigned == group]
+        assert model.groups.sizes[group] == len(members)
+        expected = np.sum([votes for votes, _ in members], axis=0) if members else np.zeros(STATEMENTS)
+        np.testing.assert_array_equal(model.groups.vote_sums[group], expected)
+    assert (model.groups.sizes >= 0).all() and (model.groups.answered_counts >= 0).all()
+    assert model.count == len(rows)
+
+def test_online_groups_track_a_full_clustering_of_the_final_matrix():
+    model, rows = replay_submissions()
+    online = model.describe(STATEMENT_CLUSTERS, GROUPS)
+    offline, _ = opinion_analysis.opinion_groups(matrix_of(rows.values()), STATEMENT_CLUSTERS, GROUPS, k=GROUPS)
+
+    assert online["participant_count"] == offline["participant_count"] == len(rows)
+    assert online["expected_clusters_matched"] == offline["expected_clusters_matched"] == GROUPS
+    offline_sizes = {group["matched_cluster"]: group["size"] for group in offline["groups"]}
+    for group in online["groups"]:
+        assert abs(group["size"] - offline_sizes[group["matched_cluster"]]) <= SIZE_TOLERANCE * len(rows)
+    assert abs(online["alignment_score"] - offline["alignment_score"]) <= 0.05
+
+def test_remove_without_a_known_key_uses_the_nearest_group():
+    rng = np.random.default_rng(1)
+    seed_rows = [planted_row(rng, i % GROUPS) for i in range(60)]
+    model = OnlineOpinionGroups.from_matrix(matrix_of(seed_rows), GROUPS)
+    group_of_row = model.seed.labels[0]
+    sizes = model.groups.sizes.copy()
+    model.remove(*seed_rows[0], key="never-added")
+    sizes[group_of_row] -= 1
+    np.testing.assert_array_equal(model.groups.sizes, sizes)
+
+def test_fetch_vote_matrix_returns_a_session_per_row():
+    responses = {"session-a": ["agree", "disagree"], "session-b": ["skip", "agree"], "session-c": ["disagree"]}
+    with main.get_db_connection() as conn:
+        with main.write_transaction(conn):
+            conn.executemany("""
+                INSERT INTO poll_responses
+                (poll_id, participant_name, statement_index, response, timestamp, participant_session_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                ("online-groups-poll", None, index, response, "2024-01-01T00:00:00", session_id)
+                for session_id, answers in responses.items()
+                for index, response in enumerate(answers)
+            ])
+
+    _, matrix, sessions = main.fetch_vote_matrix("online-groups-poll", 2)
+    assert sorted(sessions) == sorted(responses)
+    for row, session_id in enumerate(sessions):
+        votes, answered = opinion_analysis.vote_vector(enumerate(responses[session_id]), 2)
+        np.testing.assert_array_equal(matrix.votes[row], votes)
+        np.testing.assert_array_equal(matrix.answered[row], answered)
@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+
+import main
+from conftest import TOPIC_DATA
+
+# No `with` block: startup does not run, so the analytics workers are stopped and a first
+# snapshot is computed inline, and submissions are written directly rather than queued
+client = TestClient(main.app)
+
+def submit(poll_id: str, participant: int):
+    cluster = participant % 4
+    responses = [
+        {"statementIndex": index, "response": "agree" if index % 4 == cluster else "disagree"}
+        for index in range(len(TOPIC_DATA["statements"]))
+    ]
+    reply = client.post(f"/poll/{poll_id}/responses", json={"poll_id": poll_id, "responses": responses})
+    assert reply.status_code == 200
+
+def test_opinion_groups_are_served_from_analytics_snapshots():
+    poll_id = client.post("/save-poll", json={"topic": {**TOPIC_DATA, "metadata": {}}}).json()["poll_id"]
+    for participant in range(16):
+        submit(poll_id, participant)
+
+    inline_runs = main.analytics_scheduler.metrics()["inline_runs"]
+    first = client.get(f"/poll/{poll_id}/opinion-groups")
+    assert first.status_code == 200
+    body = first.json()
+    assert body["stale"] is False and body["response_version"] == 16
+    assert body["participant_count"] == 16 and body["expected_clusters_matched"] == 4
+    assert main.analytics_scheduler.metrics()["inline_runs"] == inline_runs + 1
+
+    # A later vote does not recompute on the request path: the snapshot is served marked stale
+    submit(poll_id, 16)
+    second = client.get(f"/poll/{poll_id}/opinion-groups")
+    assert second.json()["stale"] is True and second.json()["latest_response_version"] == 17
+    assert main.analytics_scheduler.metrics()["inline_runs"] == inline_runs + 1
+    assert client.get(f"/poll/{poll_id}/opinion-groups", headers={"If-None-Match": second.headers["ETag"]}).status_code == 304
+
+def test_non_default_k_has_its_own_snapshot_kind():
+    poll_id = client.post("/save-poll", json={"topic": {**TOPIC_DATA, "metadata": {}}}).json()["poll_id"]
+    for participant in range(12):
+        submit(poll_id, participant)
+
+    reply = client.get(f"/poll/{poll_id}/opinion-groups", params={"k": 3})
+    assert reply.status_code == 200 and reply.json()["k"] == 3
+    kinds = client.get(f"/poll/{poll_id}/results").json()["analytics"]
+    assert "opinion_groups_k3" in kinds and "opinion_groups" not in kinds
@@ -0,0 +1,35 @@
+import asyncio
+
+import main
+from conftest import save_poll
+
+def shared_poll():
+    return asyncio.run(main.load_shared_poll(save_poll())).poll
+
+def test_least_recently_used_entry_is_evicted_first():
+    poll = shared_poll()
+    cache = main.PollCache(max_entries=3, ttl_seconds=60)
+    for poll_id in ("a", "b", "c"):
+        cache.put(poll_id, poll, [0])
+    assert cache.get("a") is not None  # "a" is now the most recently used, "b" the least
+
+    cache.put("d", poll, [0])
+    assert cache.get("b") is None
+    assert all(cache.get(poll_id) is not None for poll_id in ("a", "c", "d"))
+    assert list(cache._entries) == ["a", "c", "d"]
+
+def test_cache_never_holds_more_than_max_entries():
+    poll = shared_poll()
+    cache = main.PollCache(max_entries=4, ttl_seconds=60)
+    for index in range(10):
+        cache.put(f"poll-{index}", poll, [0])
+        assert len(cache._entries) <= 4
+    metrics = cache.metrics()
+    assert metrics["entries"] == 4 and metrics["evictions"] == 6
+    assert list(cache._entries) == [f"poll-{index}" for index in range(6, 10)]
+
+def test_expired_entries_are_misses():
+    cache = main.PollCache(max_entries=4, ttl_seconds=0)
+    cache.put("a", shared_poll(), [0])
+    assert cache.get("a") is None
+    assert cache.metrics()["expirations"] == 1 and cache.metrics()["entries"] == 0
@@ -0,0 +1,116 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+from conftest import save_poll
+
+def answers(*responses):
+    return [{"statementIndex": index, "response": response} for index, response in enumerate(responses)]
+
+def stored(poll_id: str):
+    with main.get_db_connection() as conn:
+        rows = conn.execute("""
+            SELECT participant_name, statement_index, response FROM poll_responses
+            WHERE poll_id = ? ORDER BY participant_name, statement_index
+        """, (poll_id,)).fetchall()
+    return [tuple(row) for row in rows]
+
+def counts(poll_id: str):
+    _, counts_row = main.fetch_poll_tallies(poll_id)
+    return tuple(counts_row) if counts_row else None
+
+def fail_on(monkeypatch, poll_id: str):
+    """Make the tally update that follows poll_id's INSERT raise, after its rows are written"""
+    apply_response_tallies = main.apply_response_tallies
+
+    def failing(conn, target, responses, direction=1):
+        if target == poll_id and direction == 1:
+            raise RuntimeError("disk full")
+        return apply_response_tallies(conn, target, responses, direction)
+
+    monkeypatch.setattr(main, "apply_response_tallies", failing)
+
+def test_duplicate_statements_collapse_to_the_last_answer():
+    poll_id = save_poll()
+    responses = answers("agree", "skip") + [{"statementIndex": 0, "response": "disagree"}]
+    _, applied = main.store_poll_responses(poll_id, "ada", responses)
+    assert stored(poll_id) == [("ada", 0, "disagree"), ("ada", 1, "skip")]
+    assert applied.responses == [(0, "disagree"), (1, "skip")]
+    assert counts(poll_id) == (1, 2, 1)
+
+def test_failed_retake_rolls_back_completely(monkeypatch):
+    poll_id = save_poll()
+    main.store_poll_responses(poll_id, "bo", answers("agree", "agree"))
+    before = stored(poll_id), counts(poll_id)
+
+    fail_on(monkeypatch, poll_id)
+    with pytest.raises(RuntimeError):
+        main.store_poll_responses(poll_id, "bo", answers("disagree"))
+    # The retake's delete and tally decrement were rolled back with its insert
+    assert (stored(poll_id), counts(poll_id)) == before
+
+def test_batch_savepoints_isolate_a_failing_submission(monkeypatch):
+    good_poll, bad_poll = save_poll(), save_poll()
+
+    def submission(poll_id, name, *responses):
+        return {
+            "poll_id": poll_id, "participant_name": name, "responses": answers(*responses),
+            "participant_session_id": f"{poll_id}-{name}", "timestamp": "2024-01-01T00:00:00"
+        }
+
+    fail_on(monkeypatch, bad_poll)
+    outcomes = main.store_poll_submission_batch([
+        submission(good_poll, "cy", "agree"),
+        submission(bad_poll, "di", "agree", "skip"),
+        submission("missing-poll", "ed", "agree"),
+        submission(good_poll, "fi", "disagree"),
+    ])
+    assert [outcome["success"] for outcome in outcomes] == [True, False, False, True]
+    assert stored(good_poll) == [("cy", 0, "agree"), ("fi", 0, "disagree")]
+    assert stored(bad_poll) == [] and counts(bad_poll) is None
+    assert counts(good_poll) == (2, 2, 2)
+
+def test_empty_retake_is_rejected_and_keeps_the_participant():
+    poll_id = save_poll()
+    main.store_poll_responses(poll_id, "gu", answers("agree"))
+    with pytest.raises(HTTPException) as raised:
+        main.store_poll_responses(poll_id, "gu", [])
+    assert raised.value.status_code == 400
+    assert counts(poll_id) == (1, 1, 1) and stored(poll_id) == [("gu", 0, "agree")]
+
+    reply = TestClient(main.app).post(f"/poll/{poll_id}/responses", json={
+        "poll_id": poll_id, "participant_name": "gu", "responses": []
+    })
+    assert reply.status_code == 400
+    assert counts(poll_id) == (1, 1, 1)
+
+def test_unique_index_migration_keeps_the_latest_duplicate(tmp_path, monkeypatch):
+    pool = main.SQLiteConnectionPool(str(tmp_path / "polls.db"))
+    try:
+        with pool.connection() as conn:
+            monkeypatch.setattr(main, "SCHEMA_MIGRATIONS", main.SCHEMA_MIGRATIONS[:3])
+            main.apply_migrations(conn)
+            conn.executemany("""
+                INSERT INTO poll_responses
+                (poll_id, participant_name, statement_index, response, timestamp, participant_session_id)
+                VALUES ('p', 'ha', ?, ?, '2024-01-01T00:00:00', 's')
+            """, [(0, "agree"), (0, "disagree"), (1, "skip"), (0, "skip")])
+            conn.commit()
+
+            monkeypatch.undo()
+            main.apply_migrations(conn)
+            rows = conn.execute("""
+                SELECT statement_index, response FROM poll_responses ORDER BY statement_index
+            """).fetchall()
+            assert [tuple(row) for row in rows] == [(0, "skip"), (1, "skip")]
+            tallies = conn.execute("""
+                SELECT statement_index, skip_count, response_count FROM poll_statement_tallies ORDER BY statement_index
+            """).fetchall()
+            assert [tuple(row) for row in tallies] == [(0, 1, 1), (1, 1, 1)]
+            index = conn.execute("""
+                SELECT "unique" FROM pragma_index_list('poll_responses') WHERE name = 'idx_poll_responses_session_statement'
+            """).fetchone()
+            assert index[0] == 1
+    finally:
+        pool.close_all()
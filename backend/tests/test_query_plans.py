@@ -0,0 +1,32 @@
+import main
+
+def test_hot_queries_use_indexes_on_fresh_database(tmp_path):
+    pool = main.SQLiteConnectionPool(str(tmp_path / "polls.db"))
+    try:
+        with pool.connection() as conn:
+            main.apply_migrations(conn)
+            assert main.find_full_table_scans(conn) == {}
+    finally:
+        pool.close_all()
+
+def test_migrations_are_idempotent(tmp_path):
+    pool = main.SQLiteConnectionPool(str(tmp_path / "polls.db"))
+    try:
+        with pool.connection() as conn:
+            main.apply_migrations(conn)
+            main.apply_migrations(conn)
+            versions = [row['version'] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+            assert versions == [version for version, _, _ in main.SCHEMA_MIGRATIONS]
+    finally:
+        pool.close_all()
+
+def test_dropped_index_is_reported_as_full_scan(tmp_path):
+    pool = main.SQLiteConnectionPool(str(tmp_path / "polls.db"))
+    try:
+        with pool.connection() as conn:
+            main.apply_migrations(conn)
+            conn.execute("DROP INDEX idx_shared_polls_created_at")
+            conn.commit()
+            assert main.find_full_table_scans(conn) == {"recent_polls": ["SCAN shared_polls"]}
+    finally:
+        pool.close_all()
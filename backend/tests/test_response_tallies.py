@@ -0,0 +1,66 @@
+import main
+from conftest import save_poll
+
+def answers(*responses):
+    return [{"statementIndex": index, "response": response} for index, response in enumerate(responses)]
+
+def recount(poll_id: str):
+    """Tallies and counters recounted from the poll_responses log"""
+    with main.get_db_connection() as conn:
+        tallies = {
+            row[0]: tuple(row[1:]) for row in conn.execute("""
+                SELECT statement_index, SUM(response = 'agree'), SUM(response = 'disagree'),
+                       SUM(response = 'skip'), COUNT(*)
+                FROM poll_responses WHERE poll_id = ? GROUP BY statement_index
+            """, (poll_id,))
+        }
+        counts = tuple(conn.execute("""
+            SELECT COUNT(DISTINCT participant_session_id), COUNT(*) FROM poll_responses WHERE poll_id = ?
+        """, (poll_id,)).fetchone())
+    return tallies, counts
+
+def materialized(poll_id: str):
+    tallies, counts_row = main.fetch_poll_tallies(poll_id)
+    return (
+        {
+            index: (row['agree_count'], row['disagree_count'], row['skip_count'], row['response_count'])
+            for index, row in tallies.items() if row['response_count']
+        },
+        (counts_row['participant_count'], counts_row['response_count'])
+    )
+
+def test_tallies_match_a_recount_after_submissions_and_retakes():
+    poll_id = save_poll()
+    main.store_poll_responses(poll_id, "ada", answers("agree", "agree", "skip"))
+    main.store_poll_responses(poll_id, "bo", answers("disagree", "agree"))
+    main.store_poll_responses(poll_id, None, answers("agree"))
+    # Retakes replace the earlier answers: fewer statements, and changed answers
+    main.store_poll_responses(poll_id, "ada", answers("disagree"))
+    main.store_poll_responses(poll_id, "bo", answers("agree", "disagree", "disagree", "skip"))
+
+    assert materialized(poll_id) == recount(poll_id)
+    tallies, counts = materialized(poll_id)
+    assert counts == (3, 6)
+    assert tallies[0] == (2, 1, 0, 3)
+    assert tallies[1] == (0, 1, 0, 1)  # both of ada's agrees on statement 1 were taken back out
+
+def test_retake_decrements_what_it_replaces():
+    poll_id = save_poll()
+    main.store_poll_responses(poll_id, "cy", answers("agree", "skip"))
+    _, applied = main.store_poll_responses(poll_id, "cy", answers("disagree"))
+    assert applied.previous_responses == [(0, "agree"), (1, "skip")]
+    assert materialized(poll_id) == ({0: (0, 1, 0, 1)}, (1, 1))
+
+def test_rebuild_reproduces_the_incremental_tallies():
+    poll_id = save_poll()
+    main.store_poll_responses(poll_id, "di", answers("agree", "disagree"))
+    main.store_poll_responses(poll_id, "di", answers("skip", "skip", "agree"))
+    main.store_poll_responses(poll_id, "ed", answers("agree"))
+    incremental = materialized(poll_id)
+    version = main.fetch_response_version(poll_id)
+
+    with main.get_db_connection() as conn:
+        with main.write_transaction(conn):
+            main.rebuild_response_tallies(conn)
+    assert materialized(poll_id) == incremental == recount(poll_id)
+    assert main.fetch_response_version(poll_id) == version == 3
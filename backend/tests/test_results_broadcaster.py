@@ -0,0 +1,18 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+def test_failed_snapshot_load_leaves_no_channel():
+    broadcaster = main.ResultsBroadcaster(0.2, 16, 8)
+    cached = SimpleNamespace(poll=SimpleNamespace(poll_id="poll-1"))
+
+    async def failing_load(cached):
+        raise RuntimeError("database unavailable")
+
+    broadcaster._load_snapshot = failing_load
+    with pytest.raises(RuntimeError):
+        asyncio.run(broadcaster.subscribe(cached, None))
+    assert broadcaster.metrics()["watched_polls"] == 0
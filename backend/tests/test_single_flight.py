@@ -0,0 +1,112 @@
+import asyncio
+import uuid
+
+import pytest
+
+import main
+from conftest import completion
+
+class SlowBackend:
+    """Fake upstream that takes `delay` seconds and counts its calls"""
+
+    def __init__(self, delay: float = 0.05, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream failed")
+        return f"result {call}"
+
+def test_concurrent_calls_share_one_upstream_call():
+    flight = main.SingleFlight(window_seconds=0)
+    backend = SlowBackend()
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", backend) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == ["result 1"] * 10
+    assert backend.calls == 1
+    assert flight.metrics()["coalesced"] == 9
+
+def test_different_keys_are_not_coalesced():
+    flight = main.SingleFlight(window_seconds=0)
+    backend = SlowBackend()
+
+    async def scenario():
+        return await asyncio.gather(flight.do("a", backend), flight.do("b", backend))
+
+    assert sorted(asyncio.run(scenario())) == ["result 1", "result 2"]
+    assert backend.calls == 2
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = main.SingleFlight(window_seconds=0)
+    backend = SlowBackend(delay=0.1)
+
+    async def scenario():
+        leaver = asyncio.ensure_future(flight.do("key", backend))
+        stayer = asyncio.ensure_future(flight.do("key", backend))
+        await asyncio.sleep(0.01)
+        leaver.cancel()
+        return await stayer, leaver.cancelled()
+
+    assert asyncio.run(scenario()) == ("result 1", True)
+    assert backend.calls == 1
+
+def test_failure_reaches_every_waiter_and_is_not_remembered():
+    flight = main.SingleFlight(window_seconds=10)
+    backend = SlowBackend(fail=True)
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("key", backend) for _ in range(3)), return_exceptions=True)
+        backend.fail = False
+        return results, await flight.do("key", backend)
+
+    results, retry = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retry == "result 2"
+    assert flight.metrics()["upstream_failures"] == 1
+
+def test_result_is_shared_within_window_then_expires():
+    flight = main.SingleFlight(window_seconds=0.05)
+    backend = SlowBackend(delay=0)
+
+    async def scenario():
+        first = await flight.do("key", backend)
+        within = await flight.do("key", backend)
+        await asyncio.sleep(0.06)
+        after = await flight.do("key", backend)
+        return first, within, after
+
+    assert asyncio.run(scenario()) == ("result 1", "result 1", "result 2")
+    assert flight.metrics()["window_hits"] == 1
+
+def test_identical_topic_requests_make_one_llm_call(fake_openai, topic_json):
+    async def slow_completion(**kwargs):
+        await asyncio.sleep(0.05)
+        return completion(topic_json)
+
+    fake_openai.side_effect = slow_completion
+    location = f"Coalesced {uuid.uuid4()}"
+    requests = [
+        main.TopicRequest(community_context=main.CommunityContext(location=name, current_issues=["housing"]))
+        for name in (location, location.upper(), f"  {location} ")
+    ]
+
+    async def scenario():
+        return await asyncio.gather(*(main.generate_llm_topic(request) for request in requests))
+
+    topics = asyncio.run(scenario())
+    assert fake_openai.await_count == 1
+    assert {topic.title for topic in topics} == {"Housing in Springfield"}
+
+@pytest.mark.parametrize("mode, coalesced", [("normalized", True), ("exact", False)])
+def test_key_mode(monkeypatch, mode, coalesced):
+    monkeypatch.setattr(main, "SINGLE_FLIGHT_KEY_MODE", mode)
+    first = main.TopicRequest(community_context=main.CommunityContext(location="Springfield"))
+    second = main.TopicRequest(community_context=main.CommunityContext(location="SPRINGFIELD"))
+    assert (main.single_flight_key(first) == main.single_flight_key(second)) is coalesced
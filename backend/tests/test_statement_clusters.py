@@ -0,0 +1,22 @@
+import main
+
+CLUSTERS = ["Renters", "Homeowners", "Young Families", "Developers"]
+
+def test_exact_names_resolve_to_their_index():
+    assert main.resolve_statement_clusters(["Developers", "Renters"], CLUSTERS) == [3, 0]
+
+def test_case_and_whitespace_are_normalized():
+    assert main.resolve_statement_clusters(["  renters ", "YOUNG FAMILIES", "homeOwners"], CLUSTERS) == [0, 2, 1]
+
+def test_exact_match_wins_over_a_case_insensitive_one():
+    assert main.resolve_statement_clusters(["renters"], ["Renters", "renters"]) == [1]
+
+def test_substring_prefers_the_closest_length_then_the_earlier_cluster():
+    assert main.resolve_statement_clusters(["Families"], CLUSTERS) == [2]
+    assert main.resolve_statement_clusters(["Small Developers"], CLUSTERS) == [3]
+    assert main.resolve_statement_clusters(["Renters and Developers"], ["Renters", "Developers"]) == [1]
+    assert main.resolve_statement_clusters(["ab"], ["abc", "xab"]) == [0]
+
+def test_unmatched_and_empty_labels_map_to_minus_one():
+    assert main.resolve_statement_clusters(["Tourists", "", "   "], CLUSTERS) == [-1, -1, -1]
+    assert main.resolve_statement_clusters(["Renters"], []) == [-1]
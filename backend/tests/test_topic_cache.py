@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+
+import main
+from conftest import completion
+
+def topic_request(location: str = "Springfield", issues=("housing", "transit")) -> main.TopicRequest:
+    return main.TopicRequest(
+        community_context=main.CommunityContext(location=location, current_issues=list(issues)),
+        topic_domain="housing-development"
+    )
+
+def new_cache(persist: bool = False, ttl_seconds: float = 60, stale_seconds: float = 60) -> main.TopicGenerationCache:
+    return main.TopicGenerationCache(16, ttl_seconds, stale_seconds, stale_while_revalidate=True, persist=persist)
+
+def llm_generate(request: main.TopicRequest):
+    return main.generate_topic_with_llm(request.community_context, request.topic_domain)
+
+def test_fingerprint_ignores_case_whitespace_and_issue_order():
+    assert main.topic_request_fingerprint(topic_request("Springfield", ["housing", "transit"])) == \
+        main.topic_request_fingerprint(topic_request("  springfield ", ["Transit", "housing"]))
+    assert main.topic_request_fingerprint(topic_request("Springfield")) != \
+        main.topic_request_fingerprint(topic_request("Shelbyville"))
+
+def test_second_request_is_served_from_cache(fake_openai, topic_json):
+    fake_openai.return_value = completion(topic_json)
+    cache = new_cache()
+
+    async def scenario():
+        first, first_status = await cache.get_or_generate(topic_request(), llm_generate)
+        second, second_status = await cache.get_or_generate(topic_request(" SPRINGFIELD"), llm_generate)
+        return first, first_status, second, second_status
+
+    first, first_status, second, second_status = asyncio.run(scenario())
+    assert (first_status, second_status) == ("miss", "hit")
+    assert fake_openai.await_count == 1
+    assert second.title == first.title
+    assert second.metadata["cache_status"] == "hit"
+
+def test_served_topics_are_copies(fake_openai, topic_json):
+    fake_openai.return_value = completion(topic_json)
+    cache = new_cache()
+
+    async def scenario():
+        await cache.get_or_generate(topic_request(), llm_generate)
+        served, _ = await cache.get_or_generate(topic_request(), llm_generate)
+        served.statements[0].text = "mutated by a caller"
+        again, _ = await cache.get_or_generate(topic_request(), llm_generate)
+        return again
+
+    assert asyncio.run(scenario()).statements[0].text != "mutated by a caller"
+
+def test_stale_entry_is_served_while_one_refresh_runs(fake_openai, topic_json):
+    fake_openai.return_value = completion(topic_json)
+    cache = new_cache(ttl_seconds=60, stale_seconds=60)
+    request = topic_request()
+    fingerprint = main.topic_request_fingerprint(request)
+
+    async def scenario():
+        await cache.get_or_generate(request, llm_generate)
+        topic, created_at = cache._entries[fingerprint]
+        cache._entries[fingerprint] = (topic, created_at - 90)
+        statuses = [(await cache.lookup(request, llm_generate))[1] for _ in range(3)]
+        await asyncio.gather(*cache._refresh_tasks.values())
+        refreshed = (await cache.lookup(request, llm_generate))[1]
+        return statuses, refreshed
+
+    statuses, refreshed = asyncio.run(scenario())
+    assert statuses == ["stale", "stale", "stale"]
+    assert refreshed == "hit"
+    assert fake_openai.await_count == 2
+    assert cache.metrics()["refreshes"] == 1
+
+def test_entry_past_stale_window_is_a_miss(fake_openai, topic_json):
+    fake_openai.return_value = completion(topic_json)
+    cache = new_cache(ttl_seconds=60, stale_seconds=60)
+    request = topic_request()
+    fingerprint = main.topic_request_fingerprint(request)
+
+    async def scenario():
+        await cache.get_or_generate(request, llm_generate)
+        topic, created_at = cache._entries[fingerprint]
+        cache._entries[fingerprint] = (topic, created_at - 200)
+        return await cache.lookup(request, llm_generate)
+
+    assert asyncio.run(scenario()) == (None, "miss")
+
+def test_persisted_entry_survives_a_new_cache(fake_openai, topic_json):
+    fake_openai.return_value = completion(topic_json)
+    request = topic_request(location=f"Persisted {uuid.uuid4()}")
+
+    async def scenario():
+        await new_cache(persist=True).get_or_generate(request, llm_generate)
+        restarted = new_cache(persist=True)
+        return restarted, await restarted.get_or_generate(request, llm_generate)
+
+    restarted, (topic, status) = asyncio.run(scenario())
+    assert status == "hit"
+    assert restarted.metrics()["disk_hits"] == 1
+    assert fake_openai.await_count == 1
+
+def test_failed_generation_is_not_cached(fake_openai, topic_json):
+    fake_openai.side_effect = [completion("not json"), completion(topic_json)]
+    cache = new_cache()
+
+    async def scenario():
+        try:
+            await cache.get_or_generate(topic_request(), llm_generate)
+        except Exception:
+            pass
+        return await cache.get_or_generate(topic_request(), llm_generate)
+
+    topic, status = asyncio.run(scenario())
+    assert status == "miss"
+    assert topic.title == "Housing in Springfield"
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from datetime import datetime
+
+import main
+from conftest import TOPIC_DATA
+
+# Three requests make a key hot: decay between them leaves the score just under 3
+def pregenerator(max_per_hour: int = 60, pool_depth: int = 1) -> main.TopicPregenerator:
+    return main.TopicPregenerator(
+        hot_keys=10, min_score=2.5, half_life_seconds=3600, tracked_keys=100, pool_depth=pool_depth,
+        ttl_seconds=3600, max_per_hour=max_per_hour, concurrency=2, interval_seconds=3600
+    )
+
+def request_for(location: str) -> main.TopicRequest:
+    return main.TopicRequest(community_context=main.CommunityContext(location=location), topic_domain="housing")
+
+def fake_llm(monkeypatch):
+    calls = []
+
+    async def generate(context, topic_domain):
+        calls.append(context.location)
+        return main.GeneratedTopic(**TOPIC_DATA, metadata={"location": context.location})
+
+    monkeypatch.setattr(main, "generate_topic_with_llm", generate)
+    return calls
+
+def test_a_pregenerated_topic_is_served_exactly_once(monkeypatch):
+    monkeypatch.setattr(main, "ACTIVITY_STORE_ENABLED", False)
+    calls = fake_llm(monkeypatch)
+    request = request_for("Pregen Once")
+
+    async def scenario():
+        pregen = pregenerator()
+        await pregen.start()
+        for _ in range(3):
+            pregen.record(request)
+        await pregen._replenish()
+        taken = [pregen.take(request), pregen.take(request)]
+        await pregen.stop()
+        return pregen, taken
+
+    pregen, (first, second) = asyncio.run(scenario())
+    assert calls == ["Pregen Once"]
+    assert first.metadata["location"] == "Pregen Once" and "pregenerated_at" in first.metadata
+    assert second is None
+    assert pregen.metrics()["served"] == 1 and pregen.metrics()["misses"] == 1
+
+def test_refill_spends_at_most_max_per_hour_generations(monkeypatch):
+    monkeypatch.setattr(main, "ACTIVITY_STORE_ENABLED", False)
+    calls = fake_llm(monkeypatch)
+
+    async def scenario():
+        pregen = pregenerator(max_per_hour=3, pool_depth=2)
+        await pregen.start()
+        for location in ("Budget A", "Budget B", "Budget C"):
+            for _ in range(3):
+                pregen.record(request_for(location))
+        await pregen._replenish()
+        await pregen._replenish()  # the pools are still short, but the hour's budget is spent
+        metrics = pregen.metrics()
+        await pregen.stop()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    assert len(calls) == 3 and metrics["generated"] == 3 and metrics["pooled_topics"] == 3
+    assert metrics["budget_remaining_this_hour"] == 0 and metrics["budget_exhausted"] >= 2
+
+def test_seeding_skips_requests_with_issues_or_previous_topics():
+    now = time.time()
+    details = [
+        ({"location": "Seed Plain"}, 3),
+        ({"location": "Seed Issues", "has_current_issues": True}, 3),
+        ({"location": "Seed History", "has_previous_topics": True}, 3),
+        ({"location": None}, 3),
+    ]
+    main.activity_store.append([
+        {
+            "timestamp": datetime.fromtimestamp(now - index).isoformat(),
+            "activity_type": "topic_generation_request",
+            "details": {"topic_domain": "housing", **detail}
+        }
+        for detail, count in details
+        for index in range(count)
+    ])
+
+    async def scenario():
+        pregen = pregenerator()
+        # Seed without letting the refill task run
+        pregen._run = lambda: asyncio.sleep(0)
+        await pregen.start()
+        locations = {entry[2].community_context.location for entry in pregen._scores.values()}
+        hot = {request.community_context.location for _, request in pregen._hot()}
+        await pregen.stop()
+        return locations, hot
+
+    locations, hot = asyncio.run(scenario())
+    assert "Seed Plain" in hot
+    assert not locations & {"Seed Issues", "Seed History", None}
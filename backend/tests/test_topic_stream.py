@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+import pytest
+
+import main
+from conftest import TOPIC_DATA, FakeStream
+
+EXPECTED_EVENTS = (
+    [("title", TOPIC_DATA["title"]), ("description", TOPIC_DATA["description"]), ("main_theme", TOPIC_DATA["main_theme"])]
+    + [("statement", statement) for statement in TOPIC_DATA["statements"]]
+    + [("expected_cluster", cluster) for cluster in TOPIC_DATA["expected_clusters"]]
+)
+
+def parse_in_chunks(text: str, size: int):
+    parser = main.IncrementalTopicParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return parser, events
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100_000])
+def test_events_do_not_depend_on_chunk_boundaries(size):
+    text = json.dumps(TOPIC_DATA, indent=2)
+    parser, events = parse_in_chunks(text, size)
+    assert events == EXPECTED_EVENTS
+    assert parser.document() == TOPIC_DATA
+
+def test_escaped_quotes_and_brackets_inside_strings():
+    data = {
+        "title": "The \"Main Street\" {plan} [draft]",
+        "description": "Back\\slash \\\" and a \\\\\" pair",
+        "statements": [{"text": "Say \"no\" to {towers}]", "category": "x", "expected_cluster": "A"}],
+        "expected_clusters": [{"name": "A", "description": "}{ ][ \""}]
+    }
+    text = json.dumps(data)
+    for size in (1, 5):
+        parser, events = parse_in_chunks(text, size)
+        assert events == [
+            ("title", data["title"]),
+            ("description", data["description"]),
+            ("statement", data["statements"][0]),
+            ("expected_cluster", data["expected_clusters"][0])
+        ]
+        assert parser.document() == data
+
+def test_escape_split_across_chunks():
+    parser = main.IncrementalTopicParser()
+    assert parser.feed('{"title": "a \\') == []
+    assert parser.feed('"quoted\\" title"') == [("title", 'a "quoted" title')]
+    parser.feed("}")
+    assert parser.document() == {"title": 'a "quoted" title'}
+
+def test_text_around_the_object_is_ignored():
+    text = "Here is the topic:\n```json\n" + json.dumps(TOPIC_DATA) + "\n```"
+    parser, events = parse_in_chunks(text, 9)
+    assert events == EXPECTED_EVENTS
+    assert parser.document() == TOPIC_DATA
+
+def test_truncated_stream_yields_only_completed_items():
+    text = json.dumps(TOPIC_DATA)
+    cut = text.index(json.dumps(TOPIC_DATA["statements"][3])) + 10
+    parser, events = parse_in_chunks(text[:cut], 4)
+    assert events == EXPECTED_EVENTS[:3 + 3]
+    with pytest.raises(json.JSONDecodeError):
+        parser.document()
+
+def chunked(text: str, size: int):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+def collect(stream_events):
+    async def scenario():
+        return [event async for event in stream_events]
+    return asyncio.run(scenario())
+
+def test_stream_topic_with_llm_yields_fields_then_validated_topic(fake_openai, topic_json):
+    stream = FakeStream(chunked(topic_json, 11))
+    fake_openai.return_value = stream
+    context = main.CommunityContext(location="Springfield")
+
+    events = collect(main.stream_topic_with_llm(context, "housing-development"))
+    assert events[:-1] == EXPECTED_EVENTS
+    name, topic = events[-1]
+    assert name == "topic"
+    assert topic.title == TOPIC_DATA["title"]
+    assert len(topic.statements) == len(TOPIC_DATA["statements"])
+    assert fake_openai.await_args.kwargs["stream"] is True
+    stream.close.assert_awaited_once()
+
+def test_stream_topic_with_llm_rejects_truncated_stream(fake_openai, topic_json):
+    stream = FakeStream(chunked(topic_json[:len(topic_json) // 2], 11))
+    fake_openai.return_value = stream
+    context = main.CommunityContext(location="Springfield")
+
+    with pytest.raises(Exception, match="invalid JSON"):
+        collect(main.stream_topic_with_llm(context))
+    stream.close.assert_awaited_once()
+
+def test_stream_topic_with_llm_validates_cluster_count(fake_openai):
+    data = {**TOPIC_DATA, "expected_clusters": TOPIC_DATA["expected_clusters"][:3]}
+    fake_openai.return_value = FakeStream(chunked(json.dumps(data), 50))
+
+    with pytest.raises(Exception, match="Invalid cluster count"):
+        collect(main.stream_topic_with_llm(main.CommunityContext(location="Springfield")))
+
+def test_slow_client_does_not_count_against_the_llm_breaker(fake_openai, topic_json, monkeypatch):
+    fake_openai.return_value = FakeStream(chunked(topic_json, 40))
+    breaker = main.CircuitBreaker(
+        "llm", window_size=10, min_calls=1, error_rate_threshold=0.5, p95_threshold_ms=100,
+        open_seconds=60, half_open_probes=1
+    )
+    monkeypatch.setattr(main, "llm_breaker", breaker)
+    request = main.TopicRequest(
+        community_context=main.CommunityContext(location="Slow Reader Town"), topic_domain="housing-development"
+    )
+
+    async def slow_client():
+        response = await main.generate_topic_stream_endpoint(request)
+        lines = []
+        async for line in response.body_iterator:
+            lines.append(json.loads(line))
+            await asyncio.sleep(0.02)
+        return lines
+
+    events = [line["event"] for line in asyncio.run(slow_client())]
+    assert len(events) > 10 and events[-1] == "topic" and "fallback" not in events
+    assert breaker.state == breaker.CLOSED
+    assert breaker.metrics()["calls"] == 1 and breaker.metrics()["window_p95_ms"] < 100
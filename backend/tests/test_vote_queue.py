@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import main
+from conftest import save_poll
+
+def submission(poll_id: str, name: str):
+    return {
+        "poll_id": poll_id, "participant_name": name,
+        "responses": [{"statementIndex": 0, "response": "agree"}],
+        "participant_session_id": f"{poll_id}-{name}", "timestamp": "2024-01-01T00:00:00"
+    }
+
+def participants(poll_id: str):
+    _, counts_row = main.fetch_poll_tallies(poll_id)
+    return counts_row[0] if counts_row else 0
+
+def test_a_failing_commit_hook_does_not_stop_the_writer(monkeypatch):
+    poll_id = save_poll()
+    hooks = []
+
+    def failing_hook(target, applied):
+        hooks.append(target)
+        if len(hooks) == 1:
+            raise RuntimeError("cache backend down")
+
+    monkeypatch.setattr(main, "on_responses_committed", failing_hook)
+
+    async def scenario():
+        queue = main.VoteIngestionQueue(100, 1, 0.01)
+        queue.start()
+        queue.submit(submission(poll_id, "ada"))
+        await asyncio.sleep(0.2)
+        for name in ("bo", "cy"):
+            queue.submit(submission(poll_id, name))
+        await asyncio.wait_for(queue.stop(), 5)
+        return queue.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert participants(poll_id) == 3 and len(hooks) == 3
+    assert metrics["committed"] == 3 and metrics["hook_failures"] == 1
+
+def test_a_dead_writer_rejects_submissions_and_does_not_hang_shutdown():
+    poll_id = save_poll()
+
+    async def scenario():
+        queue = main.VoteIngestionQueue(100, 10, 0.01)
+        queue.start()
+        queue.submit(submission(poll_id, "di"))
+        queue._writer_task.cancel()  # dies with "di" still queued, so join() alone would never return
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as raised:
+            queue.submit(submission(poll_id, "ed"))
+        assert raised.value.status_code == 503
+        await asyncio.wait_for(queue.stop(), 5)
+
+    asyncio.run(scenario())
+    assert participants(poll_id) == 0